@@ -0,0 +1,40 @@
+"""Add semantic embeddings to records and theme clusters
+
+Revision ID: add_record_embeddings
+Revises: add_records_search_vector
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_record_embeddings'
+down_revision = 'add_records_search_vector'
+branch_labels = None
+depends_on = None
+
+# 与 settings.EMBEDDING_DIM 一致；更换不同维度的模型需要新的迁移
+EMBEDDING_DIM = 512
+
+
+def upgrade():
+    # 需要 pgvector >= 0.5（HNSW）；已有记录运行 scripts/backfill_embeddings.py 回填
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+    op.add_column('records', sa.Column('embedding', Vector(EMBEDDING_DIM), nullable=True))
+    op.add_column('theme_clusters', sa.Column('embedding', Vector(EMBEDDING_DIM), nullable=True))
+    op.create_index(
+        'ix_records_embedding', 'records', ['embedding'], unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'}
+    )
+
+
+def downgrade():
+    # 扩展可能被其他对象使用，保留不删
+    op.drop_index('ix_records_embedding', table_name='records', postgresql_using='hnsw')
+    op.drop_column('theme_clusters', 'embedding')
+    op.drop_column('records', 'embedding')
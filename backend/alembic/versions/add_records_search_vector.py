@@ -0,0 +1,28 @@
+"""Add full-text search vector to records
+
+Revision ID: add_records_search_vector
+Revises: add_theme_clusters
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_records_search_vector'
+down_revision = 'add_theme_clusters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 应用侧 jieba 分词后写入；已有记录运行 scripts/backfill_search_vectors.py 回填
+    op.add_column('records', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.create_index('ix_records_search_vector', 'records', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_records_search_vector', table_name='records', postgresql_using='gin')
+    op.drop_column('records', 'search_vector')
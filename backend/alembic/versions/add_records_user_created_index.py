@@ -0,0 +1,25 @@
+"""Add composite index on records (user_id, created_at)
+
+Revision ID: add_records_user_created_idx
+Revises: add_email_verification
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_records_user_created_idx'
+down_revision = 'add_email_verification'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 按用户 + 时间范围查询记录（星球状态、时光轴、历史）
+    op.create_index('ix_records_user_id_created_at', 'records', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_records_user_id_created_at', table_name='records')
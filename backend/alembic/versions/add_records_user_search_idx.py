@@ -0,0 +1,32 @@
+"""Replace the search_vector GIN index with a (user_id, search_vector) one
+
+Revision ID: add_records_user_search_idx
+Revises: add_user_is_admin
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_records_user_search_idx'
+down_revision = 'add_user_is_admin'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 检索总带 user_id 条件：只有 search_vector 的索引会先取出全表中匹配该词的记录，
+    # 复合索引（btree_gin 提供 uuid 的 GIN 操作符类）只扫描该用户的匹配项
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    op.create_index(
+        'ix_records_user_id_search_vector', 'records', ['user_id', 'search_vector'],
+        unique=False, postgresql_using='gin'
+    )
+    op.drop_index('ix_records_search_vector', table_name='records', postgresql_using='gin')
+
+
+def downgrade():
+    op.create_index('ix_records_search_vector', 'records', ['search_vector'], unique=False, postgresql_using='gin')
+    op.drop_index('ix_records_user_id_search_vector', table_name='records', postgresql_using='gin')
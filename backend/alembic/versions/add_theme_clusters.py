@@ -0,0 +1,49 @@
+"""Add theme_clusters and user_corpus tables
+
+Revision ID: add_theme_clusters
+Revises: add_user_stats
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_theme_clusters'
+down_revision = 'add_user_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 用户语料统计（TF-IDF 文档频率）
+    op.create_table('user_corpus',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('doc_count', sa.Integer(), nullable=False),
+    sa.Column('doc_freq', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # 思考主题聚类；已有记录运行 scripts/recluster_themes.py 重新归类
+    op.create_table('theme_clusters',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('label', sa.String(length=100), nullable=False),
+    sa.Column('centroid', sa.JSON(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('position', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'label', name='uq_theme_clusters_user_id_label')
+    )
+    op.create_index(op.f('ix_theme_clusters_user_id'), 'theme_clusters', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_theme_clusters_user_id'), table_name='theme_clusters')
+    op.drop_table('theme_clusters')
+    op.drop_table('user_corpus')
@@ -0,0 +1,25 @@
+"""Add is_admin to users
+
+Revision ID: add_user_is_admin
+Revises: add_user_term_freq
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_is_admin'
+down_revision = 'add_user_term_freq'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 管理员权限显式存在用户行上，由 scripts/grant_admin.py 按用户 ID 授予
+    op.add_column('users', sa.Column('is_admin', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    op.drop_column('users', 'is_admin')
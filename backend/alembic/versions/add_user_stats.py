@@ -0,0 +1,41 @@
+"""Add user_stats summary table
+
+Revision ID: add_user_stats
+Revises: add_user_timezone
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_stats'
+down_revision = 'add_user_timezone'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 每个用户一行统计汇总；已有用户在首次读写时按 records 重建（或运行 scripts/rebuild_user_stats.py）
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('total_records', sa.Integer(), nullable=False),
+    sa.Column('mood_count', sa.Integer(), nullable=False),
+    sa.Column('spark_count', sa.Integer(), nullable=False),
+    sa.Column('thought_count', sa.Integer(), nullable=False),
+    sa.Column('first_record_date', sa.Date(), nullable=True),
+    sa.Column('last_active_date', sa.Date(), nullable=True),
+    sa.Column('active_days', sa.Integer(), nullable=False),
+    sa.Column('current_streak', sa.Integer(), nullable=False),
+    sa.Column('longest_streak', sa.Integer(), nullable=False),
+    sa.Column('weekday_histogram', sa.JSON(), nullable=False),
+    sa.Column('hour_histogram', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_stats')
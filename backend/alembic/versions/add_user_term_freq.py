@@ -0,0 +1,45 @@
+"""Move per-user document frequencies from user_corpus.doc_freq to user_term_freq
+
+Revision ID: add_user_term_freq
+Revises: add_record_embeddings
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_term_freq'
+down_revision = 'add_record_embeddings'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 每个 (用户, 词) 一行，写记录时只 upsert 这条记录的词，不再整体读写 JSON
+    op.create_table('user_term_freq',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('term', sa.Text(), nullable=False),
+    sa.Column('df', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'term')
+    )
+    op.execute("""
+        INSERT INTO user_term_freq (user_id, term, df)
+        SELECT c.user_id, f.key, f.value::int
+        FROM user_corpus c, json_each_text(c.doc_freq) AS f
+        WHERE f.value::int > 0
+    """)
+    op.drop_column('user_corpus', 'doc_freq')
+
+
+def downgrade():
+    op.add_column('user_corpus', sa.Column('doc_freq', sa.JSON(), nullable=False, server_default='{}'))
+    op.execute("""
+        UPDATE user_corpus c SET doc_freq = f.doc_freq
+        FROM (SELECT user_id, json_object_agg(term, df) AS doc_freq FROM user_term_freq GROUP BY user_id) f
+        WHERE f.user_id = c.user_id
+    """)
+    op.alter_column('user_corpus', 'doc_freq', server_default=None)
+    op.drop_table('user_term_freq')
@@ -0,0 +1,25 @@
+"""Add timezone to users
+
+Revision ID: add_user_timezone
+Revises: add_records_user_created_idx
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_timezone'
+down_revision = 'add_records_user_created_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IANA 时区名，星球按用户本地日期划分"一天"
+    op.add_column('users', sa.Column('timezone', sa.String(length=64), nullable=False, server_default='UTC'))
+
+
+def downgrade():
+    op.drop_column('users', 'timezone')
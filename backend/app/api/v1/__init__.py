@@ -2,7 +2,7 @@
 API V1 Router
 """
 from fastapi import APIRouter
-from app.api.v1 import auth, records, planet  # 使用完整版（带数据库）
+from app.api.v1 import admin, auth, records, planet  # 使用完整版（带数据库）
 
 api_router = APIRouter()
 
@@ -10,3 +10,4 @@ api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(records.router, prefix="/records", tags=["records"])
 api_router.include_router(planet.router, prefix="/planet", tags=["planet"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
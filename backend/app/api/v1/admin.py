@@ -0,0 +1,59 @@
+"""
+Admin API - 运维诊断接口（仅管理员）
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.orm import Session
+from datetime import datetime
+import asyncio
+import os
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.deps import get_current_admin_user
+from app.core.metrics import TimedRoute
+from app.core.profiler import ProfilerBusy, sampling_profiler
+from app.models.user import User
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/profile")
+async def profile_worker(
+    seconds: float = Query(10, gt=0, description="采样时长（秒）"),
+    interval_ms: float = Query(10, ge=1, le=1000, description="采样间隔（毫秒）"),
+    output_format: str = Query("speedscope", alias="format", pattern="^(speedscope|collapsed)$",
+                               description="speedscope（JSON）或 collapsed（折叠栈，flamegraph.pl 输入）"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    采样剖析处理本请求的 worker 进程（需 PROFILING_ENABLED）
+
+    多 worker 部署时只覆盖恰好接到本请求的那个 worker，响应中带有其进程号；
+    结果可直接拖进 https://www.speedscope.app 查看
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"采样时长不能超过 {settings.PROFILING_MAX_SECONDS} 秒"
+        )
+
+    # 采样期间不占用数据库连接
+    db.close()
+    try:
+        result = await asyncio.to_thread(sampling_profiler.profile, seconds, interval_ms / 1000)
+    except ProfilerBusy:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="已有采样正在进行，请稍后再试")
+
+    pid = os.getpid()
+    name = f"{settings.APP_NAME} pid={pid} {datetime.now():%Y-%m-%d %H:%M:%S}"
+    filename = f"profile-{pid}-{datetime.now():%Y%m%d-%H%M%S}"
+    headers = {"X-Profile-Samples": str(result.samples), "X-Worker-Pid": str(pid)}
+    if output_format == "collapsed":
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.folded"'
+        return PlainTextResponse(result.to_collapsed(), headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}.speedscope.json"'
+    return JSONResponse(result.to_speedscope(name), headers=headers)
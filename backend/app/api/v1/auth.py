@@ -1,7 +1,7 @@
 """
 Authentication API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
 from app.core.database import get_db
@@ -17,6 +17,9 @@ from app.core.security import (
     generate_verification_token
 )
 from app.core.deps import get_current_user, get_current_verified_user
+from app.core.metrics import TimedRoute
+from app.core.timezone import DEFAULT_TIMEZONE
+from app.core.rate_limit import login_ip_limiter, login_email_limiter, get_client_ip
 from app.models.user import User
 from app.schemas.auth import (
     UserRegister, 
@@ -24,12 +27,14 @@ from app.schemas.auth import (
     Token, 
     EmailVerification,
     UserResponse,
+    UserUpdate,
     MessageResponse,
     ResendVerificationRequest
 )
 from app.services.email_service import email_service
+from app.services.stats_service import stats_service
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.options("/{full_path:path}")
@@ -70,6 +75,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         email=user_data.email,
         hashed_password=get_password_hash(user_data.password),
         is_email_verified=True,  # ✅ Auto-verify without email
+        timezone=user_data.timezone or DEFAULT_TIMEZONE,
         verification_token=None,
         verification_token_expires=None
     )
@@ -135,10 +141,25 @@ async def verify_email(verification: EmailVerification, db: Session = Depends(ge
 
 
 @router.post("/login", response_model=Token)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, request: Request, db: Session = Depends(get_db)):
     """
     Login with email and password (email verification temporarily disabled)
     """
+    # 限流：按 IP 和邮箱的滑动窗口计数，超限直接拒绝（在查库和 bcrypt 之前）
+    email_key = credentials.email.lower()
+    for limiter, identifier in (
+        (login_ip_limiter, get_client_ip(request)),
+        (login_email_limiter, email_key),
+    ):
+        result = await limiter.hit(identifier)
+        if not result.allowed:
+            logger.warning(f"Login rate limited: {limiter.prefix}")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="登录尝试过于频繁，请稍后再试",
+                headers={"Retry-After": str(result.retry_after)},
+            )
+    
     # Find user by email
     user = db.query(User).filter(User.email == credentials.email).first()
     
@@ -162,6 +183,9 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     #         detail="请先验证您的邮箱"
     #     )
     
+    # 登录成功，清除该邮箱的尝试计数
+    await login_email_limiter.reset(email_key)
+    
     # Create tokens (7-day auto-login via access token)
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
@@ -216,6 +240,24 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     return current_user
 
 
+@router.patch("/me", response_model=UserResponse)
+async def update_current_user(
+    payload: UserUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Update current user settings (timezone)
+    """
+    if payload.timezone is not None and payload.timezone != current_user.timezone:
+        current_user.timezone = payload.timezone
+        # 统计按用户时区划分日期和小时，时区变化后重建
+        stats_service.rebuild(db, current_user)
+    db.commit()
+    db.refresh(current_user)
+    return current_user
+
+
 @router.post("/resend-verification", response_model=MessageResponse)
 async def resend_verification_email(
     payload: ResendVerificationRequest, 
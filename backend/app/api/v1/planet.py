@@ -1,23 +1,42 @@
 """
 Planet API - 星球状态接口
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from datetime import date, datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Optional, Union
+import json
 
-from app.core.database import get_db
-from app.core.deps import get_current_verified_user
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
+from app.core.deps import get_current_verified_user, get_user_from_token, security_optional
+from app.core.etag import make_etag, etag_matches, not_modified, set_etag
+from app.core.metrics import TimedRoute
+from app.core.timezone import local_today
 from app.models.user import User
-from app.schemas.planet import PlanetState, PlanetHistory
-from app.services.planet_service import planet_service
+from app.schemas.planet import (
+    PlanetState,
+    PlanetStateDelta,
+    PlanetStateRange,
+    PlanetStateRangeCompact,
+    PlanetHistory
+)
+from app.services.planet_service import planet_service, COMPACT_STAR_FIELDS, COMPACT_TREE_FIELDS
+from app.services.stats_service import stats_service
+from app.services.sync_service import sync_service
+from app.services.event_service import event_service
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
-@router.get("/state", response_model=PlanetState)
+@router.get("/state", response_model=Union[PlanetState, PlanetStateDelta])
 async def get_planet_state(
+    request: Request,
+    response: Response,
     target_date: Optional[str] = Query(None, description="目标日期 YYYY-MM-DD"),
+    since: Optional[int] = Query(None, description="客户端已知的数据版本号，传入时只返回此后的增量"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_verified_user)
 ):
@@ -28,6 +47,11 @@ async def get_planet_state(
     - 大气层颜色（当日心情）
     - 灵感星星列表
     - 思考树木列表
+    
+    支持 If-None-Match：数据未变化时返回 304
+    
+    传入 since 时返回 PlanetStateDelta：只包含该版本之后新增/变化/移除的星星和树木，
+    变更日志无法覆盖时 full=true 并附带全量 state。客户端应按 id 覆盖式应用增量
     """
     try:
         # 解析日期
@@ -40,15 +64,46 @@ async def get_planet_state(
                     detail="日期格式错误，应为 YYYY-MM-DD"
                 )
         else:
-            parsed_date = date.today()
+            parsed_date = local_today(current_user.timezone)
+        
+        # 数据版本未变化时直接返回 304，跳过查询
+        version = await sync_service.get_version(current_user.id)
+        etag = make_etag(version, "state", current_user.id, parsed_date, since, current_user.timezone)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        # 增量同步：直接由变更日志合并，不查询记录表
+        if since is not None:
+            changes = await sync_service.changes_since(current_user.id, since)
+            if changes is not None:
+                current_version, change_list = changes
+                set_etag(response, etag)
+                return {
+                    "date": parsed_date,
+                    "since": since,
+                    "version": current_version,
+                    "full": False,
+                    **planet_service.merge_changes(change_list, parsed_date)
+                }
         
         # 获取星球状态
         state = await planet_service.get_planet_state(
             db=db,
             user_id=str(current_user.id),
-            target_date=parsed_date
+            target_date=parsed_date,
+            tz=current_user.timezone
         )
+        state["version"] = version
         
+        set_etag(response, etag)
+        if since is not None:
+            return {
+                "date": parsed_date,
+                "since": since,
+                "version": version,
+                "full": True,
+                "state": state
+            }
         return state
         
     except HTTPException:
@@ -60,35 +115,153 @@ async def get_planet_state(
         )
 
 
+@router.get("/states", response_model=Union[PlanetStateRange, PlanetStateRangeCompact])
+async def get_planet_states(
+    request: Request,
+    response: Response,
+    start: str = Query(..., description="开始日期 YYYY-MM-DD（含）"),
+    end: str = Query(..., description="结束日期 YYYY-MM-DD（含）"),
+    output_format: str = Query("full", alias="format", pattern="^(full|compact)$", description="full 或 compact（紧凑编码）"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_verified_user)
+):
+    """
+    获取一段日期内每天的星球状态（需要认证且邮箱已验证）
+    
+    时光轴拖动时一次请求取回整个区间，替代逐日调用 /planet/state；
+    format=compact 时省略空白日期并使用数组编码，显著减小响应体
+    """
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="日期格式错误，应为 YYYY-MM-DD"
+        )
+    except OverflowError:
+        # end 很早时回溯 days 天会越过 date.min
+        raise HTTPException(status_code=400, detail="日期超出范围")
+    
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="结束日期不能早于开始日期")
+    if (end_date - start_date).days + 1 > settings.PLANET_STATES_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"日期范围不能超过 {settings.PLANET_STATES_MAX_DAYS} 天"
+        )
+    
+    try:
+        version = await sync_service.get_version(current_user.id)
+        etag = make_etag(version, "states", current_user.id, start_date, end_date, output_format, current_user.timezone)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        states = await planet_service.get_planet_states(
+            db=db,
+            user_id=str(current_user.id),
+            start_date=start_date,
+            end_date=end_date,
+            tz=current_user.timezone
+        )
+        
+        set_etag(response, etag)
+        if output_format == "compact":
+            return {
+                "start_date": start_date,
+                "end_date": end_date,
+                "version": version,
+                "star_fields": COMPACT_STAR_FIELDS,
+                "tree_fields": COMPACT_TREE_FIELDS,
+                "days": planet_service.encode_states_compact(states)
+            }
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "version": version,
+            "states": states
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"获取星球状态失败: {str(e)}"
+        )
+
+
 @router.get("/history", response_model=PlanetHistory)
 async def get_planet_history(
-    days: int = Query(30, ge=1, le=365, description="回溯天数"),
+    request: Request,
+    response: Response,
+    days: int = Query(30, ge=1, le=settings.PLANET_HISTORY_MAX_BUCKETS * 31, description="回溯天数（未指定 start 时生效）"),
+    start: Optional[str] = Query(None, description="开始日期 YYYY-MM-DD（含）"),
+    end: Optional[str] = Query(None, description="结束日期 YYYY-MM-DD（含），默认今天"),
+    resolution: str = Query("day", pattern="^(day|week|month)$", description="时间粒度：day / week / month"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_verified_user)
 ):
     """
     获取星球历史（需要认证且邮箱已验证）
     
-    返回过去N天的星球颜色变化历史，用于时光轴展示
+    返回一段时间内的星球颜色变化历史，用于时光轴展示。
+    resolution=week/month 时在服务端按周/月聚合：记录数求和，颜色由心情混合，
+    适合多年跨度的"星系视图"；单次最多返回 PLANET_HISTORY_MAX_BUCKETS 个时间桶
     """
+    today = local_today(current_user.timezone)
     try:
+        end_date = datetime.strptime(end, "%Y-%m-%d").date() if end else today
+        start_date = (
+            datetime.strptime(start, "%Y-%m-%d").date() if start
+            else end_date - timedelta(days=days)
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="日期格式错误，应为 YYYY-MM-DD"
+        )
+    except OverflowError:
+        # end 很早时回溯 days 天会越过 date.min
+        raise HTTPException(status_code=400, detail="日期超出范围")
+    
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="结束日期不能早于开始日期")
+    if planet_service.count_buckets(start_date, end_date, resolution) > settings.PLANET_HISTORY_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"时间桶数量不能超过 {settings.PLANET_HISTORY_MAX_BUCKETS}，请缩小范围或使用更粗的 resolution"
+        )
+    
+    try:
+        version = await sync_service.get_version(current_user.id)
+        etag = make_etag(
+            version, "history", current_user.id, start_date, end_date, resolution, current_user.timezone
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        set_etag(response, etag)
         history_data = await planet_service.get_planet_history(
             db=db,
             user_id=str(current_user.id),
-            days=days
+            tz=current_user.timezone,
+            start_date=start_date,
+            end_date=end_date,
+            resolution=resolution
         )
         
         if not history_data:
             return {
                 "history": [],
-                "start_date": date.today(),
-                "end_date": date.today()
+                "start_date": start_date,
+                "end_date": end_date,
+                "resolution": resolution
             }
         
         return {
             "history": history_data,
             "start_date": history_data[0]["date"],
-            "end_date": history_data[-1]["date"]
+            "end_date": history_data[-1]["date"],
+            "resolution": resolution
         }
         
     except Exception as e:
@@ -100,55 +273,88 @@ async def get_planet_history(
 
 @router.get("/stats", response_model=dict)
 async def get_planet_stats(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_verified_user)
 ):
     """
     获取星球统计信息（需要认证且邮箱已验证）
     
-    返回总体统计数据
+    返回总体统计数据：记录数、各类型数量、连续打卡天数、按星期/小时的活跃分布。
+    统计汇总在写记录时增量维护，这里只按主键读取一行
     """
-    from app.models.record import Record, RecordType
-    from sqlalchemy import func
-    
     try:
-        # 总记录数
-        total_records = db.query(func.count(Record.id)).filter(
-            Record.user_id == current_user.id
-        ).scalar() or 0
-        
-        # 各类型记录数
-        mood_count = db.query(func.count(Record.id)).filter(
-            Record.user_id == current_user.id,
-            Record.type == RecordType.MOOD
-        ).scalar() or 0
-        
-        spark_count = db.query(func.count(Record.id)).filter(
-            Record.user_id == current_user.id,
-            Record.type == RecordType.SPARK
-        ).scalar() or 0
-        
-        thought_count = db.query(func.count(Record.id)).filter(
-            Record.user_id == current_user.id,
-            Record.type == RecordType.THOUGHT
-        ).scalar() or 0
+        today = local_today(current_user.timezone)
+        version = await sync_service.get_version(current_user.id)
+        etag = make_etag(version, "stats", current_user.id, today, current_user.timezone)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         
-        # 第一条记录日期
-        first_record = db.query(Record).filter(
-            Record.user_id == current_user.id
-        ).order_by(Record.created_at).first()
-        
-        return {
-            "total_records": total_records,
-            "mood_count": mood_count,
-            "spark_count": spark_count,
-            "thought_count": thought_count,
-            "start_date": first_record.created_at.date().isoformat() if first_record else None,
-            "days_active": (date.today() - first_record.created_at.date()).days + 1 if first_record else 0
-        }
+        return stats_service.get_stats(db, current_user)
         
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"获取统计信息失败: {str(e)}"
         )
+
+
+@router.get("/events")
+async def planet_events(
+    request: Request,
+    token: Optional[str] = Query(None, description="access token（EventSource 无法设置请求头时使用）"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_optional)
+):
+    """
+    星球实时事件流（Server-Sent Events，需要认证）
+    
+    连接建立后先发送 ready 事件（含当前数据版本），之后每次记录增删都会推送 planet 事件：
+    - star_added / star_removed：灵感星星增删
+    - tree_grew / tree_shrank / tree_removed：思考树变化
+    - atmosphere_changed：大气层颜色变化
+    
+    客户端收到事件后直接在本地应用增量，无需再轮询 /planet/state
+    """
+    raw_token = credentials.credentials if credentials else token
+    if not raw_token:
+        raise HTTPException(
+            status_code=401,
+            detail="无法验证凭据",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # 长连接不占用数据库连接：鉴权完成后立即释放会话
+    db = SessionLocal()
+    try:
+        user_id = str(get_user_from_token(raw_token, db).id)
+    finally:
+        db.close()
+    
+    async def event_stream():
+        subscription = event_service.subscribe(
+            user_id,
+            heartbeat=settings.PLANET_EVENTS_HEARTBEAT_SECONDS
+        )
+        ready = False
+        async for message in subscription:
+            if await request.is_disconnected():
+                break
+            if message is None:
+                if not ready:
+                    ready = True
+                    version = await sync_service.get_version(user_id)
+                    yield f"retry: 3000\nevent: ready\ndata: {json.dumps({'version': version})}\n\n"
+                else:
+                    yield ": keepalive\n\n"
+                continue
+            version = json.loads(message).get("version")
+            event_id = f"id: {version}\n" if version is not None else ""
+            yield f"{event_id}event: planet\ndata: {message}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
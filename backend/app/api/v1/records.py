@@ -1,21 +1,57 @@
 """
 Records API - 记录相关接口
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
+import logging
 import uuid
 
 from app.core.database import get_db
 from app.core.deps import get_current_verified_user
+from app.core.etag import make_etag, etag_matches, not_modified, set_etag
+from app.core.metrics import TimedRoute
+from app.core.tracing import span
+from app.core.segmenter import tokenize
 from app.models.user import User
 from app.models.record import Record, RecordType
-from app.schemas.record import RecordCreate, RecordResponse, RecordListResponse
+from app.schemas.record import (
+    RecordCreate, RecordResponse, RecordListResponse, RecordSearchResponse, SimilarRecordsResponse
+)
 from app.services.emotion_service import emotion_service
 from app.services.whisper_service import whisper_service
 from app.services.planet_service import planet_service
+from app.services.stats_service import stats_service
+from app.services.corpus_service import corpus_service
+from app.services.embedding_service import embedding_service
+from app.services.theme_service import theme_service
+from app.services.keyword_service import keyword_service, TOP_K
+from app.services.search_service import search_service, to_search_vector
+from app.services.sync_service import sync_service
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+
+async def _notify_change(db: Session, user: User, record: Record, removed: bool = False) -> None:
+    """
+    写操作提交后递增数据版本并推送星球增量；失败只记录日志，不影响写操作结果
+
+    版本先单独递增：之后计算增量、推送失败时，ETag 和增量同步仍能看到这次写入
+    （变更日志缺这一条，客户端回退为全量同步）
+    """
+    version = None
+    try:
+        version = await sync_service.bump_version(user.id)
+    except Exception as e:
+        logger.warning(f"Failed to bump data version: {type(e).__name__}: {e}")
+    try:
+        change = planet_service.build_record_events(db, record, removed=removed, tz=user.timezone)
+        await sync_service.publish_change(user.id, version, change)
+    except Exception as e:
+        logger.warning(f"Failed to publish planet change: {type(e).__name__}: {e}")
 
 
 @router.options("/")
@@ -59,11 +95,7 @@ async def create_record(
             new_record.color_hex = color
             
         elif record_data.type == "spark":
-            # 灵感：提取关键词 + 计算位置
-            # 简化版：从内容中提取关键词（实际可用更复杂的NLP）
-            words = record_data.content.split()[:3]
-            new_record.keywords = words
-            
+            # 灵感：计算位置（关键词在更新语料统计后提取）
             # 计算星星位置
             # 查询已有星星数量
             spark_count = db.query(Record).filter(
@@ -80,24 +112,27 @@ async def create_record(
             )
             new_record.position_data = position
             
-        elif record_data.type == "thought":
-            # 思考：提取主题（简化版）
-            new_record.theme_cluster = "日常思考"  # 实际应该用聚类算法
-            new_record.keywords = record_data.content.split()[:5]
-            
-            # 计算树的位置
-            position = planet_service.calculate_tree_position(
-                new_record.theme_cluster,
-                0
-            )
-            new_record.position_data = position
+        # 更新用户语料统计（IDF），据此提取关键词；
+        # 计算语义向量，思考记录据此归入最相近的主题并得到树的位置
+        with span("records.analyze_text", {"record.type": record_data.type.value}):
+            tokens = tokenize(record_data.content, search=True)
+            corpus = corpus_service.add_document(db, current_user.id, tokens)
+            if new_record.type in TOP_K:
+                new_record.keywords = keyword_service.extract(
+                    record_data.content, corpus, TOP_K[new_record.type]
+                )
+            new_record.embedding = embedding_service.embed(record_data.content)
+            if new_record.type == RecordType.THOUGHT:
+                theme_service.assign(db, current_user, new_record, tokens, corpus)
+            new_record.search_vector = to_search_vector(record_data.content)
         
-        # 保存到数据库
-        db.add(new_record)
-        db.commit()
-        db.refresh(new_record)
-        
-        return new_record
+        # 保存到数据库（统计汇总与记录同一事务更新）
+        with span("records.save"):
+            db.add(new_record)
+            db.flush()
+            stats_service.record_added(db, current_user, new_record)
+            db.commit()
+            db.refresh(new_record)
         
     except Exception as e:
         db.rollback()
@@ -105,10 +140,16 @@ async def create_record(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"创建记录失败: {str(e)}"
         )
+    
+    await _notify_change(db, current_user, new_record)
+    
+    return new_record
 
 
 @router.get("/", response_model=RecordListResponse)
 async def get_records(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
     record_type: str = None,
@@ -121,7 +162,14 @@ async def get_records(
     - **skip**: 跳过数量
     - **limit**: 返回数量
     - **record_type**: 记录类型筛选 (mood/spark/thought)
+    
+    支持 If-None-Match：数据未变化时返回 304
     """
+    version = await sync_service.get_version(current_user.id)
+    etag = make_etag(version, "records", current_user.id, skip, limit, record_type)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     query = db.query(Record).filter(Record.user_id == str(current_user.id))
     
     if record_type:
@@ -136,6 +184,7 @@ async def get_records(
     total = query.count()
     records = query.order_by(Record.created_at.desc()).offset(skip).limit(limit).all()
     
+    set_etag(response, etag)
     return {
         "records": records,
         "total": total,
@@ -144,6 +193,66 @@ async def get_records(
     }
 
 
+@router.get("/search", response_model=RecordSearchResponse)
+async def search_records(
+    q: str = Query(..., min_length=1, max_length=200, description="搜索词"),
+    record_type: Optional[str] = Query(None, description="记录类型筛选 (mood/spark/thought)"),
+    start: Optional[str] = Query(None, description="开始日期 YYYY-MM-DD（含）"),
+    end: Optional[str] = Query(None, description="结束日期 YYYY-MM-DD（含）"),
+    sort: str = Query("relevance", pattern="^(relevance|recent)$", description="relevance 按相关度，recent 按时间"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_verified_user)
+):
+    """
+    全文搜索记录（需要认证且邮箱已验证）
+    
+    - **q**: 搜索词，多个词需同时出现
+    - **record_type**: 记录类型筛选
+    - **start / end**: 日期范围（用户时区）
+    - **cursor**: 翻页游标
+    """
+    parsed_type = None
+    if record_type:
+        try:
+            parsed_type = RecordType[record_type.upper()]
+        except KeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"无效的记录类型: {record_type}"
+            )
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date() if start else None
+        end_date = datetime.strptime(end, "%Y-%m-%d").date() if end else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="日期格式错误，应为 YYYY-MM-DD"
+        )
+    
+    try:
+        records, next_cursor = search_service.search(
+            db,
+            user_id=str(current_user.id),
+            q=q,
+            record_type=parsed_type,
+            start_date=start_date,
+            end_date=end_date,
+            tz=current_user.timezone,
+            sort=sort,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的翻页游标"
+        )
+    
+    return {"records": records, "next_cursor": next_cursor}
+
+
 @router.get("/history")
 async def get_record_history(
     days: int = 30,
@@ -196,15 +305,13 @@ async def get_record_history(
             
             result.append(item)
         
-        print(f"✅ 成功返回 {len(result)} 条记录")
+        logger.debug(f"History returned {len(result)} records")
         return result
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 获取历史记录失败: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Failed to load record history: {type(e).__name__}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"获取历史记录失败: {str(e)}"
@@ -240,6 +347,57 @@ async def get_record(
     return record
 
 
+@router.get("/{record_id}/similar", response_model=SimilarRecordsResponse)
+async def get_similar_records(
+    record_id: str,
+    limit: int = Query(10, ge=1, le=50),
+    record_type: Optional[str] = Query(None, description="只返回某类记录 (mood/spark/thought)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_verified_user)
+):
+    """
+    语义相似的记录（需要认证且邮箱已验证）
+    
+    - **limit**: 返回数量
+    - **record_type**: 类型筛选，不传则返回所有类型
+    """
+    try:
+        record_uuid = uuid.UUID(record_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的记录ID格式"
+        )
+    parsed_type = None
+    if record_type:
+        try:
+            parsed_type = RecordType[record_type.upper()]
+        except KeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"无效的记录类型: {record_type}"
+            )
+    
+    record = db.query(Record).filter(
+        Record.id == record_uuid,
+        Record.user_id == str(current_user.id)
+    ).first()
+    
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="记录不存在"
+        )
+    
+    similar = search_service.similar(db, record, limit=limit, record_type=parsed_type)
+    return {
+        "records": [
+            {"record": item, "similarity": round(similarity, 4)}
+            for item, similarity in similar
+        ]
+    }
+
+
 @router.delete("/{record_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_record(
     record_id: str, 
@@ -266,9 +424,22 @@ async def delete_record(
             detail="记录不存在"
         )
     
+    # 提交后实例属性会过期且无法重新加载，先保留快照用于计算增量
+    # （跳过 search_vector / embedding 等延迟加载列，否则每列多一次查询）
+    snapshot = Record(**{
+        attr.key: getattr(record, attr.key) for attr in Record.__mapper__.column_attrs if not attr.deferred
+    })
+    
     db.delete(record)
+    db.flush()
+    # 与创建记录相同的加锁顺序（语料 → 统计），并发的创建和删除不会互相死锁
+    corpus_service.remove_document(db, current_user.id, tokenize(snapshot.content, search=True))
+    stats_service.record_removed(db, current_user, snapshot)
+    theme_service.record_removed(db, current_user, snapshot)
     db.commit()
     
+    await _notify_change(db, current_user, snapshot, removed=True)
+    
     return None
 
 
@@ -298,7 +469,8 @@ async def transcribe_audio(audio: UploadFile = File(...)):
                 detail="文件大小超过10MB限制"
             )
         
-        # 调用Whisper服务
+        # 调用Whisper服务（上面读取大小时已读到文件末尾，先回到开头）
+        await audio.seek(0)
         text = await whisper_service.transcribe(audio.file)
         
         return {
@@ -15,12 +15,9 @@ security = HTTPBearer()
 security_optional = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def get_user_from_token(token: str, db: Session) -> User:
     """
-    Get current authenticated user from JWT token
+    Resolve and validate the user for a raw access token
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -29,7 +26,6 @@ async def get_current_user(
     )
     
     # Decode token
-    token = credentials.credentials
     payload = decode_token(token)
     if payload is None:
         raise credentials_exception
@@ -65,6 +61,16 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Get current authenticated user from JWT token
+    """
+    return get_user_from_token(credentials.credentials, db)
+
+
 async def get_current_verified_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -80,6 +86,20 @@ async def get_current_verified_user(
     return current_user
 
 
+async def get_current_admin_user(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    """
+    Get current user and require admin privileges (users.is_admin)
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限"
+        )
+    return current_user
+
+
 # Optional: dependency for getting current user without raising exception
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_optional),
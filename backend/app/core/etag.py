@@ -0,0 +1,49 @@
+"""
+ETag helpers - 基于用户数据版本的条件请求
+"""
+from typing import Optional
+from fastapi import Request, Response
+import hashlib
+
+# 客户端每次都需要重新验证，但可以复用本地缓存（配合 If-None-Match 使用）
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(version: Optional[int], *parts) -> Optional[str]:
+    """
+    生成弱 ETag
+
+    Args:
+        version: 用户数据版本号，None 表示版本不可用（不生成 ETag）
+        parts: 影响响应内容的其他因素（路由、查询参数、当天日期等）
+    """
+    if version is None:
+        return None
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:12]
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """请求的 If-None-Match 是否命中当前 ETag"""
+    if etag is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # 弱比较：忽略 W/ 前缀
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """304 响应"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: Optional[str]) -> None:
+    """在正常响应上附加 ETag"""
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
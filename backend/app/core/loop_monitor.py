@@ -0,0 +1,96 @@
+"""
+Loop Monitor - 事件循环延迟监控与阻塞调用检测
+
+- 后台任务每 LOOP_MONITOR_INTERVAL_MS 睡眠一次，实际唤醒时间比预期晚的部分即事件循环延迟，
+  记入 event_loop_lag_seconds
+- 看门狗线程检查后台任务的心跳：事件循环超过 LOOP_LAG_THRESHOLD_MS 没有响应时，
+  立即抓取事件循环线程的当前调用栈并记 WARNING 日志（此时阻塞调用还在执行，栈顶就是出问题的那一行）
+- DEBUG 模式下同时开启 asyncio 调试模式，单个回调/任务步骤超过 LOOP_SLOW_CALLBACK_MS 时
+  由 asyncio 记录 "Executing <Task ...> took ..." 日志
+"""
+from typing import Optional
+from app.core.config import settings
+from app.core.metrics import EVENT_LOOP_BLOCKED, EVENT_LOOP_LAG
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """事件循环延迟监控（每个 worker 进程一个）"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._heartbeat = 0.0
+        self._loop_thread_id: Optional[int] = None
+
+    def start(self) -> None:
+        """在事件循环中调用（应用启动时）"""
+        if not settings.LOOP_MONITOR_ENABLED or self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        if settings.DEBUG:
+            loop.set_debug(True)
+            loop.slow_callback_duration = settings.LOOP_SLOW_CALLBACK_MS / 1000
+
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = loop.create_task(self._run())
+        if settings.LOOP_LAG_THRESHOLD_MS > 0:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """停止后台任务和看门狗（应用退出时调用）"""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        interval = settings.LOOP_MONITOR_INTERVAL_MS / 1000
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            EVENT_LOOP_LAG.observe(max(0.0, now - started - interval))
+
+    def _watch(self) -> None:
+        interval = settings.LOOP_MONITOR_INTERVAL_MS / 1000
+        threshold = settings.LOOP_LAG_THRESHOLD_MS / 1000
+        # 检查间隔取阈值的一半，阻塞刚超过阈值不久就能抓到栈
+        check_every = max(threshold / 2, 0.01)
+        reported = 0.0
+
+        while not self._stopped.wait(check_every):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - interval
+            # 同一次阻塞只报告一次（心跳恢复后才会再次报告）
+            if blocked < threshold or heartbeat == reported:
+                continue
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            EVENT_LOOP_BLOCKED.inc()
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(f"Event loop blocked for {blocked * 1000:.0f}ms, current stack:\n{stack}")
+
+
+loop_monitor = LoopMonitor()
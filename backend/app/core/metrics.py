@@ -0,0 +1,227 @@
+"""
+Metrics - Prometheus 指标（GET /metrics）
+
+默认关闭（METRICS_ENABLED=true 开启）；开启后应只对内网开放，或配置 METRICS_TOKEN
+要求抓取方带 Bearer token
+
+- 请求耗时：按方法、路由模板、状态码
+- 阶段耗时：db / llm / whisper / bcrypt / serialization，每次操作记一个观测值；
+  同时按路由记录单个请求内各阶段的累计耗时，用于拆解某个接口的 p99 花在哪里
+- 事件循环延迟与阻塞次数（见 loop_monitor）
+- 数据库连接池、SSE 事件队列的当前状态（抓取时读取）
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import asyncio
+import functools
+import time
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP 请求耗时",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "正在处理的 HTTP 请求数", ["method"])
+STAGE_LATENCY = Histogram(
+    "stage_duration_seconds",
+    "单次操作耗时（db: 一条 SQL，llm: 一次情感分析调用，whisper: 一次转写，bcrypt: 一次哈希/校验，"
+    "serialization: 一次响应序列化）",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_STAGE_LATENCY = Histogram(
+    "http_request_stage_seconds",
+    "单个请求内各阶段的累计耗时",
+    ["route", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "单个请求执行的 SQL 条数",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 20, 30, 50, 100),
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "事件循环延迟（定时唤醒比预期晚的时间）",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+EVENT_LOOP_BLOCKED = Counter("event_loop_blocked_total", "事件循环阻塞超过阈值的次数")
+AI_ERRORS = Counter("ai_request_errors_total", "AI 调用失败次数", ["stage", "provider"])
+
+UNMATCHED_ROUTE = "unmatched"
+
+# 当前请求各阶段的累计耗时；存可变 dict，线程池里执行的同步代码也能累加到同一个请求上
+_request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_stages", default=None)
+# 端点函数返回的时刻（TimedRoute 用来计算序列化耗时）
+_endpoint_done: ContextVar[Optional[Dict[str, float]]] = ContextVar("endpoint_done", default=None)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """记录一次阶段耗时，并累加到当前请求"""
+    STAGE_LATENCY.labels(stage).observe(seconds)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def track(stage: str):
+    """
+    计时上下文，可包住 await：
+
+        with track("llm"):
+            response = await client.chat.completions.create(...)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """请求耗时中间件（应放在最外层，限流拒绝的请求也计入）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stages: Dict[str, float] = {}
+        token = _request_stages.set(stages)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+            _request_stages.reset(token)
+            # 用路由模板（如 /api/v1/records/{record_id}）而不是实际路径，避免标签基数失控
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            REQUEST_LATENCY.labels(method, route_path, str(status_code)).observe(elapsed)
+            for stage, seconds in stages.items():
+                REQUEST_STAGE_LATENCY.labels(route_path, stage).observe(seconds)
+
+
+class TimedRoute(APIRoute):
+    """
+    记录响应序列化耗时：从端点函数返回到响应对象生成
+    （response_model 校验、jsonable_encoder 和 JSON 编码）
+
+    用法：APIRouter(route_class=TimedRoute)
+    """
+
+    def get_route_handler(self):
+        call = self.dependant.call
+
+        def mark_done() -> None:
+            marker = _endpoint_done.get()
+            if marker is not None:
+                marker["at"] = time.perf_counter()
+
+        # 保持同步/异步与原函数一致，FastAPI 据此决定是否放进线程池
+        if asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def endpoint(*args, **kwargs):
+                result = await call(*args, **kwargs)
+                mark_done()
+                return result
+        else:
+            @functools.wraps(call)
+            def endpoint(*args, **kwargs):
+                result = call(*args, **kwargs)
+                mark_done()
+                return result
+
+        self.dependant.call = endpoint
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            marker: Dict[str, float] = {}
+            token = _endpoint_done.set(marker)
+            try:
+                response = await handler(request)
+            finally:
+                _endpoint_done.reset(token)
+            if "at" in marker:
+                observe_stage("serialization", time.perf_counter() - marker["at"])
+            return response
+
+        return timed_handler
+
+
+def instrument_engine(engine: Engine) -> None:
+    """记录每条 SQL 的执行耗时（db 阶段）"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        observe_stage("db", time.perf_counter() - conn.info["query_started"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            observe_stage("db", time.perf_counter() - started.pop())
+
+
+class RuntimeCollector:
+    """抓取时读取连接池和事件队列的状态"""
+
+    def describe(self):
+        # 注册时不调用 collect()（否则导入本模块时就会导入 database / event_service）
+        return []
+
+    def collect(self):
+        # 延迟导入：database / event_service 的导入链较长，指标模块需要能被它们导入
+        from app.core.database import engine
+        from app.services.event_service import event_service
+
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            yield GaugeMetricFamily("db_pool_checked_out", "已借出的数据库连接数", value=pool.checkedout())
+            yield GaugeMetricFamily("db_pool_size", "连接池常驻连接数", value=pool.size())
+            # 超出 pool_size 后临时创建的连接数（为负表示常驻连接尚未建满）
+            yield GaugeMetricFamily("db_pool_overflow", "连接池溢出连接数", value=pool.overflow())
+
+        connections, queued = event_service.queue_stats()
+        yield GaugeMetricFamily("planet_event_connections", "本进程的 SSE 连接数", value=connections)
+        yield GaugeMetricFamily("planet_event_queue_depth", "本进程 SSE 连接待发送的事件总数", value=queued)
+
+
+REGISTRY.register(RuntimeCollector())
+
+
+def metrics_response() -> Response:
+    """Prometheus 文本格式的全部指标"""
+    # 直接设置 Content-Type：media_type 为 text/* 时 Starlette 会再追加一次 charset
+    return Response(generate_latest(REGISTRY), headers={"Content-Type": CONTENT_TYPE_LATEST})
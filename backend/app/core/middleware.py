@@ -0,0 +1,106 @@
+"""
+ASGI middleware
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.rate_limit import Bucket, TokenBucketLimiter, get_client_ip
+from app.core.security import decode_token
+
+
+@dataclass(frozen=True)
+class RouteBudget:
+    """路由级令牌桶预算（path 相对于 API_V1_PREFIX，prefix=True 时按前缀匹配）"""
+    method: str
+    path: str
+    bucket: Bucket
+    prefix: bool = False
+
+    def matches(self, method: str, path: str) -> bool:
+        if method != self.method:
+            return False
+        if self.prefix:
+            return path.startswith(self.path)
+        return path == self.path
+
+
+USER_BUCKET = Bucket("user", settings.RATE_LIMIT_USER_CAPACITY, settings.RATE_LIMIT_USER_REFILL_PER_SECOND)
+POLL_BUCKET = Bucket("poll", settings.RATE_LIMIT_POLL_CAPACITY, settings.RATE_LIMIT_POLL_REFILL_PER_SECOND)
+AI_BUCKET = Bucket("ai", settings.RATE_LIMIT_AI_CAPACITY, settings.RATE_LIMIT_AI_REFILL_PER_SECOND)
+
+# 会触发 AI 调用的接口预算最紧，轮询接口次之，其余只受用户总预算约束
+DEFAULT_ROUTE_BUDGETS = [
+    RouteBudget("POST", "/records", AI_BUCKET),
+    RouteBudget("POST", "/records/transcribe", AI_BUCKET),
+    RouteBudget("GET", "/planet/", POLL_BUCKET, prefix=True),
+]
+
+EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+
+class RateLimitMiddleware:
+    """
+    请求限流中间件
+
+    每个请求同时消耗调用者的总预算和所匹配路由的预算；
+    已登录用户按 user_id 计，未登录请求按客户端 IP 计。
+    超限返回 429 并带 Retry-After 头
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Optional[TokenBucketLimiter] = None,
+        route_budgets: Optional[List[RouteBudget]] = None,
+    ):
+        self.app = app
+        self.limiter = limiter or TokenBucketLimiter()
+        self.route_budgets = DEFAULT_ROUTE_BUDGETS if route_budgets is None else route_budgets
+
+    @staticmethod
+    def _identify(request: Request) -> str:
+        auth = request.headers.get("authorization", "")
+        if auth.lower().startswith("bearer "):
+            payload = decode_token(auth[7:].strip())
+            if payload and payload.get("sub"):
+                return f"user:{payload['sub']}"
+        return f"ip:{get_client_ip(request)}"
+
+    def _buckets(self, method: str, path: str) -> List[Bucket]:
+        if path.startswith(settings.API_V1_PREFIX):
+            path = path[len(settings.API_V1_PREFIX):]
+        path = path.rstrip("/") or "/"
+        buckets = [USER_BUCKET]
+        for budget in self.route_budgets:
+            if budget.matches(method, path) and budget.bucket not in buckets:
+                buckets.append(budget.bucket)
+        return buckets
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+        if method == "OPTIONS" or path in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        result = await self.limiter.take(self._identify(request), self._buckets(method, path))
+        if not result.allowed:
+            response = JSONResponse(
+                {"detail": "请求过于频繁，请稍后再试"},
+                status_code=429,
+                headers={"Retry-After": str(result.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
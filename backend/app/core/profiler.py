@@ -0,0 +1,213 @@
+"""
+Profiler - 进程采样剖析与单请求 cProfile
+
+- SamplingProfiler：后台线程按固定间隔读取所有线程的调用栈（sys._current_frames），
+  在限定时长内采样当前 worker 进程，输出 speedscope JSON 或折叠栈（flamegraph.pl / speedscope 均可打开）。
+  不修改解释器的 profile 钩子，被采样的代码没有额外开销；10ms 间隔下采样线程自身约占 1% CPU
+- RequestProfilerMiddleware：非生产环境下请求带 X-Profile 头时用 cProfile 记录该请求，
+  结果写入 PROFILING_OUTPUT_DIR（snakeviz / pstats 查看），文件名通过 X-Profile-File 响应头返回
+
+两者都需 PROFILING_ENABLED 开启；采样接口仅管理员可用（GET /api/v1/admin/profile）
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+import cProfile
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_FILE_HEADER = "X-Profile-File"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# (函数名, 文件, 起始行)
+FrameKey = Tuple[str, str, int]
+
+
+class ProfilerBusy(RuntimeError):
+    """同一进程内已有采样在进行"""
+
+
+class SamplingProfiler:
+    """
+    限时采样当前进程所有线程的调用栈
+
+    按 (线程, 调用栈) 聚合，样本权重为两次采样的实际间隔，采样线程被系统调度延迟时也不失真
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds: float, interval: float) -> "SampleProfile":
+        """阻塞采样 seconds 秒（应放在线程中调用，不要直接在事件循环里调用）"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("已有采样正在进行")
+        try:
+            return self._sample(seconds, interval)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval: float) -> "SampleProfile":
+        me = threading.get_ident()
+        stacks: Counter = Counter()
+        # 同一 code 对象只生成一次 key，避免每次采样重复拼元组
+        keys: Dict[object, FrameKey] = {}
+        started = last = time.perf_counter()
+        deadline = started + seconds
+        samples = 0
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            names = {t.ident: t.name for t in threading.enumerate()}
+            weight = now - last
+            last = now
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    key = keys.get(code)
+                    if key is None:
+                        key = keys[code] = (code.co_name, code.co_filename, code.co_firstlineno)
+                    stack.append(key)
+                    frame = frame.f_back
+                stack.reverse()
+                stacks[(names.get(ident, str(ident)), tuple(stack))] += weight
+            samples += 1
+            time.sleep(max(0.0, interval - (time.perf_counter() - now)))
+
+        return SampleProfile(stacks, time.perf_counter() - started, samples)
+
+
+class SampleProfile:
+    """一次采样的结果"""
+
+    def __init__(self, stacks: Counter, duration: float, samples: int):
+        self.stacks = stacks
+        self.duration = duration
+        self.samples = samples
+
+    def to_collapsed(self) -> str:
+        """折叠栈格式：每行 "线程;外层帧;...;内层帧 微秒数" """
+        lines = []
+        for (thread, stack), weight in self.stacks.most_common():
+            frames = ";".join(_frame_label(key) for key in stack)
+            lines.append(f"{thread};{frames} {max(1, round(weight * 1e6))}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, name: str) -> dict:
+        """speedscope 的 sampled 格式，每个线程一个 profile"""
+        frame_index: Dict[FrameKey, int] = {}
+        frames: List[dict] = []
+        profiles: Dict[str, dict] = {}
+
+        for (thread, stack), weight in self.stacks.items():
+            indices = []
+            for key in stack:
+                index = frame_index.get(key)
+                if index is None:
+                    index = frame_index[key] = len(frames)
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                indices.append(index)
+            profile = profiles.get(thread)
+            if profile is None:
+                profile = profiles[thread] = {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": 0,
+                    "samples": [],
+                    "weights": [],
+                }
+            profile["samples"].append(indices)
+            profile["weights"].append(weight)
+            profile["endValue"] += weight
+
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": settings.APP_NAME,
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            # 事件循环所在的主线程排在最前
+            "profiles": sorted(profiles.values(), key=lambda p: p["name"] != "MainThread"),
+        }
+
+
+def _frame_label(key: FrameKey) -> str:
+    name, filename, line = key
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+sampling_profiler = SamplingProfiler()
+
+
+class RequestProfilerMiddleware:
+    """
+    带 X-Profile 头的请求用 cProfile 记录（生产环境不生效）
+
+    cProfile 只记录事件循环线程：请求处理期间同一线程上交替执行的其他请求也会被计入，
+    放进线程池执行的同步代码不会被记录
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._active = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._active or not _has_profile_header(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profile = cProfile.Profile()
+        filename: Optional[str] = None
+
+        def finish() -> None:
+            nonlocal filename
+            if filename is None:
+                profile.disable()
+                self._active = False
+                filename = _dump(profile, scope)
+
+        async def send_wrapper(message: Message) -> None:
+            # 普通响应在处理完成后才开始发送，此时结束记录并通过响应头返回文件名
+            if message["type"] == "http.response.start":
+                finish()
+                MutableHeaders(scope=message).append(PROFILE_FILE_HEADER, filename)
+            await send(message)
+
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()
+
+
+def _has_profile_header(scope: Scope) -> bool:
+    for name, _ in scope["headers"]:
+        if name == PROFILE_HEADER.encode():
+            return True
+    return False
+
+
+def _dump(profile: cProfile.Profile, scope: Scope) -> str:
+    os.makedirs(settings.PROFILING_OUTPUT_DIR, exist_ok=True)
+    path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+    filename = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{scope['method']}-{path}.prof"
+    profile.dump_stats(os.path.join(settings.PROFILING_OUTPUT_DIR, filename))
+    logger.info(f"Request profile saved: {filename}")
+    return filename
@@ -0,0 +1,226 @@
+"""
+Query Monitor - SQL 查询计数与慢查询日志
+
+- 每个请求统计查询条数和数据库总耗时（Prometheus 指标 http_request_db_queries；
+  QUERY_STATS_HEADER 开启时通过 X-DB-Query-Count / Server-Timing 响应头返回）
+- 超过 QUERY_SLOW_THRESHOLD_MS 的 SQL 记录 WARNING 日志，附带参数和 EXPLAIN 执行计划
+- 查询预算：单个请求的查询数超出所匹配路由的预算时记录日志（warn）或直接报错（raise，
+  测试环境开启，N+1 之类的回归在上线前就会让用例失败）
+"""
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# 日志中单个参数列表的最大长度
+MAX_PARAMS_LOG_LENGTH = 500
+# 参数名包含这些片段时只记录类型（如 hashed_password、verification_token、content 及由正文生成的分词）
+REDACTED_PARAM_NAMES = ("password", "token", "secret", "content", "keywords", "tsvector", "tsquery", "embedding")
+# 只对只读语句做 EXPLAIN
+EXPLAINABLE_PREFIXES = ("select", "with")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """请求的查询数超出预算（QUERY_BUDGET_MODE=raise）"""
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """路由级查询预算（path 为路由模板，相对于 API_V1_PREFIX）"""
+    method: str
+    path: str
+    max_queries: int
+
+
+# 按当前实现的查询数略留余量；改动接口使查询数增加时应先确认不是 N+1 再调整
+DEFAULT_QUERY_BUDGETS = [
+    QueryBudget("POST", "/auth/register", 5),
+    QueryBudget("POST", "/auth/login", 2),
+    QueryBudget("GET", "/auth/me", 1),
+    QueryBudget("POST", "/records/", 20),
+    QueryBudget("GET", "/records/", 3),
+    QueryBudget("GET", "/records/search", 3),
+    QueryBudget("GET", "/records/{record_id}", 2),
+    QueryBudget("GET", "/records/{record_id}/similar", 8),
+    QueryBudget("DELETE", "/records/{record_id}", 14),
+    QueryBudget("GET", "/planet/state", 4),
+    QueryBudget("GET", "/planet/states", 4),
+    QueryBudget("GET", "/planet/history", 3),
+    QueryBudget("GET", "/planet/stats", 3),
+]
+
+
+@dataclass
+class QueryStats:
+    """单个请求的查询统计"""
+    method: str
+    scope: dict
+    count: int = 0
+    seconds: float = 0.0
+    budget: Optional[int] = None
+    budget_resolved: bool = False
+    statements: List[str] = field(default_factory=list)
+
+    def resolve_budget(self, budgets: List[QueryBudget]) -> Optional[int]:
+        """第一次查询时按已匹配的路由确定预算（此时路由已解析）"""
+        if not self.budget_resolved:
+            self.budget_resolved = True
+            route = self.scope.get("route")
+            path = getattr(route, "path", None)
+            if path is not None:
+                if path.startswith(settings.API_V1_PREFIX):
+                    path = path[len(settings.API_V1_PREFIX):]
+                for budget in budgets:
+                    if budget.method == self.method and budget.path == path:
+                        self.budget = budget.max_queries
+                        break
+                else:
+                    self.budget = settings.QUERY_BUDGET_DEFAULT
+        return self.budget
+
+
+# 当前请求的查询统计；存可变对象，线程池里执行的同步依赖也计入同一个请求
+_request_queries: ContextVar[Optional[QueryStats]] = ContextVar("request_queries", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """当前请求的查询统计（不在请求内时为 None）"""
+    return _request_queries.get()
+
+
+def _redact(parameters):
+    if isinstance(parameters, dict):
+        return {
+            key: f"<redacted {type(value).__name__}>"
+            if value is not None and any(part in str(key).lower() for part in REDACTED_PARAM_NAMES)
+            else value
+            for key, value in parameters.items()
+        }
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(item) if isinstance(item, (dict, list, tuple)) else item for item in parameters]
+    return parameters
+
+
+def _format_params(parameters) -> str:
+    text = repr(_redact(parameters))
+    if len(text) > MAX_PARAMS_LOG_LENGTH:
+        text = text[:MAX_PARAMS_LOG_LENGTH] + "..."
+    return text
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """
+    在同一连接、同一事务内取执行计划（不实际执行）
+
+    放在保存点里：EXPLAIN 出错时只回滚保存点，不会让请求的事务进入 aborted 状态
+    """
+    if not statement.lstrip().lower().startswith(EXPLAINABLE_PREFIXES):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT query_monitor_explain")
+        try:
+            cursor.execute("EXPLAIN " + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute("RELEASE SAVEPOINT query_monitor_explain")
+            return plan
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT query_monitor_explain")
+            return f"<EXPLAIN failed: {type(e).__name__}: {e}>"
+    except Exception as e:
+        # 连接不在事务中等情况，放弃执行计划
+        return f"<EXPLAIN unavailable: {type(e).__name__}>"
+    finally:
+        cursor.close()
+
+
+def _log_slow_query(conn, statement: str, parameters, executemany: bool, elapsed: float) -> None:
+    message = f"Slow query ({elapsed * 1000:.1f}ms): {statement}"
+    if settings.QUERY_LOG_PARAMETERS:
+        message += f"\nParameters: {_format_params(parameters)}"
+    if settings.QUERY_SLOW_EXPLAIN and not executemany:
+        plan = _explain(conn, statement, parameters)
+        if plan:
+            message += f"\nPlan:\n{plan}"
+    logger.warning(message)
+
+
+def instrument_queries(engine: Engine, budgets: Optional[List[QueryBudget]] = None) -> None:
+    """挂载查询计数、慢查询日志和查询预算检查"""
+    budgets = DEFAULT_QUERY_BUDGETS if budgets is None else budgets
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        stats = _request_queries.get()
+        if stats is not None:
+            stats.count += 1
+            if settings.QUERY_BUDGET_MODE != "off":
+                stats.statements.append(statement)
+                budget = stats.resolve_budget(budgets)
+                if budget is not None and stats.count == budget + 1:
+                    route = getattr(stats.scope.get("route"), "path", stats.scope["path"])
+                    detail = (
+                        f"{stats.method} {route} exceeded its query budget of {budget}; queries so far:\n"
+                        + "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(stats.statements))
+                    )
+                    if settings.QUERY_BUDGET_MODE == "raise":
+                        raise QueryBudgetExceeded(detail)
+                    logger.warning(detail)
+        conn.info.setdefault("query_monitor_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_monitor_started"].pop()
+        stats = _request_queries.get()
+        if stats is not None:
+            stats.seconds += elapsed
+        threshold = settings.QUERY_SLOW_THRESHOLD_MS
+        if threshold > 0 and elapsed * 1000 >= threshold:
+            _log_slow_query(conn, statement, parameters, executemany, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        if context.connection is not None:
+            started = context.connection.info.get("query_monitor_started")
+            if started:
+                started.pop()
+
+
+class QueryMonitorMiddleware:
+    """为每个请求建立查询统计，结束时记录指标，按需写入响应头"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(method=scope["method"], scope=scope)
+        token = _request_queries.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            # 普通响应在端点执行完后才开始发送，此时统计已完整；流式响应只统计到开始发送时
+            if message["type"] == "http.response.start" and settings.QUERY_STATS_HEADER:
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Query-Count", str(stats.count))
+                headers.append("Server-Timing", f"db;dur={stats.seconds * 1000:.1f};desc=\"{stats.count} queries\"")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_queries.reset(token)
+            if settings.METRICS_ENABLED:
+                from app.core.metrics import REQUEST_DB_QUERIES, UNMATCHED_ROUTE
+                route_path = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+                REQUEST_DB_QUERIES.labels(route_path).observe(stats.count)
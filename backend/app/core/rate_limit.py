@@ -0,0 +1,330 @@
+"""
+Rate limiting - 限流器
+
+- SlidingWindowLimiter：滑动窗口计数（登录防爆破）
+- TokenBucketLimiter：令牌桶（全局请求限流，按用户 + 按路由预算）
+- 默认使用 Redis（Lua 脚本保证原子性，多 worker 共享）
+- Redis 不可用或 RATE_LIMIT_BACKEND=memory 时使用进程内实现
+"""
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import get_redis, redis_available, mark_redis_unavailable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimitResult:
+    """一次限流判定的结果"""
+    allowed: bool
+    remaining: int
+    retry_after: int = 0  # 被拒绝时建议的重试等待秒数
+
+
+# KEYS[1] = 计数 key
+# ARGV = now_ms, window_ms, limit, member
+# 返回 {allowed, count, retry_after_ms}
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count >= limit then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    local retry_after = window
+    if oldest[2] then
+        retry_after = tonumber(oldest[2]) + window - now
+    end
+    return {0, count, retry_after}
+end
+
+redis.call('ZADD', key, now, ARGV[4])
+redis.call('PEXPIRE', key, window)
+return {1, count + 1, 0}
+"""
+
+
+class MemorySlidingWindow:
+    """
+    进程内滑动窗口（测试 / 单 worker / Redis 降级使用）
+
+    key 按最近一次计入的时间排序：每次 hit 从最旧的一端清理窗口已过期的 key，
+    超过 max_keys 时再淘汰最久没有计入的 key，轮换 IP / 邮箱也无法让内存无限增长
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self._hits: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self.max_keys = max_keys
+
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        async with self._lock:
+            now = time.monotonic()
+            self._evict(now, window)
+            hits = self._hits.get(key)
+            if hits is None:
+                if len(self._hits) >= self.max_keys:
+                    self._hits.popitem(last=False)
+                hits = self._hits[key] = deque()
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+
+            if len(hits) >= limit:
+                retry_after = hits[0] + window - now
+                return RateLimitResult(False, 0, max(1, int(retry_after + 0.999)))
+
+            hits.append(now)
+            self._hits.move_to_end(key)
+            return RateLimitResult(True, limit - len(hits))
+
+    def _evict(self, now: float, window: float) -> None:
+        """删除最近一次计入已在窗口之外的 key（即已清空的窗口）"""
+        while self._hits:
+            key, hits = next(iter(self._hits.items()))
+            if hits and hits[-1] > now - window:
+                break
+            del self._hits[key]
+
+    async def reset(self, key: str) -> None:
+        async with self._lock:
+            self._hits.pop(key, None)
+
+    def clear(self) -> None:
+        """清空所有计数（测试用）"""
+        self._hits.clear()
+
+
+class SlidingWindowLimiter:
+    """
+    滑动窗口限流器
+
+    每次 hit() 原子地「清理过期记录 → 计数 → 未超限则记录本次」，
+    超限的请求不计入窗口，因此窗口会正常滑动释放
+    """
+
+    def __init__(self, prefix: str, limit: int, window_seconds: int, backend: Optional[str] = None):
+        self.prefix = prefix
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.backend = (backend or settings.RATE_LIMIT_BACKEND).lower()
+        self._memory = MemorySlidingWindow()
+        self._script = None
+
+    def _key(self, identifier: str) -> str:
+        return f"ratelimit:{self.prefix}:{identifier}"
+
+    async def _redis_hit(self, key: str) -> RateLimitResult:
+        client = await get_redis()
+        if self._script is None:
+            self._script = client.register_script(SLIDING_WINDOW_LUA)
+
+        now_ms = int(time.time() * 1000)
+        window_ms = self.window_seconds * 1000
+        allowed, count, retry_after_ms = await self._script(
+            keys=[key],
+            args=[now_ms, window_ms, self.limit, f"{now_ms}-{uuid.uuid4().hex[:8]}"],
+        )
+        if allowed:
+            return RateLimitResult(True, max(self.limit - int(count), 0))
+        return RateLimitResult(False, 0, max(1, int((int(retry_after_ms) + 999) // 1000)))
+
+    def _use_redis(self) -> bool:
+        return self.backend == "redis" and redis_available()
+
+    async def hit(self, identifier: str) -> RateLimitResult:
+        """记录一次尝试并返回是否放行"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return RateLimitResult(True, self.limit)
+
+        key = self._key(identifier)
+        if self._use_redis():
+            try:
+                return await self._redis_hit(key)
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+
+        return await self._memory.hit(key, self.limit, self.window_seconds)
+
+    async def reset(self, identifier: str) -> None:
+        """清除某个标识的计数（如登录成功后清除该邮箱的失败记录）"""
+        key = self._key(identifier)
+        await self._memory.reset(key)
+        if self._use_redis():
+            try:
+                client = await get_redis()
+                await client.delete(key)
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+
+
+# KEYS = 各令牌桶 key
+# ARGV = now_ms, 然后每个桶依次为 capacity, refill_per_ms
+# 所有桶都有令牌时才一起扣减（全有或全无），返回 {allowed, remaining, retry_after_ms}
+TOKEN_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local tokens = {}
+local retry_after = 0
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local data = redis.call('HMGET', key, 'tokens', 'ts')
+    local current = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    current = math.min(capacity, current + math.max(0, now - ts) * rate)
+    if current < 1 then
+        retry_after = math.max(retry_after, (1 - current) / rate)
+    end
+    tokens[i] = current
+end
+
+if retry_after > 0 then
+    return {0, 0, math.ceil(retry_after)}
+end
+
+local remaining = -1
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local left = tokens[i] - 1
+    redis.call('HSET', key, 'tokens', tostring(left), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate))
+    if remaining < 0 or left < remaining then
+        remaining = left
+    end
+end
+return {1, math.floor(remaining), 0}
+"""
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """令牌桶规格：容量（允许的突发量）和每秒补充的令牌数"""
+    name: str
+    capacity: int
+    refill_per_second: float
+
+
+class MemoryTokenBuckets:
+    """进程内令牌桶（测试 / 单 worker / Redis 降级使用）"""
+
+    def __init__(self, max_keys: int = 10000):
+        self._state: Dict[str, Tuple[float, float]] = {}
+        self.max_keys = max_keys
+
+    def take(self, buckets: List[Tuple[str, Bucket]]) -> RateLimitResult:
+        now = time.monotonic()
+        levels = []
+        retry_after = 0.0
+        for key, bucket in buckets:
+            tokens, ts = self._state.get(key, (bucket.capacity, now))
+            tokens = min(bucket.capacity, tokens + (now - ts) * bucket.refill_per_second)
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / bucket.refill_per_second)
+            levels.append(tokens)
+
+        if retry_after > 0:
+            return RateLimitResult(False, 0, max(1, int(retry_after + 0.999)))
+
+        if len(self._state) >= self.max_keys:
+            self._evict(now)
+
+        for (key, _), tokens in zip(buckets, levels):
+            self._state[key] = (tokens - 1, now)
+        return RateLimitResult(True, int(min(levels) - 1))
+
+    def _evict(self, now: float) -> None:
+        """清理一分钟内没有活动的桶，防止 key 无限增长"""
+        stale = [k for k, (_, ts) in self._state.items() if now - ts > 60]
+        for k in stale:
+            del self._state[k]
+        if len(self._state) >= self.max_keys:
+            self._state.clear()
+
+    def clear(self) -> None:
+        """清空所有桶（测试用）"""
+        self._state.clear()
+
+
+class TokenBucketLimiter:
+    """
+    令牌桶限流器
+
+    一次请求可同时消耗多个桶（如用户总预算 + 路由预算），
+    Redis 下由一个 Lua 脚本原子完成，只需一次往返
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = (backend or settings.RATE_LIMIT_BACKEND).lower()
+        self._memory = MemoryTokenBuckets()
+        self._script = None
+
+    async def _redis_take(self, buckets: List[Tuple[str, Bucket]]) -> RateLimitResult:
+        client = await get_redis()
+        if self._script is None:
+            self._script = client.register_script(TOKEN_BUCKET_LUA)
+
+        args = [int(time.time() * 1000)]
+        for _, bucket in buckets:
+            args.extend([bucket.capacity, bucket.refill_per_second / 1000])
+        allowed, remaining, retry_after_ms = await self._script(
+            keys=[key for key, _ in buckets],
+            args=args,
+        )
+        if allowed:
+            return RateLimitResult(True, int(remaining))
+        return RateLimitResult(False, 0, max(1, int((int(retry_after_ms) + 999) // 1000)))
+
+    async def take(self, identifier: str, buckets: List[Bucket]) -> RateLimitResult:
+        """为 identifier 从给定的桶中各取一个令牌"""
+        keyed = [(f"ratelimit:bucket:{b.name}:{identifier}", b) for b in buckets]
+
+        if self.backend == "redis" and redis_available():
+            try:
+                return await self._redis_take(keyed)
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+
+        return self._memory.take(keyed)
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    获取客户端 IP
+
+    TRUST_PROXY_HEADERS 开启时取 X-Forwarded-For 从右数第 TRUSTED_PROXY_COUNT 个值：
+    每层代理在末尾追加它看到的对端地址，右侧这些由可信代理写入，左侧的可被客户端伪造。
+    值的个数少于代理层数时（请求未经过全部代理）使用直连地址
+    """
+    if settings.TRUST_PROXY_HEADERS:
+        forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+        depth = max(1, settings.TRUSTED_PROXY_COUNT)
+        if len(forwarded) >= depth:
+            return forwarded[-depth]
+    return request.client.host if request.client else "unknown"
+
+
+# 登录限流器
+login_ip_limiter = SlidingWindowLimiter(
+    "login:ip",
+    settings.LOGIN_RATE_LIMIT_PER_IP,
+    settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
+login_email_limiter = SlidingWindowLimiter(
+    "login:email",
+    settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+    settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
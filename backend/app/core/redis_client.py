@@ -1,12 +1,21 @@
 """
 Redis client configuration
 """
+import time
+import logging
 import redis.asyncio as redis
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Redis connection pool
 redis_client = None
 
+# Redis 不可用时的熔断截止时间（monotonic 秒），期间各模块直接走进程内降级实现
+_unavailable_until = 0.0
+# 本进程观察到的 Redis 调用失败次数（恢复后据此判断期间是否发生过故障）
+_failures = 0
+
 
 async def get_redis():
     """Get Redis client instance"""
@@ -15,15 +24,39 @@ async def get_redis():
         redis_client = await redis.from_url(
             settings.REDIS_URL,
             encoding="utf-8",
-            decode_responses=True
+            decode_responses=True,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
         )
     return redis_client
 
 
+def redis_available() -> bool:
+    """Redis 是否可用（最近一次失败后的冷却期内视为不可用）"""
+    return time.monotonic() >= _unavailable_until
+
+
+def mark_redis_unavailable(error: Exception = None) -> None:
+    """
+    记录 Redis 调用失败，进入冷却期
+
+    冷却期内调用方应直接使用进程内降级实现，避免每个请求都等待连接超时
+    """
+    global _unavailable_until, _failures
+    _failures += 1
+    if redis_available():
+        logger.warning(f"Redis unavailable, falling back to in-process state: {type(error).__name__}")
+    _unavailable_until = time.monotonic() + settings.REDIS_RETRY_COOLDOWN_SECONDS
+
+
+def redis_failures() -> int:
+    """本进程累计的 Redis 调用失败次数"""
+    return _failures
+
+
 async def close_redis():
     """Close Redis connection"""
     global redis_client
     if redis_client:
         await redis_client.close()
         redis_client = None
-
@@ -1,12 +1,23 @@
 """
 Security utilities for authentication
 """
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.metrics import track
+import logging
 import secrets
+import time
+
+logger = logging.getLogger(__name__)
+
+try:
+    import jwt as pyjwt
+except ImportError:  # PyJWT 是可选依赖
+    pyjwt = None
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -14,12 +25,14 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    with track("bcrypt"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    with track("bcrypt"):
+        return pwd_context.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -44,15 +57,87 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
-def decode_token(token: str) -> Optional[dict]:
-    """Decode and verify JWT token"""
+def _decode_jose(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
     except JWTError:
         return None
 
 
+def _decode_pyjwt(token: str) -> Optional[dict]:
+    try:
+        return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except pyjwt.PyJWTError:
+        return None
+
+
+def _select_decoder():
+    if settings.JWT_BACKEND.lower() == "pyjwt":
+        if pyjwt is not None:
+            return _decode_pyjwt
+        logger.warning("JWT_BACKEND=pyjwt but PyJWT is not installed, using python-jose")
+    return _decode_jose
+
+
+_decode = _select_decoder()
+
+
+class TokenCache:
+    """
+    已验证 token 的 LRU + TTL 缓存
+
+    同一个 access token 在一次会话中会被反复携带，
+    缓存命中时跳过 JWT 解析和签名校验；缓存有效期不超过 token 自身的 exp
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if time.time() >= expires_at:
+            self._entries.pop(token, None)
+            return None
+        self._entries.move_to_end(token)
+        return payload
+
+    def set(self, token: str, payload: dict) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        self._entries[token] = (payload, expires_at)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+token_cache = TokenCache(settings.JWT_CACHE_SIZE, settings.JWT_CACHE_TTL_SECONDS)
+
+
+def decode_token(token: str) -> Optional[dict]:
+    """Decode and verify JWT token (verified claims are cached until exp)"""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return dict(payload)
+
+    payload = _decode(token)
+    if payload is not None:
+        token_cache.set(token, payload)
+        return dict(payload)
+    return None
+
+
 def generate_verification_token() -> str:
     """Generate a secure random verification token"""
     return secrets.token_urlsafe(32)
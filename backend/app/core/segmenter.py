@@ -0,0 +1,116 @@
+"""
+Segmenter - 中文分词（jieba）
+"""
+from typing import List, Optional
+from app.core.config import settings
+import jieba
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# jieba 默认把日志打到 stderr，交给应用日志统一处理
+jieba.setLogLevel(logging.WARNING)
+
+# 常见虚词、代词、语气词等，不参与关键词和主题计算
+STOPWORDS = frozenset("""
+的 了 着 过 是 在 有 和 与 及 或 而 但 就 都 也 还 又 再 才 很 太 更 最 非常 比较 一些 一点 一下 一个 一种 一样
+我 你 他 她 它 我们 你们 他们 她们 它们 自己 大家 人家 别人 这 那 这个 那个 这些 那些 这里 那里 这样 那样 这么 那么
+什么 怎么 怎样 为什么 哪 哪里 哪个 谁 多少 几 吗 呢 吧 啊 呀 哦 嗯 哈 啦 嘛 么 呗 哎 唉 诶
+不 没 没有 不是 不会 不能 不要 可以 可能 应该 需要 能 会 要 想 让 把 被 给 对 向 从 到 为 以 于 跟 比 像
+因为 所以 如果 虽然 但是 然后 而且 或者 还是 只是 就是 不过 其实 已经 正在 曾经 一直 总是 终于 突然 今天 明天 昨天
+现在 时候 时间 之后 之前 以后 以前 后来 刚才 马上 一起 一边 真的 觉得 感觉 知道 事情 东西 地方 方面 问题
+早上 上午 中午 下午 晚上 今晚 周末 下周 上周 最近 开始 继续 打算 准备 有点 有些 一下子 好像 如何 还有 想到 发现
+the a an and or but of to in on at for with is are was were be been it this that i you he she we they my your
+""".split())
+
+_tokenizer: Optional[jieba.Tokenizer] = None
+_lock = threading.Lock()
+
+
+def init_segmenter() -> jieba.Tokenizer:
+    """
+    加载分词词典（应用启动时调用一次，避免第一个写请求承担约 1 秒的加载时间）
+
+    SEGMENTER_USER_DICT 指向自定义词典时一并加载（格式同 jieba：词 词频 词性，每行一个）
+    """
+    global _tokenizer
+    with _lock:
+        if _tokenizer is None:
+            started = time.perf_counter()
+            tokenizer = jieba.Tokenizer()
+            tokenizer.initialize()
+            if settings.SEGMENTER_USER_DICT:
+                if os.path.exists(settings.SEGMENTER_USER_DICT):
+                    tokenizer.load_userdict(settings.SEGMENTER_USER_DICT)
+                else:
+                    logger.warning(f"Segmenter user dict not found: {settings.SEGMENTER_USER_DICT}")
+            _tokenizer = tokenizer
+            logger.info(f"Segmenter dictionary loaded in {time.perf_counter() - started:.2f}s")
+    return _tokenizer
+
+
+def get_tokenizer() -> jieba.Tokenizer:
+    """分词器（未在启动时加载的进程，如脚本，首次调用时加载）"""
+    return _tokenizer or init_segmenter()
+
+
+def is_cjk(ch: str) -> bool:
+    return "一" <= ch <= "鿿"
+
+
+def is_term(token: str) -> bool:
+    """是否为有意义的词：至少两个字符的中文词或英文单词，排除停用词、数字和标点"""
+    if len(token) < 2 or token in STOPWORDS:
+        return False
+    if any(is_cjk(ch) for ch in token):
+        return all(is_cjk(ch) or ch.isalnum() for ch in token)
+    return token.isascii() and token.isalpha()
+
+
+def tokenize(text: str, search: bool = False) -> List[str]:
+    """
+    分词并过滤，保留原文顺序（可重复）
+
+    Args:
+        search: 搜索引擎模式，长词额外切出其中的短词（如"跑步机" → "跑步", "跑步机"），
+                短文本之间更容易有共同词，用于语料统计和主题聚类
+
+    Returns:
+        ["工作", "项目", "进度", ...]，英文统一小写
+    """
+    if not text:
+        return []
+    tokenizer = get_tokenizer()
+    words = tokenizer.lcut_for_search(text) if search else tokenizer.lcut(text)
+    tokens = []
+    for token in words:
+        token = token.strip().lower()
+        if is_term(token):
+            tokens.append(token)
+    return tokens
+
+
+def search_terms(text: str) -> List[str]:
+    """
+    全文检索用的词项（写入 tsvector / 构造查询共用，保证两边切分一致）
+
+    搜索引擎模式分词，保留单字中文词；三个字及以上的中文词额外加入相邻二字组，
+    使"三体"能匹配到被整体切分的"读三体"
+    """
+    if not text:
+        return []
+    terms = []
+    for token in get_tokenizer().lcut_for_search(text):
+        token = token.strip().lower()
+        if not token or token in STOPWORDS:
+            continue
+        if all(is_cjk(ch) for ch in token):
+            terms.append(token)
+            if len(token) >= 3:
+                terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+        elif token.isalnum():
+            terms.append(token)
+    return terms
@@ -0,0 +1,51 @@
+"""
+Timezone helpers - 按用户时区划分自然日
+"""
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = "UTC"
+
+
+def is_valid_timezone(name: str) -> bool:
+    """是否为合法的 IANA 时区名，如 "Asia/Shanghai" """
+    try:
+        ZoneInfo(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=256)
+def get_zone(name: Optional[str]) -> ZoneInfo:
+    """时区名 → ZoneInfo，非法或为空时使用 UTC"""
+    if name and is_valid_timezone(name):
+        return ZoneInfo(name)
+    return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def local_today(tz_name: Optional[str]) -> date:
+    """用户时区下的今天"""
+    return datetime.now(get_zone(tz_name)).date()
+
+
+def local_date(moment: datetime, tz_name: Optional[str]) -> date:
+    """某个时间点在用户时区下属于哪一天（naive 时间按 UTC 处理）"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=ZoneInfo(DEFAULT_TIMEZONE))
+    return moment.astimezone(get_zone(tz_name)).date()
+
+
+def day_range(start_date: date, end_date: date, tz_name: Optional[str]) -> Tuple[datetime, datetime]:
+    """
+    用户时区下 [start_date, end_date] 对应的时间区间
+
+    Returns:
+        (起始时刻, 结束时刻)，左闭右开，均为带时区的时间，可直接用于 created_at 范围过滤
+    """
+    zone = get_zone(tz_name)
+    start = datetime.combine(start_date, time.min, tzinfo=zone)
+    end = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=zone)
+    return start, end
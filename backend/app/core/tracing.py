@@ -0,0 +1,114 @@
+"""
+Tracing - OpenTelemetry 链路追踪
+
+TRACING_ENABLED 开启后：
+- FastAPI 路由、SQLAlchemy 查询、Redis 命令自动生成 span
+- 情感分析、语音转写、记录创建的各阶段手动埋点（span()）
+- 导出方式：otlp（HTTP/protobuf，发往 collector）、console（标准输出）、
+  file（每行一个 JSON span，便于测试断言）
+- 头部采样：按 TRACING_SAMPLE_RATIO 对新 trace 采样，上游传入的 traceparent 沿用其采样决定；
+  未采样的 span 不记录属性也不导出，开销可忽略
+
+未安装 opentelemetry 时 span() 退化为空操作
+"""
+from contextlib import contextmanager
+from typing import Dict, Optional
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace
+except ImportError:  # opentelemetry 是可选依赖
+    trace = None
+
+_provider = None
+
+# 不追踪的路径（逗号分隔，前缀匹配）
+EXCLUDED_URLS = "/metrics,/health"
+
+
+def _build_exporter():
+    exporter = settings.TRACING_EXPORTER.lower()
+    if exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    if exporter == "file":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        out = open(settings.TRACING_FILE_PATH, "a", encoding="utf-8")
+        return ConsoleSpanExporter(out=out, formatter=lambda s: s.to_json(indent=None) + "\n")
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT or None)
+
+
+def setup_tracing(app, engine) -> bool:
+    """
+    初始化追踪并为 FastAPI / SQLAlchemy / Redis 打点（应用创建时调用一次）
+
+    Returns:
+        是否已启用
+    """
+    global _provider
+    if not settings.TRACING_ENABLED or _provider is not None:
+        return _provider is not None
+    try:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        from opentelemetry.instrumentation.redis import RedisInstrumentor
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError as e:
+        logger.warning(f"Tracing disabled, opentelemetry packages not installed: {e}")
+        return False
+
+    provider = TracerProvider(
+        resource=Resource.create({
+            "service.name": settings.TRACING_SERVICE_NAME,
+            "service.version": settings.APP_VERSION,
+            "deployment.environment": settings.ENVIRONMENT,
+        }),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    exporter = _build_exporter()
+    # console 直接输出便于调试，其余批量异步导出，不阻塞请求
+    if settings.TRACING_EXPORTER.lower() == "console":
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+    else:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=provider, excluded_urls=EXCLUDED_URLS)
+    SQLAlchemyInstrumentor().instrument(engine=engine, tracer_provider=provider)
+    RedisInstrumentor().instrument(tracer_provider=provider)
+    logger.info(
+        f"Tracing enabled: exporter={settings.TRACING_EXPORTER}, sample_ratio={settings.TRACING_SAMPLE_RATIO}"
+    )
+    return True
+
+
+def shutdown_tracing() -> None:
+    """导出缓冲中的 span 并关闭（应用退出时调用）"""
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict] = None):
+    """
+    手动埋点，可包住 await；块内抛出的异常会记录到 span 上
+
+        with span("emotion.analyze", {"ai.provider": provider}):
+            ...
+    """
+    if trace is None:
+        yield None
+        return
+    with trace.get_tracer("stellar-journal").start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
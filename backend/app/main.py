@@ -1,10 +1,26 @@
 """
 FastAPI Application Entry Point
 """
-from fastapi import FastAPI
+import secrets
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import MetricsMiddleware, instrument_engine, metrics_response
+from app.core.loop_monitor import loop_monitor
+from app.core.profiler import RequestProfilerMiddleware
+from app.core.query_monitor import QueryMonitorMiddleware, instrument_queries
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.core.middleware import RateLimitMiddleware
+from app.core.redis_client import close_redis
+from app.core.segmenter import init_segmenter
+from app.services.embedding_service import embedding_service
 from app.api.v1 import api_router
+from app.services.event_service import event_service
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -15,6 +31,17 @@ app = FastAPI(
     redoc_url="/redoc" if settings.DEBUG else None,
 )
 
+# 单请求 cProfile（仅非生产环境，请求带 X-Profile 头时生效）
+if settings.PROFILING_ENABLED and settings.ENVIRONMENT != "production":
+    app.add_middleware(RequestProfilerMiddleware)
+
+# Query monitor（只统计路由处理过程中的 SQL）
+app.add_middleware(QueryMonitorMiddleware)
+instrument_queries(engine)
+
+# Rate limiting middleware（位于 CORS 内层，429 响应也能带上 CORS 头）
+app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -26,10 +53,35 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Metrics middleware（最后注册即最外层，限流拒绝和 CORS 预检也计入请求耗时）
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+
+# Tracing（FastAPI / SQLAlchemy / Redis 自动埋点，需在第一个请求前完成）
+setup_tracing(app, engine)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 
+@app.on_event("startup")
+async def startup():
+    """预加载分词词典和语义向量模型（每个 worker 一次），启动事件循环监控"""
+    init_segmenter()
+    embedding_service.init_embedder()
+    loop_monitor.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """释放实时事件订阅和 Redis 连接，导出剩余的追踪数据"""
+    await loop_monitor.stop()
+    await event_service.close()
+    await close_redis()
+    shutdown_tracing()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -57,10 +109,25 @@ async def health_check():
     }
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(authorization: Optional[str] = Header(None)):
+        """Prometheus 指标（配置了 METRICS_TOKEN 时需带 Bearer token）"""
+        if settings.METRICS_TOKEN and not secrets.compare_digest(
+            (authorization or "").encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="无效的指标访问令牌",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return metrics_response()
+
+
 @app.post("/api/v1/test")
 async def test_endpoint(data: dict):
     """测试端点 - 不需要数据库"""
-    print(f"收到POST请求: {data}")  # 在终端打印
+    logger.info(f"Test endpoint received: {data}")
     return {"success": True, "received": data}
 
 
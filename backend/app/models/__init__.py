@@ -1,6 +1,8 @@
 """Database models"""
 from app.models.record import Record
 from app.models.user import User
+from app.models.user_stats import UserStats
+from app.models.user_corpus import UserCorpus, UserTermFreq
+from app.models.theme_cluster import ThemeCluster
 
-__all__ = ["Record", "User"]
-
+__all__ = ["Record", "User", "UserStats", "UserCorpus", "UserTermFreq", "ThemeCluster"]
@@ -1,12 +1,14 @@
 """
 Record model - 记录模型（心情、灵感、思考）
 """
-from sqlalchemy import Column, String, DateTime, Float, Text, Enum as SQLEnum, ForeignKey, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Float, Text, Enum as SQLEnum, ForeignKey, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from pgvector.sqlalchemy import Vector
 import uuid
 import enum
+from app.core.config import settings
 from app.core.database import Base
 
 
@@ -20,6 +22,20 @@ class RecordType(enum.Enum):
 class Record(Base):
     """记录表"""
     __tablename__ = "records"
+    __table_args__ = (
+        # 按用户 + 时间范围查询（星球状态、时光轴、历史）走此复合索引
+        Index("ix_records_user_id_created_at", "user_id", "created_at"),
+        # 全文检索：检索总带 user_id 条件，btree_gin 复合索引只扫描该用户的匹配项，
+        # 常见词的耗时与全表中匹配的记录数无关
+        Index("ix_records_user_id_search_vector", "user_id", "search_vector", postgresql_using="gin"),
+        # 相似记录检索（余弦距离）
+        Index(
+            "ix_records_embedding", "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"}
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -66,6 +82,12 @@ class Record(Base):
     }
     """
     
+    # 全文检索词项（jieba 分词后以 simple 配置生成，见 search_service），默认不随记录加载
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+    
+    # 归一化的语义向量（见 embedding_service），默认不随记录加载
+    embedding = deferred(Column(Vector(settings.EMBEDDING_DIM), nullable=True))
+    
     # 时间戳
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,33 @@
+"""
+ThemeCluster model - 思考主题聚类（每个主题对应星球上的一棵树）
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+import uuid
+from app.core.config import settings
+from app.core.database import Base
+
+
+class ThemeCluster(Base):
+    """主题聚类表"""
+    __tablename__ = "theme_clusters"
+    __table_args__ = (
+        UniqueConstraint("user_id", "label", name="uq_theme_clusters_user_id_label"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    label = Column(String(100), nullable=False)  # 主题名（写入 Record.theme_cluster）
+    centroid = Column(JSON, nullable=False)  # 归一化的 TF-IDF 质心，如 {"工作": 0.62, "项目": 0.48}，用于生成主题名
+    embedding = Column(Vector(settings.EMBEDDING_DIM), nullable=True)  # 语义向量质心，用于归类
+    size = Column(Integer, nullable=False, default=0)  # 主题下的记录数
+    position = Column(JSON, nullable=True)  # 树在星球表面的位置 {"x", "y", "z"}
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<ThemeCluster {self.label} size={self.size}>"
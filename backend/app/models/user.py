@@ -18,8 +18,10 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
     is_email_verified = Column(Boolean, default=False)
+    is_admin = Column(Boolean, nullable=False, default=False, server_default="false")  # 可访问 /api/v1/admin 接口，由 scripts/grant_admin.py 授予
     verification_token = Column(String(255), nullable=True)
     verification_token_expires = Column(DateTime(timezone=True), nullable=True)
+    timezone = Column(String(64), nullable=False, default="UTC", server_default="UTC")  # IANA 时区名，按用户本地日期划分星球的"一天"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -0,0 +1,34 @@
+"""
+UserCorpus model - 用户语料统计（用于 TF-IDF）
+
+user_corpus 每个用户一行，只保存记录数；各词的文档频率存在 user_term_freq，
+每个 (用户, 词) 一行，写记录时只更新这条记录自己的词
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class UserCorpus(Base):
+    """用户语料统计表"""
+    __tablename__ = "user_corpus"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    doc_count = Column(Integer, nullable=False, default=0)  # 参与统计的记录数
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<UserCorpus {self.user_id} docs={self.doc_count}>"
+
+
+class UserTermFreq(Base):
+    """用户词频表：包含某个词的记录数"""
+    __tablename__ = "user_term_freq"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(Text, primary_key=True)
+    df = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<UserTermFreq {self.term}={self.df}>"
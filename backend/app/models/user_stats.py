@@ -0,0 +1,36 @@
+"""
+UserStats model - 用户统计汇总（每个用户一行，写记录时增量维护）
+"""
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class UserStats(Base):
+    """用户统计汇总表"""
+    __tablename__ = "user_stats"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    
+    # 记录数
+    total_records = Column(Integer, nullable=False, default=0)
+    mood_count = Column(Integer, nullable=False, default=0)
+    spark_count = Column(Integer, nullable=False, default=0)
+    thought_count = Column(Integer, nullable=False, default=0)
+    
+    # 活跃日（均为用户时区下的日期）
+    first_record_date = Column(Date, nullable=True)
+    last_active_date = Column(Date, nullable=True)
+    active_days = Column(Integer, nullable=False, default=0)  # 有记录的天数
+    current_streak = Column(Integer, nullable=False, default=0)  # 截至 last_active_date 的连续天数
+    longest_streak = Column(Integer, nullable=False, default=0)
+    
+    # 活跃分布（用户时区）
+    weekday_histogram = Column(JSON, nullable=False)  # 7 个元素，周一为 0
+    hour_histogram = Column(JSON, nullable=False)  # 24 个元素
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<UserStats {self.user_id} total={self.total_records}>"
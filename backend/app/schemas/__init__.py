@@ -1,6 +1,12 @@
 """Pydantic schemas for request/response validation"""
 from app.schemas.record import RecordCreate, RecordResponse, RecordType
-from app.schemas.planet import PlanetState, PlanetHistory
+from app.schemas.planet import (
+    PlanetState,
+    PlanetStateDelta,
+    PlanetStateRange,
+    PlanetStateRangeCompact,
+    PlanetHistory
+)
 from app.schemas.emotion import EmotionAnalysis
 
 __all__ = [
@@ -8,6 +14,9 @@ __all__ = [
     "RecordResponse", 
     "RecordType",
     "PlanetState",
+    "PlanetStateDelta",
+    "PlanetStateRange",
+    "PlanetStateRangeCompact",
     "PlanetHistory",
     "EmotionAnalysis"
 ]
@@ -4,14 +4,22 @@ Authentication schemas
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional
 from datetime import datetime
+from app.core.timezone import is_valid_timezone
 import uuid
 
 
+def _check_timezone(v: Optional[str]) -> Optional[str]:
+    if v is not None and not is_valid_timezone(v):
+        raise ValueError("无效的时区，请使用 IANA 时区名，如 Asia/Shanghai")
+    return v
+
+
 class UserRegister(BaseModel):
     """User registration schema"""
     username: str = Field(..., min_length=3, max_length=50)
     email: EmailStr
     password: str = Field(..., min_length=8, max_length=100)
+    timezone: Optional[str] = Field(None, max_length=64, description="IANA 时区名，默认 UTC")
     
     @field_validator("username")
     @classmethod
@@ -30,6 +38,21 @@ class UserRegister(BaseModel):
         if not any(c.isalpha() for c in v):
             raise ValueError("密码必须包含至少一个字母")
         return v
+    
+    @field_validator("timezone")
+    @classmethod
+    def timezone_valid(cls, v):
+        return _check_timezone(v)
+
+
+class UserUpdate(BaseModel):
+    """User settings update schema"""
+    timezone: Optional[str] = Field(None, max_length=64, description="IANA 时区名")
+    
+    @field_validator("timezone")
+    @classmethod
+    def timezone_valid(cls, v):
+        return _check_timezone(v)
 
 
 class UserLogin(BaseModel):
@@ -64,6 +87,7 @@ class UserResponse(BaseModel):
     email: str
     is_active: bool
     is_email_verified: bool
+    timezone: str
     created_at: datetime
     
     model_config = {"from_attributes": True}
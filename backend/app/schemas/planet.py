@@ -51,11 +51,50 @@ class PlanetState(BaseModel):
     stars: List[StarElement] = Field(default_factory=list, description="灵感星星列表")
     trees: List[TreeElement] = Field(default_factory=list, description="思考树木列表")
     total_records: int = Field(..., description="总记录数")
+    version: Optional[int] = Field(None, description="数据版本号（用于 since 增量同步）")
+
+
+class PlanetStateDelta(BaseModel):
+    """星球状态增量（GET /planet/state?since=<version>）"""
+    date: DateType = Field(..., description="日期")
+    since: int = Field(..., description="客户端已知的版本号")
+    version: Optional[int] = Field(None, description="当前数据版本号")
+    full: bool = Field(..., description="为 true 时变更日志无法覆盖，state 为全量状态")
+    stars_added: List[StarElement] = Field(default_factory=list, description="新增的星星")
+    stars_removed: List[str] = Field(default_factory=list, description="移除的星星ID")
+    trees_changed: List[TreeElement] = Field(default_factory=list, description="新增或变化的树（按 id 覆盖）")
+    trees_removed: List[str] = Field(default_factory=list, description="移除的树ID")
+    atmosphere_color: Optional[str] = Field(None, description="大气层颜色（有变化时返回）")
+    total_records_delta: int = Field(0, description="当日记录数变化量")
+    state: Optional[PlanetState] = Field(None, description="全量状态（仅 full=true 时返回）")
+
+
+class PlanetStateRange(BaseModel):
+    """一段日期内每天的星球状态"""
+    start_date: DateType
+    end_date: DateType
+    version: Optional[int] = Field(None, description="数据版本号")
+    states: List[PlanetState] = Field(..., description="按日期升序的每日状态")
+
+
+class PlanetStateRangeCompact(BaseModel):
+    """
+    一段日期内每天的星球状态（紧凑编码，format=compact）
+    
+    days 只包含有记录的日期，每项为 [date, atmosphere_color, total_records, stars, trees]，
+    stars / trees 中的元素分别按 star_fields / tree_fields 的顺序编码为数组
+    """
+    start_date: DateType
+    end_date: DateType
+    version: Optional[int] = Field(None, description="数据版本号")
+    star_fields: List[str]
+    tree_fields: List[str]
+    days: List[list] = Field(..., description="有记录的日期")
 
 
 class PlanetHistoryItem(BaseModel):
-    """历史某一天的星球快照"""
-    date: DateType
+    """历史某一天（或某一周/月）的星球快照"""
+    date: DateType = Field(..., description="日期；按周/月聚合时为该桶的起始日期")
     atmosphere_color: str
     record_count: int
 
@@ -65,3 +104,4 @@ class PlanetHistory(BaseModel):
     history: List[PlanetHistoryItem]
     start_date: DateType
     end_date: DateType
+    resolution: str = Field("day", description="时间粒度：day / week / month")
@@ -72,3 +72,20 @@ class RecordListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+
+
+class RecordSearchResponse(BaseModel):
+    """记录搜索响应"""
+    records: List[RecordResponse]
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为空表示没有更多结果")
+
+
+class SimilarRecord(BaseModel):
+    """相似记录"""
+    record: RecordResponse
+    similarity: float = Field(..., description="语义余弦相似度，越接近 1 越相似")
+
+
+class SimilarRecordsResponse(BaseModel):
+    """相似记录列表响应"""
+    records: List[SimilarRecord]
@@ -0,0 +1,135 @@
+"""
+Corpus Service - 用户语料统计
+
+每个用户维护自己的文档频率（包含某个词的记录数），用于 TF-IDF：
+用户经常写到的词（如"工作"）权重降低，少见但具体的词权重升高。
+写记录时在同一事务内增量更新：记录数是 user_corpus 的一个计数器，
+文档频率按 (用户, 词) 存在 user_term_freq，只 upsert 这条记录自己的词，
+成本与记录长度成正比、与用户的词汇量无关。
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.user_corpus import UserCorpus, UserTermFreq
+import math
+
+SAVE_BATCH_SIZE = 1000
+
+
+@dataclass
+class CorpusSnapshot:
+    """
+    语料统计快照
+
+    重建时包含用户的全部词；写记录时只包含这条记录自己的词（调用方只需要这些词的 IDF），
+    不在 doc_freq 中的词按文档频率 0 计算
+    """
+    doc_count: int = 0
+    doc_freq: Dict[str, int] = field(default_factory=dict)
+
+    def idf(self, term: str) -> float:
+        """平滑 IDF：log((1 + N) / (1 + df)) + 1"""
+        return math.log((1 + self.doc_count) / (1 + self.doc_freq.get(term, 0))) + 1
+
+    def tfidf(self, tokens: Iterable[str]) -> Dict[str, float]:
+        """词频取对数后乘以 IDF（未归一化）"""
+        return {
+            term: (1 + math.log(count)) * self.idf(term)
+            for term, count in Counter(tokens).items()
+        }
+
+    def add(self, tokens: Iterable[str]) -> None:
+        self.doc_count += 1
+        for term in set(tokens):
+            self.doc_freq[term] = self.doc_freq.get(term, 0) + 1
+
+    def remove(self, tokens: Iterable[str]) -> None:
+        self.doc_count = max(0, self.doc_count - 1)
+        for term in set(tokens):
+            count = self.doc_freq.get(term, 0) - 1
+            if count > 0:
+                self.doc_freq[term] = count
+            else:
+                self.doc_freq.pop(term, None)
+
+
+class CorpusService:
+    """用户语料统计服务"""
+
+    def get(self, db: Session, user_id, terms: Iterable[str]) -> CorpusSnapshot:
+        """读取记录数和若干词的文档频率（不加锁）"""
+        doc_count = db.query(UserCorpus.doc_count).filter(UserCorpus.user_id == user_id).scalar() or 0
+        terms = sorted(set(terms))
+        doc_freq = {}
+        if terms:
+            doc_freq = dict(db.query(UserTermFreq.term, UserTermFreq.df).filter(
+                UserTermFreq.user_id == user_id,
+                UserTermFreq.term.in_(terms)
+            ).all())
+        return CorpusSnapshot(doc_count, doc_freq)
+
+    def save(self, db: Session, user_id, corpus: CorpusSnapshot) -> None:
+        """整体写入语料统计（重建时使用）"""
+        values = {"doc_count": corpus.doc_count, "updated_at": func.now()}
+        stmt = insert(UserCorpus).values(user_id=user_id, **values)
+        db.execute(stmt.on_conflict_do_update(index_elements=[UserCorpus.user_id], set_=values))
+        db.execute(delete(UserTermFreq).where(UserTermFreq.user_id == user_id))
+        rows = [{"user_id": user_id, "term": term, "df": df} for term, df in corpus.doc_freq.items() if df > 0]
+        for i in range(0, len(rows), SAVE_BATCH_SIZE):
+            db.execute(insert(UserTermFreq), rows[i:i + SAVE_BATCH_SIZE])
+
+    def add_document(self, db: Session, user_id, tokens: Iterable[str]) -> CorpusSnapshot:
+        """
+        新记录计入语料统计（与记录写入同一事务）
+
+        Returns:
+            计入后的语料统计（只含这条记录的词）
+        """
+        return self.add_documents(db, user_id, [tokens])
+
+    def add_documents(self, db: Session, user_id, documents: List[Iterable[str]]) -> CorpusSnapshot:
+        """
+        批量计入语料统计：记录数一条 upsert，文档频率一条多行 upsert
+
+        词按字典序写入，并发事务按相同顺序加行锁，不会互相死锁
+
+        Returns:
+            计入后的语料统计（只含这些记录的词）
+        """
+        doc_freq = Counter(term for tokens in documents for term in set(tokens))
+
+        stmt = insert(UserCorpus).values(user_id=user_id, doc_count=len(documents))
+        doc_count = db.execute(stmt.on_conflict_do_update(
+            index_elements=[UserCorpus.user_id],
+            set_={"doc_count": UserCorpus.doc_count + stmt.excluded.doc_count, "updated_at": func.now()}
+        ).returning(UserCorpus.doc_count)).scalar_one()
+
+        if not doc_freq:
+            return CorpusSnapshot(doc_count)
+        stmt = insert(UserTermFreq).values([
+            {"user_id": user_id, "term": term, "df": doc_freq[term]} for term in sorted(doc_freq)
+        ])
+        rows = db.execute(stmt.on_conflict_do_update(
+            index_elements=[UserTermFreq.user_id, UserTermFreq.term],
+            set_={"df": UserTermFreq.df + stmt.excluded.df}
+        ).returning(UserTermFreq.term, UserTermFreq.df)).all()
+        return CorpusSnapshot(doc_count, dict(rows))
+
+    def remove_document(self, db: Session, user_id, tokens: Iterable[str]) -> None:
+        """删除的记录移出语料统计（与删除同一事务），只更新这条记录的词"""
+        db.execute(update(UserCorpus).where(UserCorpus.user_id == user_id).values(
+            doc_count=func.greatest(UserCorpus.doc_count - 1, 0), updated_at=func.now()
+        ))
+        terms = sorted(set(tokens))
+        if not terms:
+            return
+        owned = (UserTermFreq.user_id == user_id, UserTermFreq.term.in_(terms))
+        db.execute(delete(UserTermFreq).where(*owned, UserTermFreq.df <= 1))
+        db.execute(update(UserTermFreq).where(*owned).values(df=UserTermFreq.df - 1))
+
+
+# 单例
+corpus_service = CorpusService()
@@ -3,9 +3,12 @@ Email service using Resend
 """
 import resend
 import html
+import logging
 from typing import Optional
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class EmailService:
     """Email service for sending verification and notification emails"""
@@ -79,11 +82,11 @@ class EmailService:
             
             # Send email
             response = resend.Emails.send(params)
-            print(f"✅ Email sent successfully to {email}, response: {response}")
+            logger.info(f"Verification email sent to {email}, response: {response}")
             return True
             
         except Exception as e:
-            print(f"❌ Failed to send verification email to {email}: {type(e).__name__}: {e}")
+            logger.error(f"Failed to send verification email to {email}: {type(e).__name__}: {e}")
             return False
     
     async def send_password_reset_email(self, email: str, username: str, token: str) -> bool:
@@ -144,7 +147,7 @@ class EmailService:
             return True
             
         except Exception as e:
-            print(f"Failed to send password reset email: {e}")
+            logger.error(f"Failed to send password reset email: {type(e).__name__}: {e}")
             return False
 
 
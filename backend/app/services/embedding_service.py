@@ -0,0 +1,119 @@
+"""
+Embedding Service - 记录的语义向量（CPU 计算）
+
+向量写入 records.embedding（pgvector，HNSW 余弦索引），
+用于相似记录检索和思考主题聚类。两种后端：
+- hashing（默认）：jieba 词项 + 汉字特征做带符号的特征哈希，无额外依赖，约 0.1ms/条
+- sentence-transformers：本地句向量模型（如 BAAI/bge-small-zh-v1.5），语义更好，
+  需安装 sentence-transformers，CPU 上约 10-30ms/条
+向量维度必须与数据库列一致（EMBEDDING_DIM），更换模型后运行 scripts/backfill_embeddings.py 重算
+"""
+from collections import Counter
+from typing import List, Optional
+from app.core.config import settings
+from app.core.segmenter import search_terms, is_cjk
+import logging
+import math
+import threading
+import time
+import zlib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 汉字特征相对词特征的权重：让"跑步"、"慢跑"、"跑量"之间也有少量重合
+CHAR_FEATURE_WEIGHT = 0.5
+
+
+class HashingEmbedder:
+    """特征哈希向量：每个特征映射到一个维度并随机取正负号，维度相同即可与模型向量共用一列"""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def _features(self, text: str) -> Counter:
+        features = Counter()
+        for term in search_terms(text):
+            features[term] += 1
+            if len(term) >= 2:
+                for ch in term:
+                    if is_cjk(ch):
+                        features["#" + ch] += CHAR_FEATURE_WEIGHT
+        return features
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self._features(text).items():
+                h = zlib.crc32(feature.encode("utf-8"))
+                weight = 1 + math.log(count) if count >= 1 else count
+                vectors[row, h % self.dim] += weight if (h >> 31) & 1 else -weight
+        return vectors
+
+
+class SentenceTransformerEmbedder:
+    """本地句向量模型（只在 CPU 上运行）"""
+
+    def __init__(self, model_name: str, dim: int):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "EMBEDDING_BACKEND=sentence-transformers 需要安装 sentence-transformers"
+            ) from e
+        self.model = SentenceTransformer(model_name, device="cpu")
+        model_dim = self.model.get_sentence_embedding_dimension()
+        if model_dim != dim:
+            raise RuntimeError(f"模型 {model_name} 的向量维度为 {model_dim}，与 EMBEDDING_DIM={dim} 不一致")
+        self.dim = dim
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=32, convert_to_numpy=True).astype(np.float32)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """按行 L2 归一化（全零行保持为零）"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class EmbeddingService:
+    """语义向量服务"""
+
+    def __init__(self):
+        self._embedder = None
+        self._lock = threading.Lock()
+
+    def init_embedder(self):
+        """加载向量模型（应用启动时调用一次；hashing 后端无需加载）"""
+        with self._lock:
+            if self._embedder is None:
+                started = time.perf_counter()
+                backend = settings.EMBEDDING_BACKEND.lower()
+                if backend == "sentence-transformers":
+                    self._embedder = SentenceTransformerEmbedder(settings.EMBEDDING_MODEL, settings.EMBEDDING_DIM)
+                else:
+                    self._embedder = HashingEmbedder(settings.EMBEDDING_DIM)
+                logger.info(f"Embedding backend {backend} ready in {time.perf_counter() - started:.2f}s")
+        return self._embedder
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        批量计算归一化向量
+
+        Returns:
+            形状为 (len(texts), EMBEDDING_DIM) 的矩阵；没有可用特征的文本为零向量
+        """
+        embedder = self._embedder or self.init_embedder()
+        if not texts:
+            return np.zeros((0, embedder.dim), dtype=np.float32)
+        return normalize_rows(embedder.embed_batch(texts))
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """单条文本的归一化向量，没有可用特征（如全是标点）时返回 None"""
+        vector = self.embed_batch([text])[0]
+        return vector if vector.any() else None
+
+
+# 单例
+embedding_service = EmbeddingService()
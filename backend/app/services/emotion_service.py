@@ -6,10 +6,16 @@ from typing import Dict, Tuple
 import openai
 from zhipuai import ZhipuAI
 from app.core.config import settings
+from app.core.metrics import AI_ERRORS, track
+from app.core.tracing import span
+from app.services.fake_ai_service import fake_ai_service
 import json
 import colorsys
+import logging
 import math
 
+logger = logging.getLogger(__name__)
+
 
 class EmotionService:
     """情感分析服务"""
@@ -18,9 +24,15 @@ class EmotionService:
         self.ai_provider = settings.AI_PROVIDER.lower()
         
         if self.ai_provider == "openai":
-            openai.api_key = settings.OPENAI_API_KEY
+            self.openai_client = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL or None
+            )
         elif self.ai_provider == "zhipu":
-            self.zhipu_client = ZhipuAI(api_key=settings.ZHIPU_API_KEY)
+            self.zhipu_client = ZhipuAI(
+                api_key=settings.ZHIPU_API_KEY,
+                base_url=settings.ZHIPU_BASE_URL or None
+            )
         
     async def analyze_emotion(self, text: str) -> Dict:
         """
@@ -60,40 +72,44 @@ class EmotionService:
 {{"valence": 0.0, "arousal": 0.0, "primary_emotion": "xxx", "emotion_scores": {{"joy": 0.0, ...}}}}
 """
             
+            messages = [
+                {"role": "system", "content": "你是一个专业的情感分析助手。"},
+                {"role": "user", "content": prompt}
+            ]
+            
             # 根据配置调用不同的 AI API
-            if self.ai_provider == "openai":
-                response = await openai.chat.completions.create(
-                    model=settings.OPENAI_MODEL_EMOTION,
-                    messages=[
-                        {"role": "system", "content": "你是一个专业的情感分析助手。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=300
-                )
-                content = response.choices[0].message.content.strip()
+            with track("llm"), span("emotion.analyze_emotion", {"ai.provider": self.ai_provider}):
+                if self.ai_provider == "openai":
+                    response = await self.openai_client.chat.completions.create(
+                        model=settings.OPENAI_MODEL_EMOTION,
+                        messages=messages,
+                        temperature=0.3,
+                        max_tokens=300
+                    )
+                    content = response.choices[0].message.content.strip()
                 
-            elif self.ai_provider == "zhipu":
-                response = self.zhipu_client.chat.completions.create(
-                    model=settings.ZHIPU_MODEL_EMOTION,
-                    messages=[
-                        {"role": "system", "content": "你是一个专业的情感分析助手。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=300
-                )
-                content = response.choices[0].message.content.strip()
-            else:
-                raise ValueError(f"不支持的 AI 提供商: {self.ai_provider}")
-            
-            # 解析返回结果
-            emotion_data = json.loads(content)
+                elif self.ai_provider == "zhipu":
+                    response = self.zhipu_client.chat.completions.create(
+                        model=settings.ZHIPU_MODEL_EMOTION,
+                        messages=messages,
+                        temperature=0.3,
+                        max_tokens=300
+                    )
+                    content = response.choices[0].message.content.strip()
+                
+                elif self.ai_provider == "fake":
+                    content = await fake_ai_service.chat_completion(messages)
+                else:
+                    raise ValueError(f"不支持的 AI 提供商: {self.ai_provider}")
+                
+                # 解析返回结果（解析失败同样记录在 span 上）
+                emotion_data = json.loads(content)
             
             return emotion_data
             
         except Exception as e:
-            print(f"Emotion analysis error: {e}")
+            AI_ERRORS.labels("llm", self.ai_provider).inc()
+            logger.warning(f"Emotion analysis error, falling back to neutral: {type(e).__name__}: {e}")
             # 降级：返回中性情感
             return {
                 "valence": 0.5,
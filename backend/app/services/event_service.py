@@ -0,0 +1,160 @@
+"""
+Event Service - 星球实时事件推送
+
+写操作发布增量事件到 Redis pub/sub（频道 planet:events:{user_id}），
+每个 worker 只持有一条 pub/sub 连接，按需订阅本进程有监听者的用户频道，
+再分发给本进程内的 SSE 连接。Redis 不可用时退化为进程内分发。
+"""
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.redis_client import get_redis, redis_available, mark_redis_unavailable
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EventService:
+    """星球事件广播服务"""
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = (backend or settings.SYNC_BACKEND).lower()
+        self._listeners: Dict[str, Set[asyncio.Queue]] = {}
+        self._pubsub = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _channel(user_id: str) -> str:
+        return f"planet:events:{user_id}"
+
+    def _use_redis(self) -> bool:
+        return self.backend == "redis" and redis_available()
+
+    async def publish(self, user_id: str, message: Dict) -> None:
+        """发布一条事件消息给该用户的所有在线连接（跨 worker）"""
+        user_id = str(user_id)
+        payload = json.dumps(message, ensure_ascii=False)
+        if self._use_redis():
+            try:
+                client = await get_redis()
+                await client.publish(self._channel(user_id), payload)
+                return
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+        self._dispatch(user_id, payload)
+
+    def _dispatch(self, user_id: str, payload: str) -> None:
+        """分发到本进程内的监听队列；消费过慢的连接丢弃最旧的消息"""
+        for queue in self._listeners.get(user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    async def _ensure_pubsub(self) -> bool:
+        if self._pubsub is not None:
+            return True
+        if not self._use_redis():
+            return False
+        try:
+            client = await get_redis()
+            self._pubsub = client.pubsub()
+            channels = [self._channel(user_id) for user_id in self._listeners]
+            if channels:
+                await self._pubsub.subscribe(*channels)
+            self._reader_task = asyncio.create_task(self._reader())
+            return True
+        except (RedisError, OSError) as e:
+            mark_redis_unavailable(e)
+            self._pubsub = None
+            return False
+
+    async def _reader(self) -> None:
+        """后台读取 Redis 订阅消息并分发到本进程"""
+        prefix = self._channel("")
+        try:
+            while self._pubsub is not None:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(0.5)
+                    continue
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message.get("type") == "message":
+                    user_id = message["channel"][len(prefix):]
+                    self._dispatch(user_id, message["data"])
+        except (RedisError, OSError) as e:
+            mark_redis_unavailable(e)
+            logger.warning("Planet event reader stopped, subscribers fall back to local delivery")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            pubsub, self._pubsub, self._reader_task = self._pubsub, None, None
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except (RedisError, OSError):
+                    pass
+
+    async def _subscribe_channel(self, user_id: str) -> None:
+        if not await self._ensure_pubsub():
+            return
+        try:
+            await self._pubsub.subscribe(self._channel(user_id))
+        except (RedisError, OSError) as e:
+            mark_redis_unavailable(e)
+
+    async def _unsubscribe_channel(self, user_id: str) -> None:
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.unsubscribe(self._channel(user_id))
+        except (RedisError, OSError) as e:
+            mark_redis_unavailable(e)
+
+    async def subscribe(self, user_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[str]]:
+        """
+        订阅某个用户的事件
+
+        Yields:
+            JSON 字符串消息；订阅生效时先 yield 一次 None，
+            之后超过 heartbeat 秒无消息时也 yield None（用于发送保活）
+        """
+        user_id = str(user_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.PLANET_EVENTS_QUEUE_SIZE)
+        listeners = self._listeners.setdefault(user_id, set())
+        listeners.add(queue)
+        if len(listeners) == 1:
+            await self._subscribe_channel(user_id)
+
+        try:
+            yield None
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # 空闲时顺便检查 Redis 订阅，故障恢复后重新订阅
+                    await self._ensure_pubsub()
+                    yield None
+        finally:
+            listeners.discard(queue)
+            if not listeners:
+                self._listeners.pop(user_id, None)
+                await self._unsubscribe_channel(user_id)
+
+    def queue_stats(self) -> Tuple[int, int]:
+        """(本进程 SSE 连接数, 各连接待发送的事件总数)，用于监控指标"""
+        queues = [queue for listeners in self._listeners.values() for queue in listeners]
+        return len(queues), sum(queue.qsize() for queue in queues)
+
+    async def close(self) -> None:
+        """关闭后台订阅（应用退出时调用）"""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+
+
+# 单例
+event_service = EventService()
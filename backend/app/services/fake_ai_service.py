@@ -0,0 +1,142 @@
+"""
+Fake AI Service - 本地替身 AI 提供商
+
+用于性能测试和离线开发，不访问真实的智谱 / OpenAI：
+- AI_PROVIDER="fake" 时 EmotionService / WhisperService 在进程内直接调用
+- scripts/fake_ai_server.py 以 HTTP 形式提供同样的 chat completions / transcriptions 接口，
+  后端配置 OPENAI_BASE_URL / ZHIPU_BASE_URL 指向它，真实 SDK 的网络、重试、解析路径都会被覆盖
+
+输出是输入的确定性函数（同一段文本总是得到同样的情感结果）；
+延迟和错误由 FAKE_AI_SEED 初始化的随机数序列产生，单个调用方时每次运行完全一致
+"""
+from typing import Dict, List
+from app.core.config import settings
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import zlib
+
+EMOTIONS = ("joy", "calm", "sadness", "anxiety", "anger", "excitement")
+
+# 关键词 → 情绪加分（命中次数越多加分越高）
+LEXICON: Dict[str, Dict[str, float]] = {
+    "开心": {"joy": 0.5, "excitement": 0.2},
+    "快乐": {"joy": 0.5},
+    "顺利": {"joy": 0.3, "calm": 0.2},
+    "期待": {"excitement": 0.4, "joy": 0.2},
+    "喜欢": {"joy": 0.4},
+    "漂亮": {"joy": 0.3, "calm": 0.1},
+    "平静": {"calm": 0.5},
+    "放松": {"calm": 0.4},
+    "安静": {"calm": 0.3},
+    "兴奋": {"excitement": 0.5},
+    "激动": {"excitement": 0.5},
+    "累": {"sadness": 0.3, "calm": -0.1},
+    "难过": {"sadness": 0.5},
+    "伤心": {"sadness": 0.5},
+    "孤独": {"sadness": 0.4},
+    "焦虑": {"anxiety": 0.5},
+    "担心": {"anxiety": 0.4},
+    "压力": {"anxiety": 0.4},
+    "烦": {"anger": 0.3, "anxiety": 0.2},
+    "生气": {"anger": 0.5},
+    "吵": {"anger": 0.4},
+    "!": {"excitement": 0.1},
+    "！": {"excitement": 0.1},
+}
+VALENCE_WEIGHTS = {"joy": 1.0, "calm": 0.6, "excitement": 0.7, "sadness": -1.0, "anxiety": -0.7, "anger": -0.9}
+AROUSAL_WEIGHTS = {"joy": 0.5, "calm": -0.8, "excitement": 1.0, "sadness": -0.4, "anxiety": 0.7, "anger": 0.9}
+
+TRANSCRIPTS = [
+    "今天天气很好，下班后去公园散了步。",
+    "刚想到一个点子，可以把每天的心情做成一张颜色日历。",
+    "最近工作压力有点大，需要好好休息一下。",
+    "和朋友吃了顿火锅，聊了很多以前的事。",
+    "读完了一本书，里面关于习惯的部分很有启发。",
+]
+
+# emotion prompt 中被分析文本的位置：文本："..."
+PROMPT_TEXT_PATTERN = re.compile(r'文本：[“"](.*?)[”"]\s*\n', re.S)
+
+
+class FakeAIError(RuntimeError):
+    """按 FAKE_AI_ERROR_RATE 注入的失败"""
+
+
+class FakeAIService:
+    """确定性的替身 AI 提供商"""
+
+    def __init__(self):
+        self._rng = random.Random(settings.FAKE_AI_SEED)
+        self._lock = threading.Lock()
+
+    def _draw(self, median_ms: float) -> tuple:
+        """从同一个随机数序列中依次取 (延迟秒数, 是否失败)"""
+        with self._lock:
+            u = self._rng.random()
+            g = self._rng.gauss(0.0, 1.0)
+            failed = self._rng.random() < settings.FAKE_AI_ERROR_RATE
+
+        spread = settings.FAKE_AI_LATENCY_SPREAD
+        distribution = settings.FAKE_AI_LATENCY_DISTRIBUTION
+        if distribution == "fixed":
+            latency = median_ms
+        elif distribution == "uniform":
+            latency = median_ms * (1 - spread + 2 * spread * u)
+        elif distribution == "lognormal":
+            latency = median_ms * math.exp(spread * g)
+        else:
+            raise ValueError(f"不支持的延迟分布: {distribution}")
+        return max(0.0, latency) / 1000, failed
+
+    async def _simulate(self, median_ms: float) -> None:
+        latency, failed = self._draw(median_ms)
+        await asyncio.sleep(latency)
+        if failed:
+            raise FakeAIError("Injected fake AI provider failure")
+
+    async def chat_completion(self, messages: List[Dict]) -> str:
+        """返回 assistant 消息内容（情感分析 JSON）"""
+        await self._simulate(settings.FAKE_AI_LATENCY_MS)
+        return self.analyze(extract_text(messages))
+
+    async def transcribe(self, audio: bytes) -> str:
+        await self._simulate(settings.FAKE_AI_TRANSCRIBE_LATENCY_MS)
+        return TRANSCRIPTS[zlib.crc32(audio) % len(TRANSCRIPTS)]
+
+    @staticmethod
+    def analyze(text: str) -> str:
+        """文本 → 情感分析 JSON 字符串（与 LLM 按 prompt 返回的格式一致）"""
+        # 基础分由文本哈希决定，保证不含关键词的文本也各不相同且结果稳定
+        seed = zlib.crc32(text.encode("utf-8"))
+        scores = {emotion: 0.1 + ((seed >> (i * 5)) & 31) / 31 * 0.3 for i, emotion in enumerate(EMOTIONS)}
+        for word, boosts in LEXICON.items():
+            hits = text.count(word)
+            if hits:
+                for emotion, boost in boosts.items():
+                    scores[emotion] += boost * min(hits, 3)
+        scores = {emotion: round(min(1.0, max(0.0, score)), 2) for emotion, score in scores.items()}
+
+        total = sum(scores.values()) or 1.0
+        valence = 0.5 + 0.5 * sum(VALENCE_WEIGHTS[e] * s for e, s in scores.items()) / total
+        arousal = 0.5 + 0.5 * sum(AROUSAL_WEIGHTS[e] * s for e, s in scores.items()) / total
+        return json.dumps({
+            "valence": round(min(1.0, max(0.0, valence)), 2),
+            "arousal": round(min(1.0, max(0.0, arousal)), 2),
+            "primary_emotion": max(EMOTIONS, key=lambda e: scores[e]),
+            "emotion_scores": scores,
+        }, ensure_ascii=False)
+
+
+def extract_text(messages: List[Dict]) -> str:
+    """取最后一条 user 消息；是情感分析 prompt 时只取其中被分析的文本"""
+    content = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    match = PROMPT_TEXT_PATTERN.search(content)
+    return match.group(1) if match else content
+
+
+# 单例
+fake_ai_service = FakeAIService()
@@ -0,0 +1,92 @@
+"""
+Keyword Service - 关键词提取
+
+分词（jieba 精确模式）后按用户自己的语料统计打分：
+- tfidf: 词频 × IDF，用户写得越少的词越能代表这条记录
+- textrank: 共现窗口构图做 PageRank，再乘以 IDF 压低用户的高频词
+单条提取只涉及内存计算，可以放在写路径上同步执行
+"""
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.segmenter import tokenize
+from app.models.record import RecordType
+from app.services.corpus_service import CorpusSnapshot, corpus_service
+
+# 各类型记录保留的关键词数
+TOP_K = {
+    RecordType.SPARK: 3,
+    RecordType.THOUGHT: 5,
+}
+
+TEXTRANK_WINDOW = 5
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 10
+
+
+class KeywordService:
+    """关键词提取服务"""
+
+    def __init__(self, method: Optional[str] = None):
+        self.method = (method or settings.KEYWORD_METHOD).lower()
+
+    def _textrank(self, tokens: List[str]) -> Dict[str, float]:
+        neighbors: Dict[str, set] = {token: set() for token in tokens}
+        for i, token in enumerate(tokens):
+            for other in tokens[i + 1:i + TEXTRANK_WINDOW]:
+                if other != token:
+                    neighbors[token].add(other)
+                    neighbors[other].add(token)
+
+        scores = {token: 1.0 for token in neighbors}
+        for _ in range(TEXTRANK_ITERATIONS):
+            scores = {
+                token: (1 - TEXTRANK_DAMPING) + TEXTRANK_DAMPING * sum(
+                    scores[other] / len(neighbors[other]) for other in linked
+                )
+                for token, linked in neighbors.items()
+            }
+        return scores
+
+    def score(self, tokens: List[str], corpus: CorpusSnapshot) -> Dict[str, float]:
+        """词 → 得分"""
+        if self.method == "textrank":
+            return {term: rank * corpus.idf(term) for term, rank in self._textrank(tokens).items()}
+        return corpus.tfidf(tokens)
+
+    def extract(self, text: str, corpus: CorpusSnapshot, top_k: int = 5) -> List[str]:
+        """
+        提取关键词
+
+        Args:
+            text: 记录内容
+            corpus: 用户语料统计（应已包含这条记录）
+            top_k: 最多返回的关键词数
+
+        Returns:
+            按得分降序的关键词，同分时按在原文中出现的先后
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        scores = self.score(tokens, corpus)
+        order = {term: i for i, term in reversed(list(enumerate(tokens)))}
+        ranked = sorted(scores, key=lambda term: (-scores[term], order[term]))
+        return ranked[:top_k]
+
+    def extract_batch(self, db: Session, user_id, texts: List[str], top_k: int = 5) -> List[List[str]]:
+        """
+        批量提取关键词（导入历史记录时使用）
+
+        所有文本先一次性计入用户语料统计（只加锁、写入一次），再逐条提取；
+        与记录写入处于同一事务，调用方负责 commit
+
+        Returns:
+            与 texts 一一对应的关键词列表
+        """
+        corpus = corpus_service.add_documents(db, user_id, [tokenize(text, search=True) for text in texts])
+        return [self.extract(text, corpus, top_k) for text in texts]
+
+
+# 单例
+keyword_service = KeywordService()
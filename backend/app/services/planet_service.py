@@ -1,13 +1,26 @@
 """
 Planet Service - 星球状态计算服务
 """
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_, or_, case, func, cast, literal, literal_column, Date, DateTime
+from app.core.timezone import day_range, get_zone, local_date, local_today
 from app.models.record import Record, RecordType
+from app.services.emotion_service import emotion_service
+from itertools import groupby
 import random
 import math
+import zlib
+
+
+COMPACT_STAR_FIELDS = ["id", "x", "y", "z", "orbit_radius", "orbit_angle", "keyword"]
+COMPACT_TREE_FIELDS = ["theme", "leaf_count", "size", "x", "y", "z"]
+
+HISTORY_RESOLUTIONS = ("day", "week", "month")
+# 周/月桶混合颜色时每个桶只取最近的心情记录：calculate_daily_emotion 的权重按 0.8^k 衰减，
+# 第 32 条之后的权重已不足 0.1%，截断不影响结果，且使返回行数与桶数成正比
+HISTORY_BLEND_MOODS = 32
 
 
 class PlanetService:
@@ -60,8 +73,8 @@ class PlanetService:
         Returns:
             {"x": 0.5, "y": 0.0, "z": 0.8}
         """
-        # 使用主题名称作为随机种子
-        seed = hash(theme) + index
+        # 使用主题名称作为随机种子（crc32 跨进程稳定，内置 hash 每个进程不同）
+        seed = zlib.crc32(theme.encode("utf-8")) + index
         random.seed(seed)
         
         # 在球面上均匀分布
@@ -79,73 +92,214 @@ class PlanetService:
             "z": round(z, 2)
         }
     
-    async def get_planet_state(self, db: Session, user_id: str, target_date: date = None) -> Dict:
+    def build_star(self, record: Record) -> Dict:
+        """灵感记录 → 星星元素"""
+        return {
+            "id": str(record.id),
+            "position": record.position_data or {},
+            "color": "#FFD700",  # 金黄色
+            "size": 0.1,
+            "keyword": record.keywords[0] if record.keywords else "灵感"
+        }
+    
+    def build_tree(self, theme: str, group: List[Record]) -> Dict:
+        """同一主题的思考记录（按时间顺序）→ 树木元素"""
+        # 树的大小基于该主题下的记录数量
+        size = 0.3 + min(len(group) * 0.1, 0.7)
+        return {
+            "id": f"tree-{theme}",
+            "position": group[0].position_data or {},
+            "theme": theme,
+            "leaf_count": len(group),
+            "size": size
+        }
+    
+    def _day_bounds(self, target_date: date, tz: Optional[str] = None):
+        """用户时区下某一天的 [起始, 结束) 时刻"""
+        return day_range(target_date, target_date, tz)
+    
+    def build_record_events(self, db: Session, record: Record, removed: bool = False, tz: Optional[str] = None) -> Dict:
+        """
+        计算一条记录创建/删除后星球的增量变化
+        
+        Args:
+            db: 数据库会话（删除场景需在提交删除之后调用）
+            record: 被创建或删除的记录
+            removed: 是否为删除
+            tz: 用户时区（IANA 名），决定记录归属哪一天
+            
+        Returns:
+            {"date": "2024-05-15", "total_records_delta": 1, "events": [...]}
+            events 元素示例：
+            {"type": "star_added", "star": {...}}
+            {"type": "star_removed", "id": "..."}
+            {"type": "tree_grew", "tree": {...}} / {"type": "tree_shrank", "tree": {...}}
+            {"type": "tree_removed", "id": "tree-xxx"}
+            {"type": "atmosphere_changed", "color": "#RRGGBB"}
+        """
+        record_date = local_date(record.created_at, tz) if record.created_at else local_today(tz)
+        start_datetime, end_datetime = self._day_bounds(record_date, tz)
+        same_day = [
+            Record.user_id == record.user_id,
+            Record.created_at >= start_datetime,
+            Record.created_at < end_datetime,
+        ]
+        events = []
+        
+        if record.type == RecordType.MOOD:
+            if removed:
+                latest = db.query(Record.color_hex).filter(
+                    *same_day,
+                    Record.type == RecordType.MOOD,
+                    Record.color_hex.isnot(None)
+                ).order_by(Record.created_at.desc()).first()
+                color = latest.color_hex if latest else "#87CEEB"
+            else:
+                color = record.color_hex or "#87CEEB"
+            events.append({"type": "atmosphere_changed", "color": color})
+        
+        elif record.type == RecordType.SPARK:
+            if removed:
+                events.append({"type": "star_removed", "id": str(record.id)})
+            else:
+                events.append({"type": "star_added", "star": self.build_star(record)})
+        
+        elif record.type == RecordType.THOUGHT:
+            theme = record.theme_cluster or "未分类"
+            theme_filter = (
+                Record.theme_cluster.is_(None) if record.theme_cluster is None
+                else Record.theme_cluster == record.theme_cluster
+            )
+            group = db.query(Record).filter(
+                *same_day,
+                Record.type == RecordType.THOUGHT,
+                theme_filter
+            ).order_by(Record.created_at).all()
+            if group:
+                events.append({
+                    "type": "tree_shrank" if removed else "tree_grew",
+                    "tree": self.build_tree(theme, group)
+                })
+            else:
+                events.append({"type": "tree_removed", "id": f"tree-{theme}"})
+        
+        return {
+            "date": record_date.isoformat(),
+            "total_records_delta": -1 if removed else 1,
+            "events": events,
+        }
+    
+    def merge_changes(self, changes: List[Dict], target_date: date) -> Dict:
+        """
+        将变更日志中某一天的增量合并为一份最小差异
+        
+        同一元素先增后删会相互抵消，树按 id 只保留最后状态
+        
+        Args:
+            changes: sync_service.changes_since 返回的变更（按版本升序）
+            target_date: 目标日期
+            
+        Returns:
+            PlanetStateDelta 的增量字段
+        """
+        day = target_date.isoformat()
+        stars_added: Dict[str, Dict] = {}
+        stars_removed = set()
+        trees_changed: Dict[str, Dict] = {}
+        trees_removed = set()
+        atmosphere_color = None
+        total_delta = 0
+        
+        for change in changes:
+            if change.get("date") != day:
+                continue
+            total_delta += change.get("total_records_delta", 0)
+            for event in change.get("events", []):
+                kind = event["type"]
+                if kind == "star_added":
+                    star = event["star"]
+                    stars_added[star["id"]] = star
+                    stars_removed.discard(star["id"])
+                elif kind == "star_removed":
+                    if stars_added.pop(event["id"], None) is None:
+                        stars_removed.add(event["id"])
+                elif kind in ("tree_grew", "tree_shrank"):
+                    tree = event["tree"]
+                    trees_changed[tree["id"]] = tree
+                    trees_removed.discard(tree["id"])
+                elif kind == "tree_removed":
+                    trees_changed.pop(event["id"], None)
+                    trees_removed.add(event["id"])
+                elif kind == "atmosphere_changed":
+                    atmosphere_color = event["color"]
+        
+        return {
+            "stars_added": list(stars_added.values()),
+            "stars_removed": sorted(stars_removed),
+            "trees_changed": list(trees_changed.values()),
+            "trees_removed": sorted(trees_removed),
+            "atmosphere_color": atmosphere_color,
+            "total_records_delta": total_delta,
+        }
+    
+    async def get_planet_state(self, db: Session, user_id: str, target_date: date = None, tz: Optional[str] = None) -> Dict:
         """
         获取星球当前状态
         
         Args:
             db: 数据库会话
             user_id: 用户ID
-            target_date: 目标日期，默认今天
+            target_date: 目标日期，默认用户时区下的今天
+            tz: 用户时区（IANA 名）
             
         Returns:
             星球状态数据
         """
         if target_date is None:
-            target_date = date.today()
+            target_date = local_today(tz)
         
-        # 查询当日所有记录
-        start_datetime = datetime.combine(target_date, datetime.min.time())
-        end_datetime = datetime.combine(target_date, datetime.max.time())
+        # 查询当日所有记录（用户时区下的自然日）
+        start_datetime, end_datetime = self._day_bounds(target_date, tz)
         
         records = db.query(Record).filter(
             and_(
                 Record.user_id == user_id,
                 Record.created_at >= start_datetime,
-                Record.created_at <= end_datetime
+                Record.created_at < end_datetime
             )
         ).order_by(Record.created_at).all()
         
-        # 计算大气层颜色（当日心情综合）
-        mood_records = [r for r in records if r.type == RecordType.MOOD]
-        atmosphere_color = "#87CEEB"  # 默认天蓝色
-        
-        if mood_records and mood_records[-1].color_hex:
-            # 使用最新的心情颜色
-            atmosphere_color = mood_records[-1].color_hex
+        return self.build_state(records, target_date)
+    
+    def build_state(self, records: List[Record], target_date: date) -> Dict:
+        """
+        由某一天的记录（按时间升序）组装星球状态
         
-        # 收集星星（灵感）
-        spark_records = [r for r in records if r.type == RecordType.SPARK]
+        Args:
+            records: 当日记录
+            target_date: 日期
+            
+        Returns:
+            星球状态数据
+        """
+        atmosphere_color = "#87CEEB"  # 默认天蓝色
         stars = []
-        for idx, record in enumerate(spark_records):
-            stars.append({
-                "id": str(record.id),
-                "position": record.position_data or {},
-                "color": "#FFD700",  # 金黄色
-                "size": 0.1,
-                "keyword": record.keywords[0] if record.keywords else "灵感"
-            })
-        
-        # 收集树木（思考）- 按主题聚类
-        thought_records = [r for r in records if r.type == RecordType.THOUGHT]
         theme_groups = {}
-        for record in thought_records:
-            theme = record.theme_cluster or "未分类"
-            if theme not in theme_groups:
-                theme_groups[theme] = []
-            theme_groups[theme].append(record)
-        
-        trees = []
-        for theme, group in theme_groups.items():
-            # 树的大小基于该主题下的记录数量
-            size = 0.3 + min(len(group) * 0.1, 0.7)
-            trees.append({
-                "id": f"tree-{theme}",
-                "position": group[0].position_data or {},
-                "theme": theme,
-                "leaf_count": len(group),
-                "size": size
-            })
+        
+        for record in records:
+            if record.type == RecordType.MOOD:
+                # 大气层颜色：使用最新的心情颜色
+                if record.color_hex:
+                    atmosphere_color = record.color_hex
+            elif record.type == RecordType.SPARK:
+                # 星星（灵感）
+                stars.append(self.build_star(record))
+            elif record.type == RecordType.THOUGHT:
+                # 树木（思考）- 按主题聚类
+                theme = record.theme_cluster or "未分类"
+                theme_groups.setdefault(theme, []).append(record)
+        
+        trees = [self.build_tree(theme, group) for theme, group in theme_groups.items()]
         
         return {
             "date": target_date.isoformat(),
@@ -155,66 +309,260 @@ class PlanetService:
             "total_records": len(records)
         }
     
+    async def get_planet_states(
+        self,
+        db: Session,
+        user_id: str,
+        start_date: date,
+        end_date: date,
+        tz: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        获取一段日期内每天的星球状态（时光轴拖动）
+        
+        整个区间只查询一次（走 user_id + created_at 复合索引），按天单次遍历分组
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            start_date: 开始日期（含）
+            end_date: 结束日期（含）
+            tz: 用户时区（IANA 名）
+            
+        Returns:
+            按日期升序的星球状态列表，没有记录的日期也会返回默认状态
+        """
+        start_datetime, end_datetime = day_range(start_date, end_date, tz)
+        
+        records = db.query(Record).filter(
+            Record.user_id == user_id,
+            Record.created_at >= start_datetime,
+            Record.created_at < end_datetime
+        ).order_by(Record.created_at).all()
+        
+        by_day: Dict[date, List[Record]] = {}
+        for record in records:
+            by_day.setdefault(local_date(record.created_at, tz), []).append(record)
+        
+        states = []
+        current_date = start_date
+        while current_date <= end_date:
+            states.append(self.build_state(by_day.get(current_date, []), current_date))
+            current_date += timedelta(days=1)
+        return states
+    
+    def encode_states_compact(self, states: List[Dict]) -> List[list]:
+        """
+        紧凑编码：省略没有记录的日期，星星和树木编码为定长数组
+        
+        每天：[date, atmosphere_color, total_records, stars, trees]
+        星星：[id, x, y, z, orbit_radius, orbit_angle, keyword]（见 COMPACT_STAR_FIELDS）
+        树木：[theme, leaf_count, size, x, y, z]（见 COMPACT_TREE_FIELDS）
+        """
+        days = []
+        for state in states:
+            if not state["total_records"]:
+                continue
+            stars = [
+                [star["id"]] + [star["position"].get(k) for k in ("x", "y", "z", "orbit_radius", "orbit_angle")]
+                + [star["keyword"]]
+                for star in state["stars"]
+            ]
+            trees = [
+                [tree["theme"], tree["leaf_count"], round(tree["size"], 2)]
+                + [tree["position"].get(k) for k in ("x", "y", "z")]
+                for tree in state["trees"]
+            ]
+            days.append([state["date"], state["atmosphere_color"], state["total_records"], stars, trees])
+        return days
+    
+    def local_day(self, tz: Optional[str] = None, resolution: str = "day"):
+        """SQL 表达式：created_at 在用户时区下所属的日期（resolution 为 week/month 时取所在桶的起始日期）"""
+        return cast(func.date_trunc(resolution, func.timezone(get_zone(tz).key, Record.created_at)), Date)
+    
+    def bucket_start(self, day: date, resolution: str) -> date:
+        """某一天所在时间桶的起始日期（周从周一开始）"""
+        if resolution == "week":
+            return day - timedelta(days=day.weekday())
+        if resolution == "month":
+            return day.replace(day=1)
+        return day
+    
+    def count_buckets(self, start_date: date, end_date: date, resolution: str) -> int:
+        """[start_date, end_date] 按 resolution 划分的桶数"""
+        first = self.bucket_start(start_date, resolution)
+        last = self.bucket_start(end_date, resolution)
+        if resolution == "week":
+            return (last - first).days // 7 + 1
+        if resolution == "month":
+            return (last.year - first.year) * 12 + last.month - first.month + 1
+        return (last - first).days + 1
+    
+    def _bucket_series(self, start_date: date, end_date: date, resolution: str):
+        """generate_series 生成的连续桶起始时间（时区无关的本地时间）"""
+        return func.generate_series(
+            cast(literal(self.bucket_start(start_date, resolution)), DateTime),
+            cast(literal(self.bucket_start(end_date, resolution)), DateTime),
+            literal_column(f"interval '1 {resolution}'")
+        ).table_valued("day").render_derived(name="series")
+    
     async def get_planet_history(
         self, 
         db: Session, 
         user_id: str, 
-        days: int = 30
+        days: int = 30,
+        tz: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        resolution: str = "day"
     ) -> List[Dict]:
         """
         获取星球历史
+        
+        按用户时区划分自然日，在数据库内完成分桶：对时间范围内的记录只扫描一次，
+        窗口函数计算每日记录数，DISTINCT ON (day) 取当天最新的心情颜色，每天只返回一行；
+        再由 generate_series 补齐没有记录的日期，一条 SQL 返回完整结果
+        
+        Args:
+            days: 未指定 start_date 时回溯的天数
+            tz: 用户时区（IANA 名）
+            start_date / end_date: 日期范围（含），end_date 默认用户时区下的今天
+            resolution: day / week / month，周和月按桶聚合（见 _get_bucketed_history）
         """
-        end_date = date.today()
-        start_date = end_date - timedelta(days=days)
-        start_datetime = datetime.combine(start_date, datetime.min.time())
-        end_datetime = datetime.combine(end_date, datetime.max.time())
+        if end_date is None:
+            end_date = local_today(tz)
+        if start_date is None:
+            start_date = end_date - timedelta(days=days)
+        if resolution != "day":
+            return self._get_bucketed_history(db, user_id, start_date, end_date, resolution, tz)
+        
+        start_datetime, end_datetime = day_range(start_date, end_date, tz)
+        day = self.local_day(tz).label("day")
+        mood_color = case(
+            (and_(Record.type == RecordType.MOOD, Record.color_hex.isnot(None)), Record.color_hex),
+            else_=None
+        )
         
-        # 1. 一次性查询时间范围内的所有心情记录
-        mood_records = db.query(
-            func.date(Record.created_at).label('date'),
-            Record.color_hex
+        # 每天一行：当天记录总数 + 最新的心情颜色（没有心情记录时为 NULL）
+        daily = db.query(
+            day,
+            func.count(Record.id).over(partition_by=day).label("count"),
+            mood_color.label("color_hex")
         ).filter(
             Record.user_id == user_id,
-            Record.type == RecordType.MOOD,
             Record.created_at >= start_datetime,
-            Record.created_at <= end_datetime
-        ).order_by(Record.created_at.desc()).all()
-        
-        # 构建心情字典：日期 -> 最新颜色
-        mood_map = {}
-        for r in mood_records:
-            # 由于是倒序排列，只有第一次遇到的日期（最新的）会被记录
-            d_str = r.date.isoformat() if hasattr(r.date, 'isoformat') else str(r.date)
-            if d_str not in mood_map:
-                mood_map[d_str] = r.color_hex
+            Record.created_at < end_datetime
+        ).distinct(day).order_by(
+            day,
+            mood_color.is_(None),
+            Record.created_at.desc()
+        ).subquery()
+        
+        series = self._bucket_series(start_date, end_date, "day")
+        series_day = cast(series.c.day, Date)
+        
+        rows = db.query(
+            series_day.label("date"),
+            func.coalesce(daily.c.color_hex, "#CCCCCC").label("atmosphere_color"),
+            func.coalesce(daily.c.count, 0).label("record_count")
+        ).select_from(series).outerjoin(
+            daily, daily.c.day == series_day
+        ).order_by(series.c.day).all()
+        
+        return [
+            {
+                "date": r.date.isoformat(),
+                "atmosphere_color": r.atmosphere_color,
+                "record_count": r.record_count
+            }
+            for r in rows
+        ]
+
 
-        # 2. 一次性查询每日记录总数
-        daily_counts = db.query(
-            func.date(Record.created_at).label('date'),
-            func.count(Record.id).label('count')
+    def _get_bucketed_history(
+        self,
+        db: Session,
+        user_id: str,
+        start_date: date,
+        end_date: date,
+        resolution: str,
+        tz: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        按周/月聚合的星球历史（多年"星系视图"）
+        
+        记录数在桶内求和；颜色由桶内心情记录经 calculate_daily_emotion 混合得到。
+        数据库只扫描一次范围内的记录，每个桶最多返回 HISTORY_BLEND_MOODS + 1 行
+        （最近的心情记录，加一行非心情记录用于取桶内总数），返回数据量与桶数成正比而与记录数无关
+        
+        start_date 向前对齐到所在桶的起始日期，第一个桶总是完整的；
+        最后一个桶截止到 end_date（通常是本周/本月，尚未结束）
+        """
+        start_date = self.bucket_start(start_date, resolution)
+        start_datetime, end_datetime = day_range(start_date, end_date, tz)
+        
+        bucket = self.local_day(tz, resolution).label("bucket")
+        is_mood = and_(
+            Record.type == RecordType.MOOD,
+            Record.emotion_analysis.isnot(None)
+        )
+        is_mood_flag = case((is_mood, True), else_=False)
+        
+        # 每条记录带上所在桶的总数，以及在"同桶同类（心情/非心情）"内由新到旧的序号
+        ranked = db.query(
+            bucket,
+            func.count(Record.id).over(partition_by=bucket).label("count"),
+            func.row_number().over(
+                partition_by=(bucket, is_mood_flag),
+                order_by=Record.created_at.desc()
+            ).label("rn"),
+            is_mood_flag.label("is_mood"),
+            Record.emotion_analysis["valence"].as_float().label("valence"),
+            Record.emotion_analysis["arousal"].as_float().label("arousal"),
+            Record.created_at
         ).filter(
             Record.user_id == user_id,
             Record.created_at >= start_datetime,
-            Record.created_at <= end_datetime
-        ).group_by(func.date(Record.created_at)).all()
+            Record.created_at < end_datetime
+        ).subquery()
+        
+        series = self._bucket_series(start_date, end_date, resolution)
+        series_day = cast(series.c.day, Date)
+        
+        rows = db.query(
+            series_day.label("date"),
+            ranked.c.count,
+            ranked.c.is_mood,
+            ranked.c.valence,
+            ranked.c.arousal
+        ).select_from(series).outerjoin(
+            ranked,
+            and_(
+                ranked.c.bucket == series_day,
+                or_(
+                    and_(ranked.c.is_mood, ranked.c.rn <= HISTORY_BLEND_MOODS),
+                    and_(~ranked.c.is_mood, ranked.c.rn == 1)
+                )
+            )
+        ).order_by(series.c.day, ranked.c.created_at).all()
         
-        count_map = {
-            (r.date.isoformat() if hasattr(r.date, 'isoformat') else str(r.date)): r.count 
-            for r in daily_counts
-        }
-
-        # 3. 组装结果
         history = []
-        current_date = start_date
-        while current_date <= end_date:
-            d_str = current_date.isoformat()
+        for bucket_date, group in groupby(rows, key=lambda r: r.date):
+            group = list(group)
+            emotions = [
+                {"valence": r.valence, "arousal": r.arousal}
+                for r in group
+                if r.is_mood and r.valence is not None and r.arousal is not None
+            ]
+            if emotions:
+                color = emotion_service.emotion_to_color(*emotion_service.calculate_daily_emotion(emotions))
+            else:
+                color = "#CCCCCC"
             history.append({
-                "date": d_str,
-                "atmosphere_color": mood_map.get(d_str, "#CCCCCC"),
-                "record_count": count_map.get(d_str, 0)
+                "date": bucket_date.isoformat(),
+                "atmosphere_color": color,
+                "record_count": group[0].count or 0
             })
-            current_date += timedelta(days=1)
-        
         return history
 
 
@@ -0,0 +1,190 @@
+"""
+Search Service - 记录检索（全文检索、相似记录）
+
+Postgres 内置的分词器不支持中文，这里在应用侧用 jieba 切词，
+以空格拼接后交给 simple 配置生成 tsvector（不做词干化和停用词处理），
+查询词用同样的方式切分，各词之间为 AND 关系。
+records.search_vector 上建有 GIN 索引，按相关度（ts_rank_cd）排序，游标分页。
+
+相似记录按语义向量（records.embedding）的余弦距离排序，见 similar()。
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from sqlalchemy import Numeric, and_, cast, func, or_, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.segmenter import search_terms
+from app.core.timezone import day_range
+from app.models.record import Record, RecordType
+from app.models.user_stats import UserStats
+import base64
+import json
+import uuid
+
+TS_CONFIG = "simple"
+
+
+def to_search_vector(text: str):
+    """记录内容 → tsvector SQL 表达式（写入 Record.search_vector）"""
+    return func.to_tsvector(TS_CONFIG, " ".join(search_terms(text)))
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[str]:
+    """解析游标，格式错误时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
+
+
+class SearchService:
+    """全文检索服务"""
+
+    def search(
+        self,
+        db: Session,
+        user_id: str,
+        q: str,
+        record_type: Optional[RecordType] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        tz: Optional[str] = None,
+        sort: str = "relevance",
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[Record], Optional[str]]:
+        """
+        搜索记录
+
+        Args:
+            q: 查询文本，切词后各词都需出现
+            record_type: 类型筛选
+            start_date / end_date: 用户时区下的日期范围（含）
+            sort: relevance 按相关度，recent 按时间倒序
+            cursor: 上一页返回的 next_cursor
+
+        Returns:
+            (记录列表, 下一页游标)；没有更多结果时游标为 None
+
+        Raises:
+            ValueError: 游标格式错误
+        """
+        terms = search_terms(q)
+        if not terms:
+            return [], None
+
+        tsquery = func.plainto_tsquery(TS_CONFIG, " ".join(terms))
+        # 四舍五入为 numeric，游标里的相关度可以精确比较
+        rank = func.round(cast(func.ts_rank_cd(Record.search_vector, tsquery), Numeric), 6).label("rank")
+
+        query = db.query(Record, rank).filter(
+            Record.user_id == user_id,
+            Record.search_vector.op("@@")(tsquery)
+        )
+        if record_type is not None:
+            query = query.filter(Record.type == record_type)
+        if start_date is not None:
+            query = query.filter(Record.created_at >= day_range(start_date, start_date, tz)[0])
+        if end_date is not None:
+            query = query.filter(Record.created_at < day_range(end_date, end_date, tz)[1])
+
+        # 排序键末尾加 id 保证全序，游标据此定位
+        if sort == "recent":
+            order_by = (Record.created_at.desc(), Record.id.desc())
+        else:
+            order_by = (rank.desc(), Record.created_at.desc(), Record.id.desc())
+
+        if cursor:
+            values = decode_cursor(cursor)
+            try:
+                if sort == "recent":
+                    created_at, record_id = datetime.fromisoformat(values[0]), uuid.UUID(values[1])
+                    query = query.filter(or_(
+                        Record.created_at < created_at,
+                        and_(Record.created_at == created_at, Record.id < record_id)
+                    ))
+                else:
+                    last_rank = Decimal(values[0])
+                    created_at, record_id = datetime.fromisoformat(values[1]), uuid.UUID(values[2])
+                    query = query.filter(or_(
+                        rank < last_rank,
+                        and_(rank == last_rank, or_(
+                            Record.created_at < created_at,
+                            and_(Record.created_at == created_at, Record.id < record_id)
+                        ))
+                    ))
+            except (IndexError, ValueError, ArithmeticError) as e:
+                raise ValueError("invalid cursor") from e
+
+        rows = query.order_by(*order_by).limit(limit + 1).all()
+        records = [record for record, _ in rows[:limit]]
+
+        next_cursor = None
+        if len(rows) > limit:
+            last, last_rank = rows[limit - 1]
+            if sort == "recent":
+                next_cursor = encode_cursor(last.created_at.isoformat(), last.id)
+            else:
+                next_cursor = encode_cursor(last_rank, last.created_at.isoformat(), last.id)
+        return records, next_cursor
+
+    def similar(
+        self,
+        db: Session,
+        record: Record,
+        limit: int = 10,
+        record_type: Optional[RecordType] = None
+    ) -> List[Tuple[Record, float]]:
+        """
+        与某条记录语义最相近的同一用户的记录
+
+        HNSW 索引建在全表上，按用户过滤发生在取出候选之后：用户记录占比小时
+        ef_search 个候选里可能没有几条属于该用户。因此记录不多的用户先物化其全部
+        候选（走 user_id 索引）再精确排序；记录多的用户走索引，结果不足时退回精确计算
+
+        Returns:
+            [(记录, 余弦相似度), ...]，按相似度降序，只包含相似度为正的记录；
+            记录没有语义向量时为空
+        """
+        if record.embedding is None:
+            return []
+
+        filters = [
+            Record.user_id == record.user_id,
+            Record.id != record.id,
+            Record.embedding.isnot(None)
+        ]
+        if record_type is not None:
+            filters.append(Record.type == record_type)
+
+        rows = []
+        stats = db.get(UserStats, record.user_id)
+        if stats is not None and stats.total_records > settings.SIMILAR_EXACT_MAX_RECORDS:
+            db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.SIMILAR_EF_SEARCH)}"))
+            distance = Record.embedding.cosine_distance(record.embedding)
+            rows = db.query(Record.id, distance).filter(*filters).order_by(distance).limit(limit).all()
+        if len(rows) < limit:
+            candidates = db.query(Record.id, Record.embedding).filter(*filters).cte(
+                "candidates"
+            ).prefix_with("MATERIALIZED")
+            distance = candidates.c.embedding.cosine_distance(record.embedding)
+            rows = db.query(candidates.c.id, distance).order_by(distance).limit(limit).all()
+
+        # 相似度不为正说明没有任何共同特征，不算相似
+        rows = [(rid, 1 - distance) for rid, distance in rows if distance < 1]
+        records = {r.id: r for r in db.query(Record).filter(Record.id.in_([rid for rid, _ in rows]))}
+        return [(records[rid], similarity) for rid, similarity in rows if rid in records]
+
+
+# 单例
+search_service = SearchService()
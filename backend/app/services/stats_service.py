@@ -0,0 +1,347 @@
+"""
+Stats Service - 用户统计引擎
+
+每个用户在 user_stats 中维护一行汇总：记录数、各类型数量、连续打卡天数、
+按星期/小时的活跃分布。写记录时在同一事务内增量更新（行锁保证并发安全），
+读统计只需按主键取一行。补录过去的记录、删除后某天变空时，只查询变动日期
+前后相连的活跃日，重算所在的那一段连续天数；修改时区等整体变化由 rebuild
+从 records 单次流式遍历重建。
+"""
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import Dict, Optional, Set, Tuple
+from sqlalchemy import Date, Integer, cast, exists, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.timezone import day_range, get_zone, local_today
+from app.models.record import Record, RecordType
+from app.models.user import User
+from app.models.user_stats import UserStats
+
+TYPE_COUNT_FIELDS = {
+    RecordType.MOOD: "mood_count",
+    RecordType.SPARK: "spark_count",
+    RecordType.THOUGHT: "thought_count",
+}
+
+REBUILD_BATCH_SIZE = 1000
+# 沿连续活跃日向前 / 向后查找时，首个查询窗口的天数（之后每次翻倍）
+STREAK_WINDOW_DAYS = 16
+
+
+class StatsAccumulator:
+    """按时间升序逐条累加记录，得到一行统计汇总"""
+
+    def __init__(self, tz: Optional[str] = None):
+        self.zone = get_zone(tz)
+        self.values = {
+            "total_records": 0,
+            "mood_count": 0,
+            "spark_count": 0,
+            "thought_count": 0,
+            "first_record_date": None,
+            "last_active_date": None,
+            "active_days": 0,
+            "current_streak": 0,
+            "longest_streak": 0,
+            "weekday_histogram": [0] * 7,
+            "hour_histogram": [0] * 24,
+        }
+
+    def add(self, record_type: RecordType, created_at: datetime) -> None:
+        values = self.values
+        moment = created_at.astimezone(self.zone)
+        day = moment.date()
+
+        values["total_records"] += 1
+        values[TYPE_COUNT_FIELDS[record_type]] += 1
+        values["weekday_histogram"][moment.weekday()] += 1
+        values["hour_histogram"][moment.hour] += 1
+
+        last = values["last_active_date"]
+        if last is None:
+            values["first_record_date"] = day
+        if last is None or day > last:
+            values["active_days"] += 1
+            if last is not None and day == last + timedelta(days=1):
+                values["current_streak"] += 1
+            else:
+                values["current_streak"] = 1
+            values["last_active_date"] = day
+            values["longest_streak"] = max(values["longest_streak"], values["current_streak"])
+
+
+class StatsService:
+    """用户统计服务"""
+
+    def _upsert(self, db: Session, user_id, values: Dict) -> None:
+        stmt = insert(UserStats).values(user_id=user_id, **values)
+        db.execute(stmt.on_conflict_do_update(index_elements=[UserStats.user_id], set_=values))
+
+    def rebuild(self, db: Session, user: User) -> None:
+        """
+        由 records 重建某个用户的统计（不提交，调用方负责 commit）
+
+        按 created_at 升序流式读取（服务端游标），内存占用与记录数无关
+        """
+        accumulator = StatsAccumulator(user.timezone)
+        rows = db.query(Record.type, Record.created_at).filter(
+            Record.user_id == user.id
+        ).order_by(Record.created_at).execution_options(yield_per=REBUILD_BATCH_SIZE)
+        for record_type, created_at in rows:
+            accumulator.add(record_type, created_at)
+        self._upsert(db, user.id, accumulator.values)
+
+    def rebuild_all(self, db: Session) -> int:
+        """
+        重建全部用户的统计：按 (user_id, created_at) 单次流式遍历 records，
+        每个用户遍历完即写入并提交
+
+        Returns:
+            重建的用户数
+        """
+        rows = db.query(Record.user_id, Record.type, Record.created_at, User.timezone).join(
+            User, User.id == Record.user_id
+        ).order_by(Record.user_id, Record.created_at).execution_options(yield_per=REBUILD_BATCH_SIZE)
+
+        # 流式游标需独立连接，写入走另一个会话，避免提交时关闭游标
+        writer = Session(bind=db.get_bind())
+        rebuilt = set()
+        try:
+            for user_id, group in groupby(rows, key=lambda r: r.user_id):
+                accumulator = None
+                for row in group:
+                    if accumulator is None:
+                        accumulator = StatsAccumulator(row.timezone)
+                    accumulator.add(row.type, row.created_at)
+                self._upsert(writer, user_id, accumulator.values)
+                writer.commit()
+                rebuilt.add(user_id)
+
+            # 已没有任何记录的用户：汇总行清零
+            stale = writer.query(UserStats.user_id).filter(
+                ~exists().where(Record.user_id == UserStats.user_id)
+            ).all()
+            for (user_id,) in stale:
+                self._upsert(writer, user_id, StatsAccumulator().values)
+                rebuilt.add(user_id)
+            writer.commit()
+        finally:
+            writer.close()
+        return len(rebuilt)
+
+    def _locked(self, db: Session, user: User) -> Optional[UserStats]:
+        return db.query(UserStats).filter(UserStats.user_id == user.id).with_for_update().first()
+
+    def record_added(self, db: Session, user: User, record: Record) -> None:
+        """
+        新记录已 flush、尚未提交时调用，与记录写入处于同一事务
+        """
+        stats = self._locked(db, user)
+        if stats is None:
+            # 首次写入（或功能上线前的老用户）：直接重建，已包含这条记录
+            self.rebuild(db, user)
+            return
+
+        zone = get_zone(user.timezone)
+        moment = record.created_at.astimezone(zone)
+        day = moment.date()
+
+        stats.total_records += 1
+        field = TYPE_COUNT_FIELDS[record.type]
+        setattr(stats, field, getattr(stats, field) + 1)
+        stats.weekday_histogram = self._bump(stats.weekday_histogram, moment.weekday(), 1)
+        stats.hour_histogram = self._bump(stats.hour_histogram, moment.hour, 1)
+
+        if stats.last_active_date is not None and day < stats.last_active_date:
+            # 补录过去的记录：这一天原本没有记录时，把它与前后相连的两段连续天数合并
+            if not self._day_has_records(db, user, day, exclude_id=record.id):
+                self._day_activated(db, user, stats, day)
+            return
+
+        if stats.last_active_date is None or day > stats.last_active_date:
+            if stats.last_active_date is not None and day == stats.last_active_date + timedelta(days=1):
+                stats.current_streak += 1
+            else:
+                stats.current_streak = 1
+            if stats.first_record_date is None:
+                stats.first_record_date = day
+            stats.last_active_date = day
+            stats.active_days += 1
+            stats.longest_streak = max(stats.longest_streak, stats.current_streak)
+
+    def record_removed(self, db: Session, user: User, record: Record) -> None:
+        """
+        记录删除已 flush、尚未提交时调用，与删除处于同一事务
+        """
+        stats = self._locked(db, user)
+        if stats is None:
+            self.rebuild(db, user)
+            return
+
+        moment = record.created_at.astimezone(get_zone(user.timezone))
+        stats.total_records = max(0, stats.total_records - 1)
+        field = TYPE_COUNT_FIELDS[record.type]
+        setattr(stats, field, max(0, getattr(stats, field) - 1))
+        stats.weekday_histogram = self._bump(stats.weekday_histogram, moment.weekday(), -1)
+        stats.hour_histogram = self._bump(stats.hour_histogram, moment.hour, -1)
+
+        if not self._day_has_records(db, user, moment.date()):
+            # 这一天不再有记录，所在的连续天数从这里断开
+            self._day_deactivated(db, user, stats, moment.date())
+
+    def _day_activated(self, db: Session, user: User, stats: UserStats, day: date) -> None:
+        """早于最近活跃日的某一天由无记录变为有记录"""
+        before, after = self._runs_around(db, user, day)
+        length = before + 1 + after
+
+        stats.active_days += 1
+        if stats.first_record_date is None or day < stats.first_record_date:
+            stats.first_record_date = day
+        if day + timedelta(days=after) == stats.last_active_date:
+            stats.current_streak = length
+        stats.longest_streak = max(stats.longest_streak, length)
+
+    def _day_deactivated(self, db: Session, user: User, stats: UserStats, day: date) -> None:
+        """某一天的最后一条记录被删除"""
+        stats.active_days = max(0, stats.active_days - 1)
+        if stats.active_days == 0:
+            stats.first_record_date = stats.last_active_date = None
+            stats.current_streak = stats.longest_streak = 0
+            return
+
+        before, after = self._runs_around(db, user, day)
+
+        if day == stats.first_record_date:
+            stats.first_record_date = (
+                day + timedelta(days=1) if after else self._adjacent_active_day(db, user, day, 1)
+            )
+        if day == stats.last_active_date:
+            if before:
+                stats.last_active_date = day - timedelta(days=1)
+                stats.current_streak = before
+            else:
+                stats.last_active_date = self._adjacent_active_day(db, user, day, -1)
+                stats.current_streak = self._runs_around(db, user, stats.last_active_date)[0] + 1
+        elif day + timedelta(days=after) == stats.last_active_date:
+            stats.current_streak = after
+
+        if before + 1 + after >= stats.longest_streak and max(before, after) < stats.longest_streak:
+            # 断开的正是最长的一段，其他段是否同样长只能看全部活跃日
+            stats.longest_streak = self._longest_streak(db, user)
+
+    def _local_day(self, user: User):
+        """SQL 表达式：created_at 在用户时区下所属的日期"""
+        return cast(func.timezone(get_zone(user.timezone).key, Record.created_at), Date)
+
+    def _day_has_records(self, db: Session, user: User, day: date, exclude_id=None) -> bool:
+        day_start, day_end = day_range(day, day, user.timezone)
+        conditions = [Record.user_id == user.id, Record.created_at >= day_start, Record.created_at < day_end]
+        if exclude_id is not None:
+            conditions.append(Record.id != exclude_id)
+        return db.query(exists().where(*conditions)).scalar()
+
+    def _active_days(self, db: Session, user: User, start: date, end: date) -> Set[date]:
+        """[start, end] 内有记录的日期"""
+        range_start, range_end = day_range(start, end, user.timezone)
+        local_day = self._local_day(user)
+        rows = db.query(local_day).filter(
+            Record.user_id == user.id,
+            Record.created_at >= range_start,
+            Record.created_at < range_end
+        ).distinct()
+        return {day for (day,) in rows}
+
+    def _runs_around(self, db: Session, user: User, day: date) -> Tuple[int, int]:
+        """
+        day 之前、之后（均不含 day）各自连续有记录的天数
+
+        按日期窗口查询，某一侧走到窗口边缘仍连续时窗口翻倍继续，
+        查询的记录只覆盖这一段连续天数及两端的空档
+        """
+        before = after = 0
+        open_before = open_after = True
+        window = STREAK_WINDOW_DAYS
+        while open_before or open_after:
+            start = day - timedelta(days=before + window) if open_before else day
+            end = day + timedelta(days=after + window) if open_after else day
+            active = self._active_days(db, user, start, end)
+            if open_before:
+                while day - timedelta(days=before + 1) in active:
+                    before += 1
+                open_before = day - timedelta(days=before + 1) < start
+            if open_after:
+                while day + timedelta(days=after + 1) in active:
+                    after += 1
+                open_after = day + timedelta(days=after + 1) > end
+            window *= 2
+        return before, after
+
+    def _adjacent_active_day(self, db: Session, user: User, day: date, step: int) -> Optional[date]:
+        """day 之后（step=1）或之前（step=-1）最近的有记录日期"""
+        day_start, day_end = day_range(day, day, user.timezone)
+        if step > 0:
+            moment = db.query(func.min(Record.created_at)).filter(
+                Record.user_id == user.id, Record.created_at >= day_end
+            ).scalar()
+        else:
+            moment = db.query(func.max(Record.created_at)).filter(
+                Record.user_id == user.id, Record.created_at < day_start
+            ).scalar()
+        return moment.astimezone(get_zone(user.timezone)).date() if moment is not None else None
+
+    def _longest_streak(self, db: Session, user: User) -> int:
+        """
+        全部活跃日中最长的连续天数，在数据库内按日期去重后分组计算（只返回一行）
+
+        日期减去其序号，连续的日期得到相同的值，同值的个数即一段连续天数
+        """
+        local_day = self._local_day(user)
+        days = db.query(local_day.label("day")).filter(Record.user_id == user.id).distinct().subquery()
+        grouped = db.query(
+            (days.c.day - cast(func.row_number().over(order_by=days.c.day), Integer)).label("run")
+        ).subquery()
+        runs = db.query(func.count().label("length")).select_from(grouped).group_by(grouped.c.run).subquery()
+        return db.query(func.max(runs.c.length)).scalar() or 0
+
+    @staticmethod
+    def _bump(histogram: list, index: int, delta: int) -> list:
+        # JSON 列不追踪原地修改，返回新列表以触发更新
+        histogram = list(histogram)
+        histogram[index] = max(0, histogram[index] + delta)
+        return histogram
+
+    def get_stats(self, db: Session, user: User) -> Dict:
+        """
+        读取用户统计（主键查询；汇总行不存在时先重建）
+        """
+        stats = db.get(UserStats, user.id)
+        if stats is None:
+            self.rebuild(db, user)
+            db.commit()
+            stats = db.get(UserStats, user.id, populate_existing=True)
+
+        today = local_today(user.timezone)
+        # 最近一次活跃早于昨天时连续天数已中断
+        current_streak = stats.current_streak
+        if stats.last_active_date is None or stats.last_active_date < today - timedelta(days=1):
+            current_streak = 0
+
+        return {
+            "total_records": stats.total_records,
+            "mood_count": stats.mood_count,
+            "spark_count": stats.spark_count,
+            "thought_count": stats.thought_count,
+            "start_date": stats.first_record_date.isoformat() if stats.first_record_date else None,
+            "days_active": (today - stats.first_record_date).days + 1 if stats.first_record_date else 0,
+            "active_days": stats.active_days,
+            "current_streak": current_streak,
+            "longest_streak": stats.longest_streak,
+            "last_active_date": stats.last_active_date.isoformat() if stats.last_active_date else None,
+            "weekday_histogram": stats.weekday_histogram,
+            "hour_histogram": stats.hour_histogram,
+        }
+
+
+# 单例
+stats_service = StatsService()
@@ -0,0 +1,189 @@
+"""
+Sync Service - 用户数据版本服务
+
+每个用户维护一个单调递增的数据版本号，任何写操作（创建/删除记录）都会递增。
+读接口用它生成 ETag，版本未变时直接返回 304，无需查询数据库；
+变更同时以增量事件的形式推送给在线客户端，并写入按版本号排序的变更日志，
+供客户端按 since 版本做增量同步。
+
+Redis 故障期间的写操作无法递增版本。任何观察到故障的 worker 在恢复后
+把全局的 planet:epoch 设为当前时间，版本号低于它的用户在下次访问时按当前
+时间重新起算：所有 worker 的 ETag 随之失效，增量同步因版本不连续回退为全量同步。
+"""
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.redis_client import get_redis, redis_available, redis_failures, mark_redis_unavailable
+from app.services.event_service import event_service
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+EPOCH_KEY = "planet:epoch"
+
+# 版本 key 不存在、或低于故障恢复时写入的 epoch 时，以当前毫秒时间戳重新起算，
+# 保证 Redis 清空、重启或故障期间漏掉递增后版本号只增不减且与之前不同
+# KEYS[1] 版本 key，KEYS[2] epoch key，ARGV[1] 当前毫秒时间戳，ARGV[2] 1 表示同时递增
+VERSION_LUA = """
+local version = tonumber(redis.call('GET', KEYS[1]))
+local epoch = tonumber(redis.call('GET', KEYS[2])) or 0
+if version == nil or version < epoch then
+    version = math.max(tonumber(ARGV[1]), epoch)
+    redis.call('SET', KEYS[1], version)
+end
+if ARGV[2] == '1' then
+    return redis.call('INCR', KEYS[1])
+end
+return version
+"""
+
+
+class SyncService:
+    """用户数据版本服务"""
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = (backend or settings.SYNC_BACKEND).lower()
+        self._versions: Dict[str, int] = {}
+        self._changelog: Dict[str, Deque[Tuple[int, Dict]]] = {}
+        # 已据此写入过 epoch 的 Redis 失败次数，不一致说明之后又发生过故障
+        self._failures_seen = 0
+        self._version_script = None
+
+    @staticmethod
+    def _version_key(user_id: str) -> str:
+        return f"planet:version:{user_id}"
+
+    @staticmethod
+    def _changelog_key(user_id: str) -> str:
+        return f"planet:changes:{user_id}"
+
+    @staticmethod
+    def _seed() -> int:
+        return int(time.time() * 1000)
+
+    async def _redis_version(self, client, user_id: str, bump: bool) -> int:
+        if self._failures_seen != redis_failures():
+            # 本进程观察到过故障（期间可能有写操作漏掉递增）：恢复后先让所有用户的版本失效
+            failures = redis_failures()
+            await client.set(EPOCH_KEY, self._seed())
+            self._failures_seen = failures
+        if self._version_script is None:
+            self._version_script = client.register_script(VERSION_LUA)
+        return int(await self._version_script(
+            keys=[self._version_key(user_id), EPOCH_KEY], args=[self._seed(), 1 if bump else 0]
+        ))
+
+    async def get_version(self, user_id: str) -> Optional[int]:
+        """
+        获取用户当前数据版本
+
+        Returns:
+            版本号；Redis 不可用时返回 None（调用方应跳过 ETag 逻辑）
+        """
+        user_id = str(user_id)
+        if self.backend == "memory":
+            return self._versions.setdefault(user_id, self._seed())
+
+        if not redis_available():
+            return None
+        try:
+            client = await get_redis()
+            return await self._redis_version(client, user_id, bump=False)
+        except (RedisError, OSError) as e:
+            mark_redis_unavailable(e)
+            return None
+
+    async def bump_version(self, user_id: str) -> Optional[int]:
+        """用户数据发生变化后调用，返回新版本号"""
+        user_id = str(user_id)
+        if self.backend == "memory":
+            version = self._versions.get(user_id, self._seed()) + 1
+            self._versions[user_id] = version
+            return version
+
+        if redis_available():
+            try:
+                client = await get_redis()
+                return await self._redis_version(client, user_id, bump=True)
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+
+        # 冷却期内 redis_failures 已计入这次故障，恢复后写入 epoch 使所有版本失效
+        logger.warning("Could not bump data version, versions will be reset when Redis recovers")
+        return None
+
+    async def _append_change(self, user_id: str, version: int, message: Dict) -> None:
+        """写入变更日志（只保留最近 PLANET_CHANGELOG_SIZE 条）"""
+        if self.backend == "memory":
+            log = self._changelog.setdefault(user_id, deque(maxlen=settings.PLANET_CHANGELOG_SIZE))
+            log.append((version, message))
+            return
+
+        try:
+            client = await get_redis()
+            key = self._changelog_key(user_id)
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.zadd(key, {json.dumps(message, ensure_ascii=False): version})
+                pipe.zremrangebyrank(key, 0, -settings.PLANET_CHANGELOG_SIZE - 1)
+                pipe.expire(key, settings.PLANET_CHANGELOG_TTL_DAYS * 86400)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            # 日志缺一条时 changes_since 会检测到版本不连续，客户端回退为全量同步
+            mark_redis_unavailable(e)
+
+    async def publish_change(self, user_id: str, version: Optional[int], change: Dict) -> None:
+        """
+        发布一次已递增版本的数据变更：写入变更日志，并向在线客户端推送增量事件
+
+        Args:
+            user_id: 用户ID
+            version: bump_version 返回的新版本号（Redis 不可用时为 None，只推送不写日志）
+            change: PlanetService.build_record_events 生成的增量
+        """
+        user_id = str(user_id)
+        message = {"version": version, **change}
+        if version is not None:
+            await self._append_change(user_id, version, message)
+        await event_service.publish(user_id, message)
+
+    async def changes_since(self, user_id: str, since: int) -> Optional[Tuple[int, List[Dict]]]:
+        """
+        获取某版本之后的全部变更
+
+        Returns:
+            (当前版本号, 按版本升序的变更列表)；
+            变更日志无法完整覆盖 (since, 当前版本] 时返回 None，调用方应回退为全量同步
+        """
+        user_id = str(user_id)
+        if self.backend == "memory":
+            current = self._versions.get(user_id)
+            entries = [(v, m) for v, m in self._changelog.get(user_id, ()) if v > since]
+        else:
+            if not redis_available():
+                return None
+            try:
+                client = await get_redis()
+                current = await self._redis_version(client, user_id, bump=False)
+                raw_entries = await client.zrangebyscore(
+                    self._changelog_key(user_id), f"({since}", "+inf", withscores=True
+                )
+            except (RedisError, OSError) as e:
+                mark_redis_unavailable(e)
+                return None
+            entries = [(int(score), json.loads(member)) for member, score in raw_entries]
+
+        if current is None or since > current:
+            return None
+        # 版本号连续递增，日志完整时应恰好包含 since+1 .. current
+        if current - since != len(entries):
+            return None
+        if any(v != since + 1 + i for i, (v, _) in enumerate(entries)):
+            return None
+        return current, [m for _, m in entries]
+
+
+# 单例
+sync_service = SyncService()
@@ -0,0 +1,383 @@
+"""
+Theme Service - 思考主题聚类
+
+归类依据记录的语义向量（records.embedding，见 embedding_service），
+主题名依据 TF-IDF 质心（分词后按用户语料统计向量化，稀疏、L2 归一化）。
+在线阶段与该用户已有主题的向量质心比较余弦相似度：足够相似则归入并更新质心，
+否则新建主题。质心缓存在进程内，新记录归类只需一次内存计算和一行更新。
+离线阶段（scripts/recluster_themes.py）对每个用户全量重新聚类：
+重建语料统计、读取已存的语义向量做 k-means 迭代、合并相近主题，并回写记录的主题与树的位置。
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.segmenter import tokenize
+from app.models.record import Record, RecordType
+from app.models.theme_cluster import ThemeCluster
+from app.models.user import User
+from app.services.corpus_service import CorpusSnapshot, corpus_service
+from app.services.embedding_service import embedding_service, normalize_rows
+from app.services.planet_service import planet_service
+import math
+import time
+import numpy as np
+
+# 没有可用词（内容过短、全是停用词）时使用的主题
+DEFAULT_THEME = "日常思考"
+
+Vector = Dict[str, float]
+
+
+def normalize(vector: Vector, max_terms: Optional[int] = None) -> Vector:
+    """保留权重最高的 max_terms 个词并做 L2 归一化"""
+    if max_terms is not None and len(vector) > max_terms:
+        vector = dict(sorted(vector.items(), key=lambda kv: kv[1], reverse=True)[:max_terms])
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    if norm == 0:
+        return {}
+    return {term: w / norm for term, w in vector.items()}
+
+
+def cosine(a: Vector, b: Vector) -> float:
+    """两个已归一化稀疏向量的余弦相似度"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(term, 0.0) for term, w in a.items())
+
+
+def weighted_mean(items: List[Tuple[Vector, float]]) -> Vector:
+    """多个向量按权重求和（未归一化）"""
+    total: Vector = {}
+    for vector, weight in items:
+        for term, w in vector.items():
+            total[term] = total.get(term, 0.0) + w * weight
+    return total
+
+
+@dataclass
+class CachedCluster:
+    """缓存中的主题质心"""
+    id: object
+    label: str
+    centroid: Vector
+    size: int
+    embedding: Optional[np.ndarray] = None
+
+
+class ThemeService:
+    """思考主题聚类服务"""
+
+    def __init__(self):
+        self._cache: "OrderedDict[str, Tuple[float, List[CachedCluster]]]" = OrderedDict()
+
+    # ---------- 向量化 ----------
+
+    def vectorize(self, tokens: List[str], corpus: CorpusSnapshot) -> Vector:
+        """分词结果 → 归一化的 TF-IDF 向量"""
+        return normalize(corpus.tfidf(tokens), settings.THEME_CENTROID_TERMS)
+
+    def _make_label(self, centroid: Vector, taken: set) -> str:
+        """取权重最高的两个词作为主题名，与已有主题重名时依次尝试后续词"""
+        terms = []
+        for term, _ in sorted(centroid.items(), key=lambda kv: kv[1], reverse=True):
+            # 搜索模式下长词和其中的短词同时出现，主题名只保留一个
+            if not any(term in t or t in term for t in terms):
+                terms.append(term)
+        if not terms:
+            return DEFAULT_THEME
+        candidates = ["·".join(terms[:2])] + ["·".join((terms[0], t)) for t in terms[2:]] + terms
+        for label in candidates:
+            if label not in taken and label != DEFAULT_THEME:
+                return label[:100]
+        n = 2
+        while f"{terms[0]}{n}" in taken:
+            n += 1
+        return f"{terms[0]}{n}"[:100]
+
+    # ---------- 质心缓存 ----------
+
+    def _clusters(self, db: Session, user_id: str) -> List[CachedCluster]:
+        entry = self._cache.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self._cache.move_to_end(user_id)
+            return entry[1]
+        rows = db.query(ThemeCluster).filter(ThemeCluster.user_id == user_id).all()
+        clusters = [CachedCluster(r.id, r.label, r.centroid, r.size, r.embedding) for r in rows]
+        self._store(user_id, clusters)
+        return clusters
+
+    def _store(self, user_id: str, clusters: List[CachedCluster]) -> None:
+        self._cache[user_id] = (time.monotonic() + settings.THEME_CACHE_TTL_SECONDS, clusters)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > settings.THEME_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, user_id) -> None:
+        self._cache.pop(str(user_id), None)
+
+    # ---------- 在线归类 ----------
+
+    @staticmethod
+    def _similarity(embedding: np.ndarray, vector: Vector, cluster: CachedCluster) -> float:
+        # 迁移前创建、尚未重新聚类的主题没有向量质心，退回 TF-IDF 余弦相似度
+        if cluster.embedding is None:
+            return cosine(vector, cluster.centroid)
+        return float(np.dot(embedding, cluster.embedding))
+
+    def assign(
+        self,
+        db: Session,
+        user: User,
+        record: Record,
+        tokens: List[str],
+        corpus: CorpusSnapshot
+    ) -> str:
+        """
+        为新的思考记录归类（与记录写入同一事务），设置 theme_cluster 和 position_data
+
+        record.embedding 应已计算（embedding_service.embed）
+
+        Returns:
+            主题名
+        """
+        user_id = str(user.id)
+        vector = self.vectorize(tokens, corpus)
+        embedding = record.embedding
+        if not vector or embedding is None:
+            record.theme_cluster = DEFAULT_THEME
+            record.position_data = planet_service.calculate_tree_position(DEFAULT_THEME, 0)
+            return DEFAULT_THEME
+
+        clusters = self._clusters(db, user_id)
+        best, best_score = None, -1.0
+        for cluster in clusters:
+            score = self._similarity(embedding, vector, cluster)
+            if score > best_score:
+                best, best_score = cluster, score
+
+        row = None
+        if best is not None and (
+            best_score >= settings.THEME_SIMILARITY_THRESHOLD
+            or len(clusters) >= settings.THEME_MAX_CLUSTERS
+        ):
+            row = db.query(ThemeCluster).filter(ThemeCluster.id == best.id).with_for_update().first()
+            if row is not None:
+                self._merge_into(row, vector, embedding)
+        if row is None:
+            row = self._create(db, user_id, vector, embedding, {c.label for c in clusters}, len(clusters))
+
+        # 事务回滚时缓存可能与数据库略有出入，TTL 过期后自动纠正
+        cached = [c for c in clusters if c.id != row.id]
+        cached.append(CachedCluster(row.id, row.label, row.centroid, row.size, row.embedding))
+        self._store(user_id, cached)
+
+        record.theme_cluster = row.label
+        record.position_data = row.position
+        return row.label
+
+    def _merge_into(self, row: ThemeCluster, vector: Vector, embedding: np.ndarray) -> None:
+        """在线更新质心：旧质心按记录数加权后与新向量求平均"""
+        row.centroid = normalize(
+            weighted_mean([(row.centroid, row.size), (vector, 1)]),
+            settings.THEME_CENTROID_TERMS
+        )
+        if row.embedding is not None:
+            row.embedding = normalize_rows(np.asarray(row.embedding) * row.size + embedding)
+        row.size += 1
+
+    def _create(
+        self,
+        db: Session,
+        user_id: str,
+        vector: Vector,
+        embedding: np.ndarray,
+        taken: set,
+        index: int
+    ) -> ThemeCluster:
+        label = self._make_label(vector, taken)
+        row = ThemeCluster(
+            user_id=user_id,
+            label=label,
+            centroid=vector,
+            embedding=embedding,
+            size=1,
+            position=planet_service.calculate_tree_position(label, index)
+        )
+        try:
+            with db.begin_nested():
+                db.add(row)
+        except IntegrityError:
+            # 其他 worker 刚创建了同名主题（本地缓存过期），直接并入
+            row = db.query(ThemeCluster).filter(
+                ThemeCluster.user_id == user_id,
+                ThemeCluster.label == label
+            ).with_for_update().one()
+            self._merge_into(row, vector, embedding)
+        return row
+
+    def record_removed(self, db: Session, user: User, record: Record) -> None:
+        """思考记录删除后更新主题大小，主题为空时删除（与删除同一事务）"""
+        if record.type != RecordType.THOUGHT or not record.theme_cluster:
+            return
+        row = db.query(ThemeCluster).filter(
+            ThemeCluster.user_id == user.id,
+            ThemeCluster.label == record.theme_cluster
+        ).with_for_update().first()
+        if row is None:
+            return
+        if row.size <= 1:
+            db.delete(row)
+        else:
+            row.size -= 1
+        self.invalidate(user.id)
+
+    # ---------- 离线重新聚类 ----------
+
+    @staticmethod
+    def _nearest(embeddings: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """每个向量最相似的质心下标"""
+        return np.argmax(embeddings @ centroids.T, axis=1)
+
+    def _kmeans(self, embeddings: np.ndarray) -> List[Tuple[np.ndarray, List[int]]]:
+        """
+        球面 k-means：先按阈值做一遍领导者聚类确定初始质心，再迭代重分配，
+        最后合并质心过于接近的主题
+
+        Args:
+            embeddings: 归一化的语义向量矩阵，每行一条记录
+
+        Returns:
+            [(质心, 成员下标列表), ...]
+        """
+        if not len(embeddings):
+            return []
+        threshold = settings.THEME_SIMILARITY_THRESHOLD
+        max_clusters = settings.THEME_MAX_CLUSTERS
+
+        leaders = [0]
+        for i in range(1, len(embeddings)):
+            if len(leaders) >= max_clusters:
+                break
+            if np.max(embeddings[leaders] @ embeddings[i]) < threshold:
+                leaders.append(i)
+        centroids = embeddings[leaders]
+
+        for _ in range(settings.THEME_RECLUSTER_ITERATIONS):
+            nearest = self._nearest(embeddings, centroids)
+            groups = [nearest == k for k in range(len(centroids))]
+            new_centroids = normalize_rows(np.stack([embeddings[g].sum(axis=0) for g in groups if g.any()]))
+            if new_centroids.shape == centroids.shape and np.allclose(new_centroids, centroids):
+                break
+            centroids = new_centroids
+        nearest = self._nearest(embeddings, centroids)
+
+        clusters = [
+            (centroids[k], np.flatnonzero(nearest == k).tolist())
+            for k in range(len(centroids))
+        ]
+        clusters = [(c, m) for c, m in clusters if m]
+
+        # 合并相近主题：每次合并最相似的一对，直到没有超过阈值的
+        while len(clusters) > 1:
+            matrix = np.stack([c for c, _ in clusters])
+            scores = np.triu(matrix @ matrix.T, k=1)
+            i, j = np.unravel_index(np.argmax(scores), scores.shape)
+            if scores[i, j] < settings.THEME_MERGE_THRESHOLD:
+                break
+            (ci, mi), (cj, mj) = clusters[i], clusters[j]
+            merged = normalize_rows(ci * len(mi) + cj * len(mj))
+            clusters[i] = (merged, mi + mj)
+            del clusters[j]
+
+        return clusters
+
+    def recluster_user(self, db: Session, user: User) -> int:
+        """
+        对某个用户全量重新聚类（不提交，调用方负责 commit）
+
+        单次遍历该用户全部记录：重建语料统计，并收集思考记录的分词结果和语义向量；
+        尚未计算语义向量的思考记录（回填前）就地补算并写回
+
+        Returns:
+            聚类后的主题数
+        """
+        corpus = CorpusSnapshot()
+        thoughts: List[Tuple[object, str, List[str], Optional[np.ndarray]]] = []
+        rows = db.query(
+            Record.id,
+            Record.type,
+            Record.content,
+            case((Record.type == RecordType.THOUGHT, Record.embedding), else_=None)
+        ).filter(
+            Record.user_id == user.id
+        ).order_by(Record.created_at).execution_options(yield_per=1000)
+        for record_id, record_type, content, embedding in rows:
+            tokens = tokenize(content, search=True)
+            corpus.add(tokens)
+            if record_type == RecordType.THOUGHT:
+                thoughts.append((record_id, content, tokens, embedding))
+        corpus_service.save(db, user.id, corpus)
+
+        missing = [i for i, (_, _, _, embedding) in enumerate(thoughts) if embedding is None]
+        if missing:
+            computed = embedding_service.embed_batch([thoughts[i][1] for i in missing])
+            for i, embedding in zip(missing, computed):
+                record_id, content, tokens, _ = thoughts[i]
+                embedding = embedding if embedding.any() else None
+                thoughts[i] = (record_id, content, tokens, embedding)
+                db.query(Record).filter(Record.id == record_id).update(
+                    {Record.embedding: embedding}, synchronize_session=False
+                )
+
+        vectors, embeddings, ids, default_ids = [], [], [], []
+        for record_id, _, tokens, embedding in thoughts:
+            vector = self.vectorize(tokens, corpus)
+            if vector and embedding is not None:
+                vectors.append(vector)
+                embeddings.append(embedding)
+                ids.append(record_id)
+            else:
+                default_ids.append(record_id)
+
+        clusters = self._kmeans(np.array(embeddings, dtype=np.float32))
+        # 大主题排在前面，优先获得最简洁的主题名
+        clusters.sort(key=lambda c: len(c[1]), reverse=True)
+
+        db.query(ThemeCluster).filter(ThemeCluster.user_id == user.id).delete(synchronize_session=False)
+        taken = set()
+        for index, (embedding, members) in enumerate(clusters):
+            centroid = normalize(weighted_mean([(vectors[i], 1) for i in members]), settings.THEME_CENTROID_TERMS)
+            label = self._make_label(centroid, taken)
+            taken.add(label)
+            position = planet_service.calculate_tree_position(label, index)
+            db.add(ThemeCluster(
+                user_id=user.id,
+                label=label,
+                centroid=centroid,
+                embedding=embedding,
+                size=len(members),
+                position=position
+            ))
+            db.query(Record).filter(Record.id.in_([ids[i] for i in members])).update(
+                {Record.theme_cluster: label, Record.position_data: position},
+                synchronize_session=False
+            )
+        if default_ids:
+            db.query(Record).filter(Record.id.in_(default_ids)).update(
+                {
+                    Record.theme_cluster: DEFAULT_THEME,
+                    Record.position_data: planet_service.calculate_tree_position(DEFAULT_THEME, 0)
+                },
+                synchronize_session=False
+            )
+
+        self.invalidate(user.id)
+        return len(clusters)
+
+
+# 单例
+theme_service = ThemeService()
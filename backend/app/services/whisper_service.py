@@ -3,14 +3,25 @@ Whisper Service - 语音转文字服务
 """
 import openai
 from app.core.config import settings
+from app.core.metrics import AI_ERRORS, track
+from app.core.tracing import span
+from app.services.fake_ai_service import fake_ai_service
 from typing import BinaryIO
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class WhisperService:
     """语音转文字服务"""
     
     def __init__(self):
-        openai.api_key = settings.OPENAI_API_KEY
+        # 转写只支持 OpenAI Whisper；AI_PROVIDER="fake" 时使用本地替身
+        self.provider = "fake" if settings.AI_PROVIDER.lower() == "fake" else "openai"
+        self.openai_client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None
+        )
     
     async def transcribe(self, audio_file: BinaryIO, language: str = "zh") -> str:
         """
@@ -24,17 +35,21 @@ class WhisperService:
             转写的文本
         """
         try:
-            response = await openai.audio.transcriptions.create(
-                model=settings.OPENAI_MODEL_WHISPER,
-                file=audio_file,
-                language=language,
-                response_format="text"
-            )
+            with track("whisper"), span("whisper.transcribe", {"ai.provider": self.provider, "language": language}):
+                if self.provider == "fake":
+                    return await fake_ai_service.transcribe(audio_file.read())
+                response = await self.openai_client.audio.transcriptions.create(
+                    model=settings.OPENAI_MODEL_WHISPER,
+                    file=audio_file,
+                    language=language,
+                    response_format="text"
+                )
             
             return response.strip()
             
         except Exception as e:
-            print(f"Whisper transcription error: {e}")
+            AI_ERRORS.labels("whisper", self.provider).inc()
+            logger.error(f"Whisper transcription error: {type(e).__name__}: {e}")
             raise
 
 
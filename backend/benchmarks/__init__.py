@@ -0,0 +1,4 @@
+"""
+Backend Benchmarks
+性能基准测试
+"""
@@ -0,0 +1,43 @@
+"""
+EmotionService 微基准
+
+emotion_to_color 每条心情记录执行一次，calculate_daily_emotion 每个历史桶执行一次；
+带 scale 参数的基准按合成日记规模运行（见 conftest.py）
+"""
+from app.models.record import RecordType
+from app.services.emotion_service import emotion_service
+from app.services.planet_service import HISTORY_BLEND_MOODS
+
+
+def _emotions(journal) -> list:
+    return [r.emotion_analysis for r in journal if r.type == RecordType.MOOD]
+
+
+def test_emotion_to_color(benchmark):
+    """单次调用"""
+    color = benchmark(emotion_service.emotion_to_color, 0.72, 0.35)
+    assert color.startswith("#") and len(color) == 7
+
+
+def test_emotion_to_color_journal(measure, journal):
+    """为整本日记的心情记录重新着色"""
+    emotions = _emotions(journal)
+
+    def run():
+        return [emotion_service.emotion_to_color(e["valence"], e["arousal"]) for e in emotions]
+
+    assert len(measure(run)) == len(emotions)
+
+
+def test_calculate_daily_emotion_bucket(benchmark, journal):
+    """历史接口每个周 / 月桶最多混合 HISTORY_BLEND_MOODS 条心情"""
+    emotions = _emotions(journal)[-HISTORY_BLEND_MOODS:]
+    valence, arousal = benchmark(emotion_service.calculate_daily_emotion, emotions)
+    assert 0 <= valence <= 1 and 0 <= arousal <= 1
+
+
+def test_calculate_daily_emotion_journal(measure, journal):
+    """不截断时混合成本随心情条数线性增长（截断前的历史实现）"""
+    emotions = _emotions(journal)
+    valence, arousal = measure(emotion_service.calculate_daily_emotion, emotions)
+    assert 0 <= valence <= 1 and 0 <= arousal <= 1
@@ -0,0 +1,77 @@
+"""
+PlanetService 微基准
+
+覆盖星星 / 树木位置计算和星球状态组装（build_state、get_planet_state），
+带 scale 参数的基准按合成日记规模运行（见 conftest.py）
+"""
+import asyncio
+from datetime import datetime, timezone
+
+from app.models.record import RecordType
+from app.services.planet_service import planet_service
+
+RECORD_TIME = datetime(2024, 6, 30, 22, 15, tzinfo=timezone.utc)
+
+
+def test_calculate_star_position(benchmark):
+    """单次调用：创建灵感记录时执行一次"""
+    position = benchmark(planet_service.calculate_star_position, 42, 43, RECORD_TIME)
+    assert set(position) == {"orbit_radius", "orbit_angle", "x", "y", "z"}
+
+
+def test_calculate_tree_position(benchmark):
+    """单次调用：主题聚类为每棵树执行一次"""
+    position = benchmark(planet_service.calculate_tree_position, "工作", 3)
+    assert set(position) == {"x", "y", "z"}
+
+
+def test_star_positions_journal(measure, journal):
+    """为整本日记的灵感记录重新计算位置（数据迁移 / 重建场景）"""
+    sparks = [r for r in journal if r.type == RecordType.SPARK]
+
+    def run():
+        return [
+            planet_service.calculate_star_position(i, len(sparks), record.created_at)
+            for i, record in enumerate(sparks)
+        ]
+
+    assert len(measure(run)) == len(sparks)
+
+
+def test_tree_positions_journal(measure, journal):
+    """为整本日记的思考记录重新计算树的位置（recluster 场景）"""
+    thoughts = [r for r in journal if r.type == RecordType.THOUGHT]
+
+    def run():
+        return [planet_service.calculate_tree_position(r.theme_cluster, i) for i, r in enumerate(thoughts)]
+
+    assert len(measure(run)) == len(thoughts)
+
+
+def test_build_state_journal(measure, journal):
+    """组装成本随记录数线性增长：整本日记一次性组装"""
+    state = measure(planet_service.build_state, journal, RECORD_TIME.date())
+    assert state["total_records"] == len(journal)
+
+
+def test_build_state_day(benchmark, journal):
+    """一个重度用户一天的记录（get_planet_state 的实际输入规模）"""
+    day = journal[-1].created_at.date()
+    records = [r for r in journal if r.created_at.date() == day]
+    state = benchmark(planet_service.build_state, records, day)
+    assert state["total_records"] == len(records)
+
+
+def test_get_planet_state_db(benchmark, db_journal):
+    """查询 + 组装：日记越大，按 (user_id, created_at) 索引取一天记录的成本是否保持不变"""
+    db, user, day = db_journal
+    loop = asyncio.new_event_loop()
+    try:
+        def run():
+            db.expire_all()  # 每轮都重新从数据库加载，不命中 identity map
+            return loop.run_until_complete(planet_service.get_planet_state(db, str(user.id), day, user.timezone))
+
+        state = benchmark(run)
+    finally:
+        loop.close()
+    assert state["total_records"] > 0
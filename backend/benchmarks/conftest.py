@@ -0,0 +1,206 @@
+"""
+基准测试公共夹具 - 合成日记数据与基准数据库
+
+合成日记（journal）按规模生成：1k / 100k / 1m 条记录，种子固定，每次运行数据完全一致。
+  - 内存版：未持久化的 Record 对象，用于纯计算的微基准
+  - 数据库版：由 scripts/generate_journals.py 写入 BENCH_DATABASE_URL 指向的 PostgreSQL（需 pgvector 和 btree_gin 扩展），
+    未设置时跳过数据库基准。模型使用 UUID / TSVECTOR / Vector 列，无法在 SQLite 上建表
+
+使用方法（在 backend/benchmarks 目录下，结果目录 baselines/ 相对于当前目录）:
+    pytest                                              # 默认规模 1k,100k
+    pytest --bench-scales 1k,100k,1m                    # 1m 需要数 GB 内存，按需开启
+    BENCH_DATABASE_URL=postgresql://postgres@localhost/stellar_bench pytest
+  会话开始和结束时都会删除全部表：数据库名必须包含 "bench"，且 ENVIRONMENT=production 时拒绝运行
+
+基线与回归阈值（基线按机器分目录保存，只和同一台机器上的结果比较）:
+    pytest --benchmark-autosave                                         # 在改动前保存基线
+    pytest --benchmark-compare --benchmark-compare-fail=median:25%      # 改动后对比，中位数变慢超过 25% 即失败
+    pytest-benchmark --storage file://baselines compare --group-by=func  # 查看历次结果
+"""
+import sys
+import os
+import math
+import random
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+
+# 确保可以导入 app 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from app.models.record import Record, RecordType
+from app.services.emotion_service import emotion_service
+from scripts.generate_journals import DEFAULT_MIX, HOUR_WEIGHTS, THOUGHT_SENTENCES
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SCALES = "1k,100k"
+SEED = 20240101
+
+THEMES = tuple(THOUGHT_SENTENCES)
+KEYWORDS = ("壁纸", "颜色", "散步", "咖啡", "音乐", "电影", "早起", "跑步", "日历", "火锅")
+# 每天记录条数（按一个重度用户估算）
+RECORDS_PER_DAY = 20
+# 固定的"今天"，保证不同日期运行的数据一致
+JOURNAL_END = date(2024, 6, 30)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-scales",
+        default=DEFAULT_SCALES,
+        help=f"逗号分隔的合成日记规模，可选 {','.join(SCALES)}（默认 {DEFAULT_SCALES}）",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    """带 scale 参数的基准按 --bench-scales 参数化"""
+    if "scale" in metafunc.fixturenames:
+        scales = [s.strip() for s in metafunc.config.getoption("--bench-scales").split(",") if s.strip()]
+        unknown = [s for s in scales if s not in SCALES]
+        if unknown:
+            raise pytest.UsageError(f"未知的 --bench-scales: {unknown}，可选 {list(SCALES)}")
+        metafunc.parametrize("scale", scales)
+
+
+def random_emotion(rng: random.Random) -> dict:
+    """效价 / 唤起度按略偏积极的 beta 分布生成"""
+    valence = round(rng.betavariate(2.4, 2.0), 2)
+    arousal = round(rng.betavariate(2.0, 2.2), 2)
+    return {"valence": valence, "arousal": arousal}
+
+
+def generate_journal(n: int, seed: int = SEED, user_id: uuid.UUID = None) -> list:
+    """
+    生成 n 条按时间升序的未持久化记录
+
+    记录覆盖 JOURNAL_END 之前 n / RECORDS_PER_DAY 天，字段与创建接口写入的一致：
+    心情有 emotion_analysis / color_hex，灵感有 keywords / position_data，思考有 theme_cluster / position_data
+    """
+    rng = random.Random(seed)
+    user_id = user_id or uuid.UUID(int=rng.getrandbits(128))
+    types, type_weights = zip(*DEFAULT_MIX.items())
+    hours, hour_weights = zip(*HOUR_WEIGHTS)
+    days = max(1, math.ceil(n / RECORDS_PER_DAY))
+    start_day = JOURNAL_END - timedelta(days=days - 1)
+
+    timestamps = []
+    for _ in range(n):
+        day = start_day + timedelta(days=rng.randrange(days))
+        moment = time(rng.choices(hours, hour_weights)[0], rng.randrange(60), rng.randrange(60))
+        timestamps.append(datetime.combine(day, moment, tzinfo=timezone.utc))
+    timestamps.sort()
+
+    records = []
+    for created_at, record_type in zip(timestamps, rng.choices(types, type_weights, k=n)):
+        record = Record(
+            id=uuid.UUID(int=rng.getrandbits(128)),
+            user_id=user_id,
+            type=record_type,
+            content="",
+            created_at=created_at,
+        )
+        if record_type == RecordType.MOOD:
+            emotion = random_emotion(rng)
+            record.emotion_analysis = emotion
+            record.color_hex = emotion_service.emotion_to_color(emotion["valence"], emotion["arousal"])
+        elif record_type == RecordType.SPARK:
+            record.keywords = rng.sample(KEYWORDS, 3)
+            record.position_data = {"x": round(rng.uniform(-3, 3), 2), "y": 0.0, "z": round(rng.uniform(-3, 3), 2)}
+        else:
+            record.theme_cluster = rng.choice(THEMES)
+            record.position_data = {"x": round(rng.uniform(-1, 1), 2), "y": round(rng.uniform(-1, 1), 2), "z": 0.0}
+        records.append(record)
+    return records
+
+
+_journals = {}
+
+
+@pytest.fixture
+def journal(scale):
+    """某一规模的内存合成日记（同一会话内缓存，1m 条只生成一次）"""
+    if scale not in _journals:
+        _journals[scale] = generate_journal(SCALES[scale])
+    return _journals[scale]
+
+
+@pytest.fixture(scope="session")
+def bench_engine():
+    """基准数据库：建表（不含数据），会话结束时删表"""
+    url = os.environ.get("BENCH_DATABASE_URL")
+    if not url:
+        pytest.skip("未设置 BENCH_DATABASE_URL，跳过数据库基准")
+
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.engine import make_url
+    from app.core.database import Base
+    import app.models  # noqa: F401  注册全部模型
+
+    # 建表前后都会 drop_all：只允许专用的基准数据库，防止误设环境变量清空开发 / 预发库
+    if os.environ.get("ENVIRONMENT", "development") == "production":
+        pytest.exit("ENVIRONMENT=production，拒绝在生产环境运行数据库基准", returncode=1)
+    database = make_url(url).database or ""
+    if "bench" not in database:
+        pytest.exit(f"BENCH_DATABASE_URL 指向的数据库 {database!r} 名称不含 \"bench\"，拒绝删表", returncode=1)
+
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gin"))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+_loaded = {}
+
+
+@pytest.fixture
+def db_journal(bench_engine, scale):
+    """
+    用 scripts/generate_journals.py 将某一规模的合成日记写入基准数据库（每个规模一个用户，会话内只写一次）
+
+    Returns:
+        (会话, 用户, 用户时区下记录最多的一天)
+    """
+    from sqlalchemy import func
+    from sqlalchemy.orm import Session
+    from app.models.user import User
+    from scripts.generate_journals import generate_journals
+
+    if scale not in _loaded:
+        seed = SEED + len(_loaded)
+        generate_journals(
+            bench_engine.url.render_as_string(hide_password=False),
+            users=1,
+            records=SCALES[scale],
+            seed=seed,
+            days=max(1, SCALES[scale] // RECORDS_PER_DAY),
+            end_date=JOURNAL_END,
+        )
+        _loaded[scale] = f"gen{seed}_0@example.test"
+
+    with Session(bench_engine) as db:
+        user = db.query(User).filter(User.email == _loaded[scale]).one()
+        local_day = func.date(func.timezone(user.timezone, Record.created_at))
+        busiest_day = db.query(local_day).filter(Record.user_id == user.id).group_by(local_day).order_by(
+            func.count().desc()
+        ).limit(1).scalar()
+        yield db, user, busiest_day
+
+
+@pytest.fixture
+def measure(benchmark, scale):
+    """
+    按规模选择计时方式：小规模由 pytest-benchmark 自动决定轮数，
+    100k 以上单轮就要数百毫秒，固定 3 轮避免整套基准跑上几十分钟
+    """
+    def run(func, *args):
+        if SCALES[scale] >= 100_000:
+            return benchmark.pedantic(func, args=args, rounds=3, iterations=1, warmup_rounds=0)
+        return benchmark(func, *args)
+    return run
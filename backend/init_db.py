@@ -23,6 +23,10 @@ try:
     # 创建所有表
     print("正在创建数据库表...")
     from app.core.database import engine
+    with engine.begin() as conn:
+        # records.embedding 等向量列依赖 pgvector 扩展，(user_id, search_vector) 的 GIN 索引依赖 btree_gin
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gin"))
     Base.metadata.create_all(bind=engine)
     print("✅ 数据库表创建成功！")
     
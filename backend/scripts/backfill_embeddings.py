@@ -0,0 +1,84 @@
+"""
+维护脚本 - 回填记录的语义向量（records.embedding）
+
+迁移上线前创建的记录没有语义向量，既不会出现在相似记录里，也不参与主题聚类；
+更换向量模型（EMBEDDING_BACKEND / EMBEDDING_MODEL）后需要加 --all 全量重算。
+按批计算并写入，可中断后重复执行；完成后建议运行 recluster_themes.py 重新聚类
+
+使用方法:
+    python backend/scripts/backfill_embeddings.py          # 只处理没有向量的记录
+    python backend/scripts/backfill_embeddings.py --all    # 全部记录重算
+"""
+import sys
+import os
+import time
+
+# 确保可以导入 app 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from sqlalchemy import bindparam, update
+from app.core.database import SessionLocal
+from app.models.record import Record
+from app.services.embedding_service import embedding_service
+
+BATCH_SIZE = 500
+
+
+def backfill_embeddings(recompute: bool = False):
+    """回填语义向量"""
+    db = SessionLocal()
+    started = time.perf_counter()
+    total = 0
+
+    stmt = update(Record).where(Record.id == bindparam("record_id")).values(
+        embedding=bindparam("vector")
+    )
+
+    try:
+        # 按 id 翻页：全量重算时已处理的记录仍满足条件，不能靠 IS NULL 判断进度
+        last_id = None
+        while True:
+            query = db.query(Record.id, Record.content)
+            if not recompute:
+                query = query.filter(Record.embedding.is_(None))
+            if last_id is not None:
+                query = query.filter(Record.id > last_id)
+            rows = query.order_by(Record.id).limit(BATCH_SIZE).all()
+            if not rows:
+                break
+            vectors = embedding_service.embed_batch([content for _, content in rows])
+            db.connection().execute(stmt, [
+                {"record_id": record_id, "vector": vector if vector.any() else None}
+                for (record_id, _), vector in zip(rows, vectors)
+            ])
+            db.commit()
+            last_id = rows[-1][0]
+            total += len(rows)
+            print(f"   已处理 {total} 条")
+
+        print(f"✅ 回填完成，共 {total} 条，用时 {time.perf_counter() - started:.2f}s")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 回填失败: {type(e).__name__}")
+        print(f"   错误详情: {str(e)}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("维护脚本 - 回填语义向量")
+    print("=" * 60)
+    print()
+
+    success = backfill_embeddings("--all" in sys.argv[1:])
+
+    print("=" * 60)
+
+    sys.exit(0 if success else 1)
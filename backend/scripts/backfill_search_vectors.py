@@ -0,0 +1,76 @@
+"""
+维护脚本 - 回填记录的全文检索词项（records.search_vector）
+
+迁移上线前创建的记录没有 search_vector，搜索不到；此脚本按批分词并写入。
+只处理 search_vector 为空的记录，可中断后重复执行
+
+使用方法:
+    python backend/scripts/backfill_search_vectors.py
+"""
+import sys
+import os
+import time
+
+# 确保可以导入 app 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from sqlalchemy import bindparam, func, update
+from app.core.database import SessionLocal
+from app.core.segmenter import search_terms
+from app.models.record import Record
+from app.services.search_service import TS_CONFIG
+
+BATCH_SIZE = 1000
+
+
+def backfill_search_vectors():
+    """回填全文检索词项"""
+    db = SessionLocal()
+    started = time.perf_counter()
+    total = 0
+
+    stmt = update(Record).where(Record.id == bindparam("record_id")).values(
+        search_vector=func.to_tsvector(TS_CONFIG, bindparam("terms"))
+    )
+
+    try:
+        while True:
+            rows = db.query(Record.id, Record.content).filter(
+                Record.search_vector.is_(None)
+            ).limit(BATCH_SIZE).all()
+            if not rows:
+                break
+            db.connection().execute(stmt, [
+                {"record_id": record_id, "terms": " ".join(search_terms(content))}
+                for record_id, content in rows
+            ])
+            db.commit()
+            total += len(rows)
+            print(f"   已处理 {total} 条")
+
+        print(f"✅ 回填完成，共 {total} 条，用时 {time.perf_counter() - started:.2f}s")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 回填失败: {type(e).__name__}")
+        print(f"   错误详情: {str(e)}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("维护脚本 - 回填全文检索词项")
+    print("=" * 60)
+    print()
+
+    success = backfill_search_vectors()
+
+    print("=" * 60)
+
+    sys.exit(0 if success else 1)
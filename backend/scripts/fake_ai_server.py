@@ -0,0 +1,130 @@
+"""
+本地替身 AI 服务 - 兼容 OpenAI / 智谱的 HTTP 接口
+
+实现 EmotionService / WhisperService 调用的接口，输出与 AI_PROVIDER="fake" 相同（见 fake_ai_service）：
+    POST /v1/chat/completions              OpenAI chat completions
+    POST /api/paas/v4/chat/completions     智谱 chat completions（与 OpenAI 格式相同）
+    POST /v1/audio/transcriptions          OpenAI Whisper 转写
+
+后端指向替身服务（真实 SDK 的网络、重试、解析路径都会被覆盖）：
+    AI_PROVIDER=openai OPENAI_API_KEY=fake OPENAI_BASE_URL=http://localhost:9100/v1
+    AI_PROVIDER=zhipu  ZHIPU_API_KEY=fake.fake ZHIPU_BASE_URL=http://localhost:9100/api/paas/v4
+
+使用方法（在 backend 目录下，读取 .env 中的 FAKE_AI_* 配置，命令行参数优先）:
+    python scripts/fake_ai_server.py --port 9100
+    python scripts/fake_ai_server.py --latency-ms 1200 --distribution lognormal --error-rate 0.02 --seed 7
+"""
+import sys
+import os
+import argparse
+import time
+import uuid
+
+# 确保可以导入 app 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.core.config import settings
+from app.services.fake_ai_service import FakeAIError, FakeAIService
+
+app = FastAPI(title="Fake AI Provider")
+service = FakeAIService()
+
+
+def _error(e: FakeAIError) -> JSONResponse:
+    # OpenAI 风格的错误体，SDK 会按 5xx 进行重试
+    return JSONResponse(
+        status_code=500,
+        content={"error": {"message": str(e), "type": "server_error", "code": "fake_injected_failure"}},
+    )
+
+
+@app.post("/v1/chat/completions")
+@app.post("/api/paas/v4/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    try:
+        content = await service.chat_completion(messages)
+    except FakeAIError as e:
+        return _error(e)
+
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return {
+        "id": f"chatcmpl-fake-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        # 粗略按字符数估算，供观察 token 用量相关的逻辑
+        "usage": {
+            "prompt_tokens": prompt_chars,
+            "completion_tokens": len(content),
+            "total_tokens": prompt_chars + len(content),
+        },
+    }
+
+
+@app.post("/v1/audio/transcriptions")
+async def transcriptions(
+    file: UploadFile = File(...),
+    model: str = Form("whisper-1"),
+    language: str = Form("zh"),
+    response_format: str = Form("json"),
+):
+    try:
+        text = await service.transcribe(await file.read())
+    except FakeAIError as e:
+        return _error(e)
+    if response_format == "text":
+        return PlainTextResponse(text)
+    return {"text": text}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地替身 AI 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal"], help="延迟分布")
+    parser.add_argument("--latency-ms", type=float, help="情感分析延迟（中位数 / 均值）")
+    parser.add_argument("--transcribe-latency-ms", type=float, help="转写延迟")
+    parser.add_argument("--spread", type=float, help="uniform 浮动比例 / lognormal sigma")
+    parser.add_argument("--error-rate", type=float, help="注入失败的比例（0-1）")
+    parser.add_argument("--seed", type=int, help="延迟和失败序列的随机种子")
+    args = parser.parse_args()
+
+    overrides = {
+        "FAKE_AI_LATENCY_DISTRIBUTION": args.distribution,
+        "FAKE_AI_LATENCY_MS": args.latency_ms,
+        "FAKE_AI_TRANSCRIBE_LATENCY_MS": args.transcribe_latency_ms,
+        "FAKE_AI_LATENCY_SPREAD": args.spread,
+        "FAKE_AI_ERROR_RATE": args.error_rate,
+        "FAKE_AI_SEED": args.seed,
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            setattr(settings, key, value)
+
+    global service
+    service = FakeAIService()
+    print(
+        f"🤖 Fake AI provider on http://{args.host}:{args.port} "
+        f"(latency={settings.FAKE_AI_LATENCY_DISTRIBUTION} {settings.FAKE_AI_LATENCY_MS}ms, "
+        f"error_rate={settings.FAKE_AI_ERROR_RATE}, seed={settings.FAKE_AI_SEED})"
+    )
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
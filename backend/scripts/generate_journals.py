@@ -0,0 +1,579 @@
+"""
+开发/测试数据脚本 - 生成大规模合成日记
+
+生成 N 个用户 × 每人 M 条记录，用 COPY 批量写入，供索引、分页、历史等规模测试使用：
+- 类型占比 心情 50% / 灵感 30% / 思考 20%（--mix 可调）
+- 时间分布：最近 --days 天内，按用户时区的早晚高峰，周末更活跃，偶尔连续几天停更
+- 心情带情感分析结果（与 AI_PROVIDER=fake 对同一文本的结果一致，再加少量扰动）和颜色；
+  灵感带关键词和星星位置；思考归入用户的几个主题，带关键词和树的位置
+- 同时写入 user_stats（与 rebuild_user_stats 的结果一致）、user_corpus / user_term_freq
+  （与逐条创建记录累计的语料统计一致）、theme_clusters 和 search_vector；
+  embedding 每条 512 维、体积太大，默认留空（--embeddings 开启）
+
+同一个 --seed 生成完全相同的数据，与 --workers 无关（--end-date 默认为今天，需跨天复现时指定）。
+写入前删除 records 的二级索引，写完重建并 ANALYZE（--keep-indexes 关闭）。
+不应在生产环境中运行
+
+生成的用户邮箱为 gen<seed>_<序号>@example.test，密码均为 journal123
+
+使用方法:
+    python backend/scripts/generate_journals.py --users 100 --records 10000
+    python backend/scripts/generate_journals.py --users 5000 --records 10000 --workers 8       # 5000 万条
+    python backend/scripts/generate_journals.py --users 100 --records 10000 --replace          # 重新生成同一 seed 的数据
+"""
+import sys
+import os
+import argparse
+import io
+import json
+import math
+import multiprocessing
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+# 确保可以导入 app 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.core.segmenter import search_terms, tokenize
+from app.core.timezone import get_zone
+from app.models.record import Record, RecordType
+from app.services.corpus_service import CorpusSnapshot
+from app.services.emotion_service import emotion_service
+from app.services.fake_ai_service import FakeAIService
+from app.services.keyword_service import TOP_K
+from app.services.planet_service import planet_service
+from app.services.search_service import TS_CONFIG
+from app.services.stats_service import StatsAccumulator
+
+PASSWORD = "journal123"
+DEFAULT_MIX = {RecordType.MOOD: 50, RecordType.SPARK: 30, RecordType.THOUGHT: 20}
+# 用户时区（时区名, 权重）
+TIMEZONES = (("Asia/Shanghai", 70), ("Asia/Tokyo", 8), ("Europe/London", 6), ("America/Los_Angeles", 6),
+             ("America/New_York", 6), ("UTC", 4))
+# 一天中写日记的分布：早上和晚上两个高峰，凌晨很少（小时, 权重）
+HOUR_WEIGHTS = [
+    (h, (0.2 if 1 <= h <= 6 else 1) + 3 * math.exp(-((h - 8) ** 2) / 4) + 5 * math.exp(-((h - 22) ** 2) / 6))
+    for h in range(24)
+]
+WEEKEND_WEIGHT = 1.3
+# 每天开始一段停更的概率和停更天数
+BREAK_PROBABILITY = 0.02
+BREAK_DAYS = (3, 20)
+# 心情效价 / 唤起度在 fake 分析结果上的扰动（标准差）
+EMOTION_JITTER = 0.06
+COPY_BATCH_ROWS = 20000
+
+MOOD_SENTENCES = (
+    "今天心情很好，工作很顺利。", "有点累，但还算平静。", "下班路上看到很漂亮的晚霞。",
+    "和朋友吃了顿火锅，聊得很开心。", "最近压力有点大，晚上睡不好。", "项目延期了，有些焦虑。",
+    "一个人在家，感觉有点孤独。", "周末去公园散步，很放松。", "早上被楼上装修吵醒，很烦。",
+    "收到了期待很久的快递，很兴奋！", "考试没考好，有点难过。", "今天什么也没做，安静地待了一天。",
+    "跑完五公里，整个人都轻松了。", "被领导批评了，心里不太舒服。", "给家里打了电话，很温暖。",
+    "下雨天窝在家里看书，很平静。", "明天要出去旅行，好激动！", "担心体检结果，有点紧张。",
+    "和同事吵了一架，很生气。", "做了一顿好吃的晚饭，很满足。", "整理了房间，心情也跟着清爽了。",
+    "加班到很晚，累得不想说话。", "听到喜欢的歌，心情好了很多。", "想起以前的事，有点伤心。",
+)
+SPARK_SENTENCES = (
+    "做一个根据心情颜色生成桌面壁纸的小工具。", "把每天的心情做成一张颜色日历。", "给书架加一个按颜色排列的标签系统。",
+    "周末可以试试用咖啡渣做植物肥料。", "写一个自动整理照片的脚本，按地点分类。", "把跑步路线画成一幅城市地图。",
+    "用旧相机拍一组关于早起的照片。", "做一个记录每天喝水量的小程序。", "把常去的咖啡店做成一张收藏地图。",
+    "给家里的绿植写一份浇水日历。", "录一期关于城市声音的播客。", "把喜欢的电影台词做成明信片。",
+    "试试每天用十分钟画一幅速写。", "做一个随机推荐晚饭的转盘。", "把旅行车票整理成一本手账。",
+    "用音乐的节奏来安排番茄钟。",
+)
+# 思考的主题及句子：主题名即 Record.theme_cluster / ThemeCluster.label
+THOUGHT_SENTENCES = {
+    "工作": ("最近在想怎样把项目拆得更小，每周都能交付一点。", "开会太多会打断专注，需要留出整块时间。",
+            "和同事沟通时先讲结论再讲细节，效率会更高。", "工作中的反馈越早越好，拖到最后代价最大。",
+            "想清楚这份工作真正让我成长的是什么。"),
+    "学习": ("学新东西时先做一个小项目，比只看书有效。", "每天复习一点比考前突击记得更牢。",
+            "把学到的东西讲给别人听，是检验理解的好办法。", "读论文先看结论和图表，再决定要不要细读。",
+            "学习计划太满反而坚持不下去。"),
+    "生活": ("生活里的小仪式感能让平淡的日子有盼头。", "少买一些东西，房间和心情都会轻松很多。",
+            "规律作息比什么补品都有用。", "周末留半天什么都不安排，反而休息得最好。",
+            "做饭是一件很治愈的事情。"),
+    "健康": ("久坐之后腰疼，得每小时起来活动一下。", "跑步最难的是出门那一刻。",
+            "睡前不看手机，入睡明显快了。", "饮食清淡一段时间后，精神好了很多。",
+            "心理健康和身体健康一样需要照顾。"),
+    "阅读": ("读完一本书后写几句笔记，记得更久。", "关于习惯的那本书里说，环境比意志力更重要。",
+            "小说让我理解了和自己完全不同的人。", "每天读二十页，一年也能读完不少书。",
+            "重读以前喜欢的书，会发现不一样的东西。"),
+    "家庭": ("父母年纪大了，要多抽时间陪他们。", "和家人说话时要更有耐心。",
+            "小时候觉得理所当然的事，现在才明白有多不容易。", "家里的规矩其实是一种默契。",
+            "周末和家人一起做饭是最放松的时光。"),
+    "朋友": ("真正的朋友不需要经常联系也不会疏远。", "和老朋友聊天总能想起以前的自己。",
+            "帮助朋友的时候，先听他们想要什么。", "朋友之间也需要边界感。",
+            "新认识的朋友让我看到了不同的生活方式。"),
+    "理财": ("每个月先存一部分钱，再安排消费。", "冲动消费大多发生在心情不好的时候。",
+            "记账之后才发现小额支出加起来很多。", "投资之前要想清楚能承受多大的亏损。",
+            "花钱买时间和体验，比买东西更值得。"),
+    "旅行": ("旅行最好的部分往往是计划之外的事。", "一个人旅行能更专注地感受一个地方。",
+            "去一个城市最好的方式是走路。", "旅行回来后看自己的城市也会不一样。",
+            "少去几个景点，多待一会儿。"),
+    "创作": ("写作最难的是开头，先写烂的初稿也没关系。", "灵感来自每天的积累，不是等来的。",
+            "把想法记下来，很多好点子都是之后才发现的。", "创作需要允许自己犯错。",
+            "每天固定时间创作，比等状态好时更可靠。"),
+}
+
+
+@dataclass
+class Content:
+    """一段候选内容及其预先计算好的字段（均已转义为 COPY 文本格式）"""
+    text: str
+    search_vector: str
+    tokens: Tuple[str, ...] = ()  # 语料统计用的分词结果（未转义）
+    keywords: str = r"\N"
+    embedding: str = r"\N"
+    valence: float = 0.5
+    arousal: float = 0.5
+    primary_emotion: str = ""
+    emotion_scores: str = ""
+
+
+def copy_escape(value: str) -> str:
+    """COPY 文本格式的转义"""
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def copy_json(value) -> str:
+    return copy_escape(json.dumps(value, ensure_ascii=False))
+
+
+def _combinations(sentences: Tuple[str, ...]) -> List[str]:
+    """单句以及两句的组合，使内容不至于只有几十种"""
+    return list(sentences) + [a + b for a in sentences for b in sentences if a != b]
+
+
+def build_content_pool(engine, with_embeddings: bool) -> Dict:
+    """
+    预先计算所有候选内容的 search_vector / 关键词 / 情感分析 / 向量
+
+    Returns:
+        {RecordType.MOOD: [Content], RecordType.SPARK: [Content], RecordType.THOUGHT: {主题: [Content]}}
+    """
+    texts = {
+        RecordType.MOOD: _combinations(MOOD_SENTENCES),
+        RecordType.SPARK: _combinations(SPARK_SENTENCES),
+        RecordType.THOUGHT: {theme: _combinations(s) for theme, s in THOUGHT_SENTENCES.items()},
+    }
+    flat = texts[RecordType.MOOD] + texts[RecordType.SPARK] + [t for ts in texts[RecordType.THOUGHT].values() for t in ts]
+
+    # search_vector 与创建记录时一致：分词后由数据库 to_tsvector 生成
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT to_tsvector(:config, t)::text FROM unnest(:terms) WITH ORDINALITY AS u(t, n) ORDER BY n"),
+            {"config": TS_CONFIG, "terms": [" ".join(search_terms(t)) for t in flat]},
+        ).all()
+    vectors = dict(zip(flat, (copy_escape(r[0]) for r in rows)))
+
+    embeddings = {}
+    if with_embeddings:
+        from app.services.embedding_service import embedding_service
+        for t, vector in zip(flat, embedding_service.embed_batch(flat)):
+            embeddings[t] = "[" + ",".join(f"{x:.5f}" for x in vector) + "]" if vector.any() else r"\N"
+
+    def make(t: str, record_type: RecordType) -> Content:
+        content = Content(
+            copy_escape(t), vectors[t], tuple(tokenize(t, search=True)), embedding=embeddings.get(t, r"\N")
+        )
+        if record_type in TOP_K:
+            terms = list(dict.fromkeys(term for term in search_terms(t) if len(term) >= 2))
+            content.keywords = copy_json(terms[:TOP_K[record_type]])
+        if record_type == RecordType.MOOD:
+            analysis = json.loads(FakeAIService.analyze(t))
+            content.valence = analysis["valence"]
+            content.arousal = analysis["arousal"]
+            content.primary_emotion = analysis["primary_emotion"]
+            content.emotion_scores = copy_json(analysis["emotion_scores"])
+        return content
+
+    return {
+        RecordType.MOOD: [make(t, RecordType.MOOD) for t in texts[RecordType.MOOD]],
+        RecordType.SPARK: [make(t, RecordType.SPARK) for t in texts[RecordType.SPARK]],
+        RecordType.THOUGHT: {
+            theme: [make(t, RecordType.THOUGHT) for t in ts] for theme, ts in texts[RecordType.THOUGHT].items()
+        },
+    }
+
+
+@dataclass
+class Options:
+    database_url: str
+    seed: int
+    records: int
+    days: int
+    end_date: date
+    mix: Dict[RecordType, float]
+    password_hash: str
+
+
+class UserGenerator:
+    """生成单个用户的全部数据，输出 COPY 文本行"""
+
+    def __init__(self, options: Options, pool: Dict):
+        self.options = options
+        self.pool = pool
+        self.types = list(options.mix)
+        self.type_cum_weights = list(_accumulate(options.mix.values()))
+        self.hours = [h for h, _ in HOUR_WEIGHTS]
+        self.hour_cum_weights = list(_accumulate(w for _, w in HOUR_WEIGHTS))
+        self.tz_names = [name for name, _ in TIMEZONES]
+        self.tz_cum_weights = list(_accumulate(w for _, w in TIMEZONES))
+        self.colors: Dict[Tuple[float, float], str] = {}
+
+    def _day_weights(self, rng: random.Random, start_day: date) -> List[float]:
+        """每天被选中的权重：周末更活跃，停更期间为 0"""
+        weights = []
+        paused = 0
+        for offset in range(self.options.days):
+            if paused:
+                paused -= 1
+                weights.append(0.0)
+                continue
+            if rng.random() < BREAK_PROBABILITY:
+                paused = rng.randint(*BREAK_DAYS) - 1
+                weights.append(0.0)
+                continue
+            weekday = (start_day + timedelta(days=offset)).weekday()
+            weights.append((WEEKEND_WEIGHT if weekday >= 5 else 1.0) * rng.uniform(0.5, 1.5))
+        if not any(weights):
+            weights[-1] = 1.0
+        return weights
+
+    def _color(self, valence: float, arousal: float) -> str:
+        key = (valence, arousal)
+        color = self.colors.get(key)
+        if color is None:
+            color = self.colors[key] = emotion_service.emotion_to_color(valence, arousal)
+        return color
+
+    def generate(self, index: int) -> Dict[str, List[str]]:
+        """
+        生成第 index 个用户：随机数序列只由 (seed, index) 决定
+
+        Returns:
+            {"users": [...], "records": [...], "user_stats": [...], "user_corpus": [...], "user_term_freq": [...],
+             "theme_clusters": [...]}，每项为 COPY 文本行
+        """
+        options = self.options
+        rng = random.Random(f"{options.seed}:{index}")
+        user_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        tz_name = rng.choices(self.tz_names, cum_weights=self.tz_cum_weights)[0]
+        zone = get_zone(tz_name)
+
+        # 每个用户有 3-6 个常写的主题，越靠前写得越多
+        themes = rng.sample(list(THOUGHT_SENTENCES), rng.randint(3, 6))
+        theme_cum_weights = list(_accumulate(1 / (i + 1) for i in range(len(themes))))
+
+        # 时间：先按天、再按小时抽样，最后按时间排序
+        start_day = options.end_date - timedelta(days=options.days - 1)
+        day_cum_weights = list(_accumulate(self._day_weights(rng, start_day)))
+        day_starts = [
+            datetime.combine(start_day + timedelta(days=offset), datetime.min.time(), tzinfo=zone).timestamp()
+            for offset in range(options.days)
+        ]
+        n = options.records
+        days = rng.choices(range(options.days), cum_weights=day_cum_weights, k=n)
+        hours = rng.choices(self.hours, cum_weights=self.hour_cum_weights, k=n)
+        moments = sorted(day_starts[d] + h * 3600 + rng.randrange(3600) for d, h in zip(days, hours))
+        types = rng.choices(self.types, cum_weights=self.type_cum_weights, k=n)
+
+        accumulator = StatsAccumulator(tz_name)
+        corpus = CorpusSnapshot()
+        clusters: Dict[str, list] = {}  # 主题 → [id, 位置 JSON, 记录数]
+        spark_count = 0
+        moods = self.pool[RecordType.MOOD]
+        sparks = self.pool[RecordType.SPARK]
+        rows = []
+        for moment, record_type in zip(moments, types):
+            created_at = datetime.fromtimestamp(moment, timezone.utc)
+            accumulator.add(record_type, created_at)
+            emotion = theme = color = position = r"\N"
+
+            if record_type == RecordType.MOOD:
+                content = moods[rng.randrange(len(moods))]
+                valence = round(min(1.0, max(0.0, content.valence + rng.gauss(0, EMOTION_JITTER))), 2)
+                arousal = round(min(1.0, max(0.0, content.arousal + rng.gauss(0, EMOTION_JITTER))), 2)
+                emotion = (
+                    f'{{"valence": {valence}, "arousal": {arousal}, '
+                    f'"primary_emotion": "{content.primary_emotion}", "emotion_scores": {content.emotion_scores}}}'
+                )
+                color = self._color(valence, arousal)
+            elif record_type == RecordType.SPARK:
+                content = sparks[rng.randrange(len(sparks))]
+                # 与创建接口一致：按已有星星数计算位置
+                position = copy_json(planet_service.calculate_star_position(spark_count, spark_count + 1, created_at))
+                spark_count += 1
+            else:
+                theme = rng.choices(themes, cum_weights=theme_cum_weights)[0]
+                candidates = self.pool[RecordType.THOUGHT][theme]
+                content = candidates[rng.randrange(len(candidates))]
+                cluster = clusters.get(theme)
+                if cluster is None:
+                    # 与主题聚类一致：树的位置由主题名和主题创建顺序决定
+                    cluster = clusters[theme] = [
+                        str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                        copy_json(planet_service.calculate_tree_position(theme, len(clusters))),
+                        0,
+                    ]
+                cluster[2] += 1
+                position = cluster[1]
+            corpus.add(content.tokens)
+
+            rows.append("\t".join((
+                str(uuid.UUID(int=rng.getrandbits(128), version=4)), user_id, record_type.name, content.text,
+                emotion, content.keywords, theme, color, position, content.search_vector, content.embedding,
+                created_at.isoformat(),
+            )) + "\n")
+
+        # 注册时间：第一条记录之前的某个时刻
+        registered_at = datetime.fromtimestamp((moments[0] if moments else day_starts[0]) - rng.randrange(1, 86400 * 7), timezone.utc)
+        name = f"gen{options.seed}_{index}"
+        stats = accumulator.values
+        return {
+            "users": ["\t".join((
+                user_id, name, f"{name}@example.test", options.password_hash, "t", "t", tz_name,
+                registered_at.isoformat(),
+            )) + "\n"],
+            "records": rows,
+            "user_stats": ["\t".join((
+                user_id, str(stats["total_records"]), str(stats["mood_count"]), str(stats["spark_count"]),
+                str(stats["thought_count"]), _iso(stats["first_record_date"]), _iso(stats["last_active_date"]),
+                str(stats["active_days"]), str(stats["current_streak"]), str(stats["longest_streak"]),
+                copy_json(stats["weekday_histogram"]), copy_json(stats["hour_histogram"]),
+            )) + "\n"],
+            "user_corpus": [f"{user_id}\t{corpus.doc_count}\n"],
+            "user_term_freq": [
+                f"{user_id}\t{copy_escape(term)}\t{df}\n" for term, df in sorted(corpus.doc_freq.items())
+            ],
+            "theme_clusters": [
+                "\t".join((cluster_id, user_id, copy_escape(theme), copy_json({theme: 1.0}), str(size), position)) + "\n"
+                for theme, (cluster_id, position, size) in clusters.items()
+            ],
+        }
+
+
+def _accumulate(weights):
+    total = 0.0
+    for weight in weights:
+        total += weight
+        yield total
+
+
+def _iso(value: Optional[date]) -> str:
+    return value.isoformat() if value else r"\N"
+
+
+# COPY 的列顺序与 UserGenerator.generate 输出的字段顺序一致
+COPY_COLUMNS = {
+    "users": "id, username, email, hashed_password, is_active, is_email_verified, timezone, created_at",
+    "records": ("id, user_id, type, content, emotion_analysis, keywords, theme_cluster, color_hex, "
+                "position_data, search_vector, embedding, created_at"),
+    "user_stats": ("user_id, total_records, mood_count, spark_count, thought_count, first_record_date, "
+                   "last_active_date, active_days, current_streak, longest_streak, weekday_histogram, hour_histogram"),
+    "user_corpus": "user_id, doc_count",
+    "user_term_freq": "user_id, term, df",
+    "theme_clusters": "id, user_id, label, centroid, size, position",
+}
+
+
+def copy_rows(cursor, table: str, rows: List[str]) -> None:
+    for i in range(0, len(rows), COPY_BATCH_ROWS):
+        buffer = io.StringIO("".join(rows[i:i + COPY_BATCH_ROWS]))
+        cursor.copy_expert(f"COPY {table} ({COPY_COLUMNS[table]}) FROM STDIN", buffer)
+
+
+# worker 进程内的状态（由 _init_worker 设置）
+_worker = {}
+
+
+def _init_worker(options: Options, pool: Dict) -> None:
+    engine = create_engine(options.database_url, poolclass=NullPool)
+    connection = engine.raw_connection()
+    with connection.cursor() as cursor:
+        cursor.execute("SET synchronous_commit TO off")
+    connection.commit()
+    _worker.update(generator=UserGenerator(options, pool), connection=connection)
+
+
+def _load_users(indexes: List[int]) -> int:
+    """生成并写入一批用户（一个事务），返回写入的记录数"""
+    generator, connection = _worker["generator"], _worker["connection"]
+    tables = {table: [] for table in COPY_COLUMNS}
+    for index in indexes:
+        for table, rows in generator.generate(index).items():
+            tables[table].extend(rows)
+    with connection.cursor() as cursor:
+        for table, rows in tables.items():  # users 在前，满足外键
+            copy_rows(cursor, table, rows)
+    connection.commit()
+    return len(tables["records"])
+
+
+def _record_indexes():
+    """records 上可以先删后建的二级索引（主键除外）"""
+    return sorted(Record.__table__.indexes, key=lambda index: index.name)
+
+
+def generate_journals(
+    database_url: str,
+    users: int,
+    records: int,
+    seed: int = 42,
+    days: int = 730,
+    end_date: date = None,
+    mix: Dict[RecordType, float] = None,
+    workers: int = 1,
+    with_embeddings: bool = False,
+    keep_indexes: bool = False,
+    replace: bool = False,
+) -> bool:
+    """生成并写入合成日记"""
+
+    # 环境检查
+    app_env = os.environ.get("ENVIRONMENT", "development")
+    if app_env == "production":
+        print("❌ 错误: 此脚本不应在生产环境运行")
+        print("   当前环境: ENVIRONMENT=production")
+        return False
+
+    engine = create_engine(database_url, poolclass=NullPool)
+    pattern = f"gen{seed}\\_%@example.test"
+    with engine.begin() as conn:
+        existing = conn.execute(text("SELECT count(*) FROM users WHERE email LIKE :p"), {"p": pattern}).scalar()
+        if existing and not replace:
+            print(f"❌ 已存在 {existing} 个 seed={seed} 生成的用户，使用 --replace 重新生成或换一个 --seed")
+            return False
+        if existing:
+            print(f"删除已有的 {existing} 个 seed={seed} 用户（级联删除其记录）...")
+            conn.execute(text("DELETE FROM users WHERE email LIKE :p"), {"p": pattern})
+
+    options = Options(
+        database_url=database_url,
+        seed=seed,
+        records=records,
+        days=days,
+        end_date=end_date or date.today(),
+        mix=mix or DEFAULT_MIX,
+        password_hash=get_password_hash(PASSWORD),
+    )
+    print(f"用户: {users}  每人记录: {records}  总计: {users * records:,}  workers: {workers}")
+    print(f"时间范围: {options.end_date - timedelta(days=days - 1)} ~ {options.end_date}  seed: {seed}")
+
+    started = time.perf_counter()
+    pool = build_content_pool(engine, with_embeddings)
+
+    # 每批约 20 万条记录，一批一个事务
+    batch_size = max(1, 200_000 // max(records, 1))
+    batches = [list(range(i, min(i + batch_size, users))) for i in range(0, users, batch_size)]
+
+    dropped = []
+    try:
+        if not keep_indexes:
+            with engine.begin() as conn:
+                for index in _record_indexes():
+                    conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+                    dropped.append(index)
+            print(f"已删除 records 的 {len(dropped)} 个二级索引，写完后重建")
+
+        loaded = 0
+        if workers > 1:
+            with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(options, pool)) as processes:
+                for count in processes.imap_unordered(_load_users, batches):
+                    loaded += count
+                    _progress(loaded, users * records, started)
+        else:
+            _init_worker(options, pool)
+            try:
+                for batch in batches:
+                    loaded += _load_users(batch)
+                    _progress(loaded, users * records, started)
+            finally:
+                _worker.pop("connection").close()
+        print()
+        print(f"✅ 写入完成，用时 {time.perf_counter() - started:.1f}s")
+    finally:
+        if dropped:
+            index_started = time.perf_counter()
+            with engine.begin() as conn:
+                conn.execute(text("SET maintenance_work_mem TO '1GB'"))
+                for index in dropped:
+                    index.create(conn, checkfirst=True)
+            print(f"   已重建索引，用时 {time.perf_counter() - index_started:.1f}s")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in COPY_COLUMNS:
+            conn.execute(text(f"ANALYZE {table}"))
+    engine.dispose()
+
+    print(f"   总用时 {time.perf_counter() - started:.1f}s")
+    print(f"   登录: gen{seed}_0@example.test / {PASSWORD}")
+    return True
+
+
+def _progress(loaded: int, total: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    print(f"\r   {loaded:,} / {total:,} 条  {loaded / max(elapsed, 1e-9):,.0f} 条/s", end="", flush=True)
+
+
+def parse_mix(value: str) -> Dict[RecordType, float]:
+    """"mood=50,spark=30,thought=20" → {RecordType.MOOD: 50, ...}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        try:
+            mix[RecordType[name.strip().upper()]] = float(weight)
+        except (KeyError, ValueError):
+            raise argparse.ArgumentTypeError(f"无效的类型占比: {part}（格式如 mood=50,spark=30,thought=20）")
+    return mix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成大规模合成日记")
+    parser.add_argument("--users", type=int, default=10, help="用户数")
+    parser.add_argument("--records", type=int, default=10000, help="每个用户的记录数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子，同一 seed 生成相同数据")
+    parser.add_argument("--days", type=int, default=730, help="记录分布的天数（截至 --end-date）")
+    parser.add_argument("--end-date", type=date.fromisoformat, help="最后一天 YYYY-MM-DD，默认今天")
+    parser.add_argument("--mix", type=parse_mix, help="类型占比，如 mood=50,spark=30,thought=20")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="并行生成/写入的进程数")
+    parser.add_argument("--embeddings", action="store_true", help="同时写入语义向量（体积大、较慢）")
+    parser.add_argument("--keep-indexes", action="store_true", help="写入时保留 records 的二级索引")
+    parser.add_argument("--replace", action="store_true", help="先删除同一 seed 已生成的用户")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="默认使用 DATABASE_URL")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("开发/测试数据脚本 - 生成大规模合成日记")
+    print("=" * 60)
+    print()
+
+    success = generate_journals(
+        args.database_url,
+        users=args.users,
+        records=args.records,
+        seed=args.seed,
+        days=args.days,
+        end_date=args.end_date,
+        mix=args.mix,
+        workers=args.workers,
+        with_embeddings=args.embeddings,
+        keep_indexes=args.keep_indexes,
+        replace=args.replace,
+    )
+
+    print("=" * 60)
+
+    sys.exit(0 if success else 1)
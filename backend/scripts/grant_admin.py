@@ -0,0 +1,87 @@
+"""
+维护脚本 - 授予 / 撤销管理员权限
+
+管理员可访问 /api/v1/admin 接口（采样剖析等）。按用户 ID 精确匹配，
+不按邮箱授予：邮箱由用户自行注册，无法证明归属
+
+使用方法:
+    python backend/scripts/grant_admin.py <user_id>             # 授予
+    python backend/scripts/grant_admin.py <user_id> --revoke    # 撤销
+    python backend/scripts/grant_admin.py --list                # 列出当前管理员
+"""
+import sys
+import os
+import argparse
+import uuid
+
+# 确保可以导入 app 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from app.core.database import SessionLocal
+from app.models.user import User
+
+
+def list_admins() -> bool:
+    """列出当前管理员"""
+    db = SessionLocal()
+    try:
+        admins = db.query(User).filter(User.is_admin.is_(True)).order_by(User.created_at).all()
+        if not admins:
+            print("ℹ️  当前没有管理员")
+        for user in admins:
+            print(f"   {user.id}  {user.email}  ({user.username})")
+        return True
+    finally:
+        db.close()
+
+
+def grant_admin(user_id: str, revoke: bool = False) -> bool:
+    """授予或撤销某个用户的管理员权限"""
+    try:
+        user_uuid = uuid.UUID(user_id)
+    except ValueError:
+        print(f"❌ 无效的用户 ID: {user_id}")
+        return False
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_uuid).first()
+        if not user:
+            print(f"❌ 用户不存在: {user_id}")
+            return False
+
+        user.is_admin = not revoke
+        db.commit()
+        print(f"✅ 已{'撤销' if revoke else '授予'}管理员权限")
+        print(f"   ID: {user.id}")
+        print(f"   邮箱: {user.email}")
+        print(f"   用户名: {user.username}")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 操作失败: {type(e).__name__}")
+        print(f"   错误详情: {str(e)}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="授予 / 撤销管理员权限")
+    parser.add_argument("user_id", nargs="?", help="用户 ID（UUID）")
+    parser.add_argument("--revoke", action="store_true", help="撤销管理员权限")
+    parser.add_argument("--list", action="store_true", help="列出当前管理员")
+    args = parser.parse_args()
+
+    if args.list:
+        success = list_admins()
+    elif args.user_id:
+        success = grant_admin(args.user_id, revoke=args.revoke)
+    else:
+        parser.error("需要指定用户 ID 或 --list")
+
+    sys.exit(0 if success else 1)
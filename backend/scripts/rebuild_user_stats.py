@@ -0,0 +1,65 @@
+"""
+维护脚本 - 重建用户统计汇总（user_stats）
+
+从 records 单次流式遍历重建每个用户的统计行。
+适用于：迁移上线后为老用户回填、修复统计偏差。可重复执行
+
+使用方法:
+    python backend/scripts/rebuild_user_stats.py              # 重建全部用户
+    python backend/scripts/rebuild_user_stats.py <user_id>    # 只重建某个用户
+"""
+import sys
+import os
+import time
+
+# 确保可以导入 app 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services.stats_service import stats_service
+
+
+def rebuild_user_stats(user_id: str = None):
+    """重建统计汇总"""
+    db = SessionLocal()
+    started = time.perf_counter()
+
+    try:
+        if user_id:
+            user = db.query(User).filter(User.id == user_id).first()
+            if not user:
+                print(f"❌ 用户不存在: {user_id}")
+                return False
+            stats_service.rebuild(db, user)
+            db.commit()
+            count = 1
+        else:
+            count = stats_service.rebuild_all(db)
+
+        print(f"✅ 已重建 {count} 个用户的统计，用时 {time.perf_counter() - started:.2f}s")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 重建失败: {type(e).__name__}")
+        print(f"   错误详情: {str(e)}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("维护脚本 - 重建用户统计汇总")
+    print("=" * 60)
+    print()
+
+    success = rebuild_user_stats(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    print("=" * 60)
+
+    sys.exit(0 if success else 1)
@@ -0,0 +1,77 @@
+"""
+维护脚本 - 思考主题离线重新聚类
+
+在线归类只会逐条并入最近的主题，长期运行后主题可能碎片化或漂移。
+此脚本对每个用户全量重建语料统计并重新聚类，回写记录的主题和树的位置。
+建议定期执行（如每天凌晨的 cron 任务），可重复执行
+
+使用方法:
+    python backend/scripts/recluster_themes.py              # 全部有思考记录的用户
+    python backend/scripts/recluster_themes.py <user_id>    # 只处理某个用户
+"""
+import sys
+import os
+import asyncio
+import time
+
+# 确保可以导入 app 模块
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from app.core.database import SessionLocal
+from app.models.record import Record, RecordType
+from app.models.user import User
+from app.services.sync_service import sync_service
+from app.services.theme_service import theme_service
+
+
+def recluster_themes(user_id: str = None):
+    """重新聚类"""
+    db = SessionLocal()
+    started = time.perf_counter()
+
+    try:
+        query = db.query(User)
+        if user_id:
+            query = query.filter(User.id == user_id)
+        else:
+            query = query.filter(
+                db.query(Record.id).filter(
+                    Record.user_id == User.id,
+                    Record.type == RecordType.THOUGHT
+                ).exists()
+            )
+        users = query.all()
+
+        for user in users:
+            count = theme_service.recluster_user(db, user)
+            db.commit()
+            # 主题变化会改变星球上的树，递增数据版本使客户端缓存失效
+            asyncio.run(sync_service.bump_version(str(user.id)))
+            print(f"   {user.username}: {count} 个主题")
+
+        print(f"✅ 已处理 {len(users)} 个用户，用时 {time.perf_counter() - started:.2f}s")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 重新聚类失败: {type(e).__name__}")
+        print(f"   错误详情: {str(e)}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("维护脚本 - 思考主题重新聚类")
+    print("=" * 60)
+    print()
+
+    success = recluster_themes(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    print("=" * 60)
+
+    sys.exit(0 if success else 1)
@@ -138,9 +138,25 @@ export const recordsApi = {
       { params }
     ),
 
+  // 全文检索（cursor 传上一页返回的 next_cursor）
+  search: (params: {
+    q: string
+    record_type?: string
+    start?: string
+    end?: string
+    sort?: 'relevance' | 'recent'
+    cursor?: string
+    limit?: number
+  }) =>
+    api.get<{ records: RecordItem[]; next_cursor: string | null }>('/records/search', { params }),
+
   // 获取单条记录
   get: (id: string) => api.get<RecordItem>(`/records/${id}`),
 
+  // 语义相似的记录
+  similar: (id: string, params?: { limit?: number; record_type?: string }) =>
+    api.get<{ records: { record: RecordItem; similarity: number }[] }>(`/records/${id}/similar`, { params }),
+
   // 删除记录
   delete: (id: string) => api.delete(`/records/${id}`),
 
@@ -190,8 +206,11 @@ export interface PlanetHistory {
   history: PlanetHistoryItem[]
   start_date: string
   end_date: string
+  resolution: HistoryResolution
 }
 
+export type HistoryResolution = 'day' | 'week' | 'month'
+
 export interface PlanetStats {
   total_records: number
   mood_count: number
@@ -199,6 +218,12 @@ export interface PlanetStats {
   thought_count: number
   start_date?: string
   days_active: number
+  active_days: number
+  current_streak: number
+  longest_streak: number
+  last_active_date?: string
+  weekday_histogram: number[]  // 周一为 0
+  hour_histogram: number[]
 }
 
 export const planetApi = {
@@ -207,7 +232,7 @@ export const planetApi = {
   },
 
   // 获取历史数据
-  getHistory: (days: number = 30) => {    return api.get<PlanetHistory>('/planet/history', { params: { days } })
+  getHistory: (days: number = 30, resolution: HistoryResolution = 'day') => {    return api.get<PlanetHistory>('/planet/history', { params: { days, resolution } })
   },
 
   // 获取统计信息
@@ -221,6 +246,7 @@ export interface UserRegister {
   username: string
   email: string
   password: string
+  timezone?: string
 }
 
 export interface UserLogin {
@@ -240,6 +266,7 @@ export interface UserResponse {
   email: string
   is_active: boolean
   is_email_verified: boolean
+  timezone: string
   created_at: string
 }
 
@@ -250,7 +277,9 @@ export interface MessageResponse {
 export const authApi = {
   // 注册
   register: (data: UserRegister) => {
-    return api.post<MessageResponse>('/auth/register', data)
+    // 默认使用浏览器时区，星球按用户本地日期划分"一天"
+    const timezone = Intl.DateTimeFormat().resolvedOptions().timeZone
+    return api.post<MessageResponse>('/auth/register', { timezone, ...data })
   },
 
   // 验证邮箱
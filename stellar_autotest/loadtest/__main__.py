@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+压测入口（在 stellar_autotest 目录下运行）
+
+    python -m loadtest                              # 使用 config.yaml 的 load_test 配置
+    python -m loadtest --users 50 --duration 120    # 覆盖并发数和时长
+    python -m loadtest --baseline reports/load/v1.json   # 与上一版本的报告对比
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from utils.config_manager import config
+from utils.logger import logger
+from .runner import LoadTestError, compare_reports, run_load_test, save_report
+
+
+def main() -> int:
+    settings = config.get_load_test()
+    parser = argparse.ArgumentParser(description="Stellar-Journal 压测")
+    parser.add_argument("--users", type=int, default=settings.get("users", 10), help="并发虚拟用户数")
+    parser.add_argument("--duration", type=float, default=settings.get("duration", 60), help="压测时长（秒）")
+    parser.add_argument("--ramp-up", type=float, default=settings.get("ramp_up", 10), help="虚拟用户全部启动所需秒数")
+    parser.add_argument("--user-mode", choices=["register", "shared"], default=settings.get("user_mode", "register"),
+                        help="register: 每个虚拟用户注册独立账号；shared: 共用 test_user")
+    parser.add_argument("--max-connections", type=int, default=settings.get("max_connections", 100))
+    parser.add_argument("--seed", type=int, default=settings.get("seed"), help="随机种子（固定后动作序列可复现）")
+    parser.add_argument("--base-url", default=None, help="默认取 test_env.base_url")
+    parser.add_argument("--output", default=None, help="报告路径，默认写到 load_test.output_dir")
+    parser.add_argument("--baseline", default=None, help="对比用的基线报告")
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(run_load_test(
+            users=args.users,
+            duration=args.duration,
+            ramp_up=args.ramp_up,
+            think_time=settings.get("think_time"),
+            mix=settings.get("mix"),
+            user_mode=args.user_mode,
+            max_connections=args.max_connections,
+            seed=args.seed,
+            base_url=args.base_url,
+        ))
+    except LoadTestError as e:
+        logger.error(f"[loadtest] {e}")
+        return 1
+
+    path = save_report(report, args.output)
+    total = report["total"]
+    logger.info(
+        f"[loadtest] 完成：{total['requests']} 个请求，{total['throughput_rps']} req/s，"
+        f"p95 {total['latency_ms']['p95']}ms，错误率 {total['error_rate']:.2%}"
+    )
+    logger.info(f"[loadtest] 报告已写入 {path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n".join(compare_reports(report, baseline)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
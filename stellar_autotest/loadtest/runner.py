@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+压测执行器 - 并发虚拟用户 + 按接口统计吞吐与延迟分位数
+
+流程：
+  1. 准备阶段（不计时）：每个虚拟用户注册并登录独立账号（user_mode=register），
+     或共用 config.yaml 的 test_user（user_mode=shared，受单用户限流影响较大）
+  2. 压测阶段：虚拟用户在 ramp_up 秒内依次启动，按 mix 权重随机选择动作，
+     动作之间随机停顿 think_time 秒，直到 duration 结束
+  3. 输出 JSON 报告：每个接口的请求数、吞吐、状态码分布、延迟 min/mean/p50/p90/p95/p99/max
+"""
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from utils.config_manager import config
+from utils.logger import logger
+from .scenarios import ACTIONS, DEFAULT_MIX
+
+PERCENTILES = (50, 90, 95, 99)
+REGISTER_PASSWORD = "LoadTest1234"
+
+
+class LoadTestError(RuntimeError):
+    """准备阶段失败（无法登录等）"""
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法分位数（sorted_values 需已升序）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Stats:
+    """按接口名聚合请求结果"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, name: str, status: str, seconds: float) -> None:
+        self.latencies[name].append(seconds)
+        self.statuses[name][status] += 1
+
+    def _summary(self, latencies: List[float], statuses: Counter, duration: float) -> Dict[str, Any]:
+        values = sorted(latencies)
+        ok = sum(n for status, n in statuses.items() if status.startswith(("2", "304")))
+        ms = lambda s: round(s * 1000, 2)
+        return {
+            "requests": len(values),
+            "ok": ok,
+            "errors": len(values) - ok,
+            "error_rate": round((len(values) - ok) / len(values), 4) if values else 0.0,
+            "throughput_rps": round(len(values) / duration, 2) if duration else 0.0,
+            "status_codes": dict(sorted(statuses.items())),
+            "latency_ms": {
+                "min": ms(values[0]) if values else 0.0,
+                "mean": ms(sum(values) / len(values)) if values else 0.0,
+                **{f"p{p}": ms(percentile(values, p)) for p in PERCENTILES},
+                "max": ms(values[-1]) if values else 0.0,
+            },
+        }
+
+    def report(self) -> Dict[str, Any]:
+        duration = (self.finished or time.perf_counter()) - self.started
+        endpoints = {
+            name: self._summary(self.latencies[name], self.statuses[name], duration)
+            for name in sorted(self.latencies)
+        }
+        all_latencies = [s for values in self.latencies.values() for s in values]
+        all_statuses = sum(self.statuses.values(), Counter())
+        return {
+            "duration_seconds": round(duration, 2),
+            "total": self._summary(all_latencies, all_statuses, duration),
+            "endpoints": endpoints,
+        }
+
+
+class VirtualUserClient:
+    """单个虚拟用户的客户端：共享连接池，自带 token，每次请求计入统计"""
+
+    def __init__(self, http: httpx.AsyncClient, stats: Stats, token: str):
+        self.http = http
+        self.stats = stats
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def request(self, method: str, endpoint: str, name: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(method, endpoint, headers=self.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(name, type(e).__name__, time.perf_counter() - started)
+            return None
+        self.stats.record(name, str(response.status_code), time.perf_counter() - started)
+        return response
+
+    async def get(self, endpoint: str, name: str, **kwargs) -> Optional[httpx.Response]:
+        return await self.request("GET", endpoint, name, **kwargs)
+
+    async def post(self, endpoint: str, name: str, **kwargs) -> Optional[httpx.Response]:
+        return await self.request("POST", endpoint, name, **kwargs)
+
+
+def _check_rate_limited(response: httpx.Response, step: str) -> None:
+    """准备阶段被限流时直接中止：继续压测只会得到一堆 401"""
+    if response.status_code == 429:
+        raise LoadTestError(
+            f"{step}被限流 (429)，准备阶段需要为每个虚拟用户注册和登录，"
+            f"请以 RATE_LIMIT_ENABLED=false 启动后端再压测"
+        )
+
+
+async def _login(http: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await http.post("/auth/login", json={"email": email, "password": password})
+    _check_rate_limited(response, "登录")
+    if response.status_code != 200:
+        raise LoadTestError(f"登录失败 {email}: {response.status_code} {response.text[:200]}")
+    return response.json()["access_token"]
+
+
+async def _register_and_login(http: httpx.AsyncClient) -> str:
+    uid = uuid.uuid4().hex[:8]
+    email = f"load_{uid}@stellar.auto"
+    response = await http.post("/auth/register", json={
+        "username": f"loaduser_{uid}",
+        "email": email,
+        "password": REGISTER_PASSWORD,
+    })
+    _check_rate_limited(response, "注册")
+    if response.status_code not in (200, 201):
+        raise LoadTestError(f"注册失败 {email}: {response.status_code} {response.text[:200]}")
+    return await _login(http, email, REGISTER_PASSWORD)
+
+
+async def prepare_tokens(http: httpx.AsyncClient, users: int, user_mode: str) -> List[str]:
+    """准备阶段：为每个虚拟用户拿到 access_token（不计入统计）"""
+    if user_mode == "shared":
+        user = config.get_test_user()
+        token = await _login(http, user["email"], user["password"])
+        return [token] * users
+    # 注册和登录都要做 bcrypt，限制并发避免准备阶段把服务端打满
+    semaphore = asyncio.Semaphore(8)
+
+    async def one() -> str:
+        async with semaphore:
+            return await _register_and_login(http)
+
+    return list(await asyncio.gather(*(one() for _ in range(users))))
+
+
+async def _virtual_user(client: VirtualUserClient, mix: Dict[str, int], rng: random.Random,
+                        start_delay: float, deadline: float, think_time: List[float]) -> None:
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    await asyncio.sleep(start_delay)
+    while time.perf_counter() < deadline:
+        action = ACTIONS[rng.choices(names, weights)[0]]
+        await action(client, rng)
+        await asyncio.sleep(rng.uniform(*think_time))
+
+
+async def run_load_test(
+    users: int,
+    duration: float,
+    ramp_up: float = 0.0,
+    think_time: Optional[List[float]] = None,
+    mix: Optional[Dict[str, int]] = None,
+    user_mode: str = "register",
+    max_connections: int = 100,
+    seed: Optional[int] = None,
+    base_url: Optional[str] = None,
+) -> Dict[str, Any]:
+    """执行一轮压测，返回 JSON 报告（dict）"""
+    mix = {**DEFAULT_MIX, **(mix or {})}
+    unknown = set(mix) - set(ACTIONS)
+    if unknown:
+        raise LoadTestError(f"未知的动作: {sorted(unknown)}，可选: {sorted(ACTIONS)}")
+    think_time = think_time or [0.5, 2.0]
+    base_url = (base_url or config.get_base_url()).rstrip("/")
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=config.get_timeout(), limits=limits) as http:
+        logger.info(f"[loadtest] 准备 {users} 个虚拟用户（{user_mode}）...")
+        tokens = await prepare_tokens(http, users, user_mode)
+
+        logger.info(f"[loadtest] 开始压测：{duration}s，ramp-up {ramp_up}s，目标 {base_url}")
+        stats = Stats()
+        deadline = stats.started + duration
+        master = random.Random(seed)
+        await asyncio.gather(*(
+            _virtual_user(
+                VirtualUserClient(http, stats, token),
+                mix,
+                random.Random(master.random()),
+                ramp_up * i / users,
+                deadline,
+                think_time,
+            )
+            for i, token in enumerate(tokens)
+        ))
+        stats.finished = time.perf_counter()
+
+    report = stats.report()
+    report["meta"] = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "base_url": base_url,
+        "users": users,
+        "duration": duration,
+        "ramp_up": ramp_up,
+        "think_time": think_time,
+        "user_mode": user_mode,
+        "max_connections": max_connections,
+        "seed": seed,
+        "mix": mix,
+    }
+    return report
+
+
+def save_report(report: Dict[str, Any], output: Optional[str] = None) -> Path:
+    """写入 JSON 报告；未指定路径时写到 load_test.output_dir 下并按时间命名"""
+    if output:
+        path = Path(output)
+    else:
+        output_dir = Path(config.get("load_test.output_dir", "./reports/load"))
+        if not output_dir.is_absolute():
+            output_dir = Path(__file__).resolve().parent.parent / output_dir
+        path = output_dir / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def compare_reports(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """与基线报告逐接口对比吞吐和 p95（用于版本间比较）"""
+    lines = [f"{'endpoint':<36}{'rps':>16}{'p95 ms':>22}"]
+    rows = [("TOTAL", report["total"], baseline.get("total"))]
+    rows += [(name, summary, baseline["endpoints"].get(name)) for name, summary in report["endpoints"].items()]
+    for name, current, base in rows:
+        rps, p95 = current["throughput_rps"], current["latency_ms"]["p95"]
+        if base is None:
+            lines.append(f"{name:<36}{rps:>16}{p95:>22}")
+            continue
+        base_rps, base_p95 = base["throughput_rps"], base["latency_ms"]["p95"]
+        rps_delta = f"{(rps / base_rps - 1) * 100:+.1f}%" if base_rps else "n/a"
+        p95_delta = f"{(p95 / base_p95 - 1) * 100:+.1f}%" if base_p95 else "n/a"
+        lines.append(f"{name:<36}{f'{rps} ({rps_delta})':>16}{f'{p95} ({p95_delta})':>22}")
+    return lines
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+压测场景 - 虚拟用户的动作及默认权重
+
+每个动作是一个 async 函数 (client, rng) -> None，请求通过 client 发出并计入统计；
+权重可在 config.yaml 的 load_test.mix 中覆盖（0 表示不执行）
+"""
+import random
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict
+
+MOOD_TEXTS = [
+    "今天项目进展顺利，心情很好，晚上看到了漂亮的夕阳。",
+    "加班到很晚，有点累，但是把难题解决了。",
+    "下雨天，窝在家里看书，很平静。",
+    "和朋友吵了一架，心里很烦躁。",
+    "收到了期待已久的快递，开心！",
+]
+SPARK_TEXTS = [
+    "用情绪驱动的颜色系统可以做成一款治愈系桌面壁纸生成器。",
+    "也许可以把每周的记录自动生成一首小诗。",
+    "通勤路上听播客时想到：番茄钟应该根据疲劳程度动态调整。",
+    "给植物装个湿度传感器，缺水时发消息提醒。",
+]
+THOUGHT_TEXTS = [
+    "记录这件事本身就是一种仪式感，它让我意识到每天的微小变化。",
+    "工作和生活的边界越来越模糊，需要重新想想优先级。",
+    "读完那本书之后一直在想，习惯到底是被设计出来的还是自然形成的。",
+    "关于工作：与其追求效率，不如先想清楚哪些事情值得做。",
+]
+
+Action = Callable[..., Awaitable[None]]
+
+
+async def poll_planet_state(client, rng: random.Random) -> None:
+    """轮询星球状态（前端每次打开页面 / 定时刷新）"""
+    await client.get("/planet/state", name="GET /planet/state")
+
+
+async def post_mood(client, rng: random.Random) -> None:
+    await client.post("/records/", name="POST /records/ (mood)",
+                      json={"type": "mood", "content": rng.choice(MOOD_TEXTS)})
+
+
+async def post_spark(client, rng: random.Random) -> None:
+    await client.post("/records/", name="POST /records/ (spark)",
+                      json={"type": "spark", "content": rng.choice(SPARK_TEXTS)})
+
+
+async def post_thought(client, rng: random.Random) -> None:
+    await client.post("/records/", name="POST /records/ (thought)",
+                      json={"type": "thought", "content": rng.choice(THOUGHT_TEXTS)})
+
+
+async def page_history(client, rng: random.Random) -> None:
+    """翻看历史：按日 / 周 / 月粒度向前翻页"""
+    resolution, days = rng.choice([("day", 30), ("week", 90), ("month", 365)])
+    end = date.today() - timedelta(days=days * rng.randint(0, 2))
+    await client.get("/planet/history", name=f"GET /planet/history ({resolution})",
+                     params={"days": days, "resolution": resolution, "end": end.isoformat()})
+
+
+async def list_records(client, rng: random.Random) -> None:
+    """记录列表分页"""
+    page = rng.randint(0, 4)
+    await client.get("/records/", name="GET /records/", params={"skip": page * 20, "limit": 20})
+
+
+async def planet_stats(client, rng: random.Random) -> None:
+    await client.get("/planet/stats", name="GET /planet/stats")
+
+
+ACTIONS: Dict[str, Action] = {
+    "poll_planet_state": poll_planet_state,
+    "post_mood": post_mood,
+    "post_spark": post_spark,
+    "post_thought": post_thought,
+    "page_history": page_history,
+    "list_records": list_records,
+    "planet_stats": planet_stats,
+}
+
+# 默认请求构成：以读为主，写入约占四分之一
+DEFAULT_MIX: Dict[str, int] = {
+    "poll_planet_state": 45,
+    "post_mood": 10,
+    "post_spark": 8,
+    "post_thought": 7,
+    "page_history": 15,
+    "list_records": 10,
+    "planet_stats": 5,
+}
@@ -4,9 +4,11 @@
 #   ./run.ps1 -Mark smoke       # 只跑冒烟用例
 #   ./run.ps1 -Mark auth        # 只跑认证模块
 #   ./run.ps1 -Report           # 跑完后自动打开 Allure 报告
+#   ./run.ps1 -Workers 4        # 4 个进程并行执行（pytest-xdist）
 
 param(
     [string]$Mark = "",
+    [int]$Workers = 0,
     [switch]$Report
 )
 
@@ -24,6 +26,10 @@ if ($Mark -ne "") {
 } else {
     Write-Host ">>> 运行全部用例" -ForegroundColor Yellow
 }
+if ($Workers -gt 0) {
+    $cmd += " -n $Workers"
+    Write-Host ">>> 并行进程数: $Workers" -ForegroundColor Yellow
+}
 
 # 执行测试
 Write-Host ">>> 开始执行..." -ForegroundColor Cyan
@@ -1,16 +1,21 @@
 # -*- coding: utf-8 -*-
 """
 pytest 全局配置文件
-- 提供带鉴权的 http_client fixture（session 级，整轮测试只登录一次）
+- 提供带鉴权的 http_client / async_client fixture（session 级，整轮测试只登录一次）
+- pytest-xdist 并行时每个 worker 注册独立的测试账号（worker_credentials），
+  用例数据和按用户的限流互不影响
 - 提供不带 token 的 anon_client fixture（用于测 401 场景）
 - 提供各业务测试数据 fixture
 - 提供用例前后置日志 + Allure 钩子
 """
+import os
 import uuid
 import pytest
 import allure
 
+from utils.async_http_client import AsyncHTTPClient
 from utils.http_client import HTTPClient
+from utils.http_recorder import http_recorder
 from utils.config_manager import config
 from utils.logger import logger
 
@@ -20,34 +25,79 @@ from utils.logger import logger
 # =============================================================================
 
 @pytest.fixture(scope="session")
-def http_client() -> HTTPClient:
+def worker_credentials() -> dict:
     """
-    带有效 Bearer token 的 HTTP 客户端（整轮测试只登录一次）。
-    从 config.yaml 的 test_user 读账号，调 POST /auth/login 拿 access_token。
-    如果登录失败会直接报错，避免后续用例全部带着「无 token」运行。
+    本进程使用的测试账号。
+    单进程运行时使用 config.yaml 的 test_user；pytest-xdist 并行时（PYTEST_XDIST_WORKER=gw0、gw1...）
+    每个 worker 注册一个独立账号，避免并行用例共用同一用户的数据和限流配额。
     """
-    client = HTTPClient()
-    user = config.get_test_user()
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if not worker:
+        return config.get_test_user()
+
+    uid = uuid.uuid4().hex[:8]
+    credentials = {"email": f"autotest_{worker}_{uid}@stellar.auto", "password": "AutoTest1234"}
+    response = HTTPClient().post("/auth/register", json_data={
+        "username": f"autotest_{worker}_{uid}",
+        **credentials,
+    })
+    assert response.status_code in (200, 201), (
+        f"[conftest] worker {worker} 注册测试账号失败，状态码: {response.status_code}，响应: {response.text}"
+    )
+    logger.info(f"[conftest] worker {worker} 使用独立账号: {credentials['email']}")
+    return credentials
 
-    logger.info(f"[conftest] 开始登录，账号: {user['email']}")
-    response = client.post("/auth/login", json_data={
+
+def _login(client, user: dict):
+    return client.post("/auth/login", json_data={
         "email": user["email"],
         "password": user["password"],
     })
 
+
+def _access_token(response, user: dict) -> str:
     assert response.status_code == 200, (
         f"登录失败，状态码: {response.status_code}，响应: {response.text}\n"
         f"请确认 config.yaml 里的 test_user 账号已注册且密码正确。"
     )
-
     token = response.json().get("access_token")
     assert token, "登录成功但响应中未找到 access_token"
+    return token
 
+
+@pytest.fixture(scope="session")
+def http_client(worker_credentials) -> HTTPClient:
+    """
+    带有效 Bearer token 的 HTTP 客户端（整轮测试只登录一次）。
+    账号来自 worker_credentials，调 POST /auth/login 拿 access_token。
+    如果登录失败会直接报错，避免后续用例全部带着「无 token」运行。
+    """
+    client = HTTPClient()
+    logger.info(f"[conftest] 开始登录，账号: {worker_credentials['email']}")
+    token = _access_token(_login(client, worker_credentials), worker_credentials)
     client.set_bearer_token(token)
     logger.info("[conftest] 登录成功，Bearer token 已设置")
     return client
 
 
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    """async 用例（@pytest.mark.anyio）运行在 asyncio 上；session 级，供 session 级 async fixture 使用"""
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def async_client(anyio_backend, worker_credentials):
+    """
+    带 token 的异步客户端（整轮测试共用一个连接池），用于 @pytest.mark.anyio 的并发用例。
+    """
+    client = AsyncHTTPClient()
+    token = _access_token(await _login(client, worker_credentials), worker_credentials)
+    client.set_bearer_token(token)
+    yield client
+    await client.aclose()
+
+
 @pytest.fixture(scope="function")
 def anon_client() -> HTTPClient:
     """
@@ -125,6 +175,7 @@ def invalid_payloads() -> dict:
 def test_lifecycle(request):
     """每条用例：执行前打印名称，执行后打印结果，Allure 挂附件"""
     name = request.node.name
+    http_recorder.reset()
     logger.info(f"[START] {name}")
     with allure.step("用例初始化"):
         allure.attach(name, name="用例名称", attachment_type=allure.attachment_type.TEXT)
@@ -165,3 +216,6 @@ def pytest_runtest_makereport(item, call):
                 name="错误详情",
                 attachment_type=allure.attachment_type.TEXT,
             )
+        # http_log.mode=on_failure 时，请求详情只在失败时才挂附件
+        with allure.step("本用例的请求"):
+            http_recorder.attach_recorded()
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 """
 星球模块接口用例
-覆盖：获取星球状态 / 历史 / 统计
+覆盖：获取星球状态 / 增量同步 / 区间状态 / 历史 / 统计
 """
+import asyncio
 import pytest
 import allure
+from datetime import date, timedelta
 
 from utils.assertion_helper import assert_helper
 
@@ -26,6 +28,19 @@ class TestPlanetState:
         assert_helper.assert_field_type(response, "trees", list)
         assert_helper.assert_response_time(response, 5.0)
 
+    @allure.story("星球状态")
+    @allure.title("正向：并发轮询星球状态，结果一致")
+    @pytest.mark.anyio
+    @pytest.mark.positive
+    @pytest.mark.planet
+    async def test_get_planet_state_concurrent(self, async_client):
+        """并发 10 次获取星球状态（模拟多端同时刷新），期望全部 200 且 ETag 相同"""
+        responses = await asyncio.gather(*(async_client.get("/planet/state") for _ in range(10)))
+        for response in responses:
+            assert_helper.assert_status_code(response, 200)
+        etags = {response.headers.get("ETag") for response in responses}
+        assert len(etags) == 1, f"并发请求返回了不同的 ETag: {etags}"
+
     @allure.story("星球状态")
     @allure.title("负向：不带 token → 403")
     @pytest.mark.negative
@@ -60,6 +75,28 @@ class TestPlanetHistory:
         assert_helper.assert_status_code(response, 200)
         assert_helper.assert_field_type(response, "history", list)
 
+    @allure.story("历史记录")
+    @allure.title("正向：按月聚合三年历史，每月一个时间桶")
+    @pytest.mark.positive
+    @pytest.mark.planet
+    def test_get_planet_history_monthly(self, http_client):
+        """resolution=month 回溯约三年，期望 200，时间桶数为 37 个左右且日期都是月初"""
+        response = http_client.get("/planet/history", params={"days": 1095, "resolution": "month"})
+        assert_helper.assert_status_code(response, 200)
+        body = response.json()
+        assert body["resolution"] == "month"
+        assert 36 <= len(body["history"]) <= 38
+        assert all(item["date"].endswith("-01") for item in body["history"])
+
+    @allure.story("历史记录")
+    @allure.title("负向：时间桶过多 → 400")
+    @pytest.mark.negative
+    @pytest.mark.planet
+    def test_get_planet_history_too_many_buckets(self, http_client):
+        """按天回溯 5000 天超过时间桶上限，期望 400"""
+        response = http_client.get("/planet/history", params={"days": 5000})
+        assert_helper.assert_status_code(response, 400)
+
     @allure.story("历史记录")
     @allure.title("负向：不带 token → 403")
     @pytest.mark.negative
@@ -83,6 +120,16 @@ class TestPlanetStats:
         assert_helper.assert_status_code(response, 200)
         assert_helper.assert_json_keys(response, ["total_records"])
 
+    @allure.story("统计数据")
+    @allure.title("性能：统计接口读取预计算数据，查询数不随记录数增长")
+    @pytest.mark.regression
+    @pytest.mark.planet
+    def test_get_planet_stats_query_budget(self, http_client):
+        """用户认证 1 条 + user_stats 1 条"""
+        response = http_client.get("/planet/stats")
+        assert_helper.assert_status_code(response, 200)
+        assert_helper.assert_query_budget(response, 3)
+
     @allure.story("统计数据")
     @allure.title("负向：不带 token → 403")
     @pytest.mark.negative
@@ -91,3 +138,85 @@ class TestPlanetStats:
         """不带 token，期望 401"""
         response = anon_client.get("/planet/stats")
         assert_helper.assert_status_code(response, 403)
+
+
+@allure.feature("星球模块")
+class TestPlanetDeltaSync:
+
+    @allure.story("增量同步")
+    @allure.title("正向：since 版本之后新增的星星出现在增量中")
+    @pytest.mark.positive
+    @pytest.mark.planet
+    def test_planet_state_since_returns_new_star(self, http_client, spark_payload):
+        """先取当前版本，再创建一条 spark，按 since 拉取增量应包含这颗新星星"""
+        version = http_client.get("/planet/state").json().get("version")
+        if version is None:
+            pytest.skip("服务端未启用数据版本（Redis 不可用）")
+
+        created = http_client.post("/records/", json_data=spark_payload)
+        assert_helper.assert_status_code(created, 201)
+
+        response = http_client.get("/planet/state", params={"since": version})
+        assert_helper.assert_status_code(response, 200)
+        assert_helper.assert_json_keys(response, ["since", "version", "full"])
+        data = response.json()
+        stars = data["state"]["stars"] if data["full"] else data["stars_added"]
+        assert created.json()["id"] in [s["id"] for s in stars], "新建的星星不在增量结果中"
+
+    @allure.story("增量同步")
+    @allure.title("边界：since 等于当前版本时增量为空")
+    @pytest.mark.boundary
+    @pytest.mark.planet
+    def test_planet_state_since_current_version_is_empty(self, http_client):
+        """since 传当前版本，期望 full=false 且没有任何变化"""
+        version = http_client.get("/planet/state").json().get("version")
+        if version is None:
+            pytest.skip("服务端未启用数据版本（Redis 不可用）")
+
+        response = http_client.get("/planet/state", params={"since": version})
+        assert_helper.assert_status_code(response, 200)
+        assert_helper.assert_json_value(response, "full", False)
+        assert_helper.assert_json_value(response, "stars_added", [])
+        assert_helper.assert_json_value(response, "total_records_delta", 0)
+
+
+@allure.feature("星球模块")
+class TestPlanetStates:
+
+    @allure.story("区间状态")
+    @allure.title("正向：一次请求获取 7 天的星球状态")
+    @pytest.mark.positive
+    @pytest.mark.planet
+    def test_get_planet_states_week(self, http_client):
+        """查询最近 7 天，期望 200，states 每天一项"""
+        end = date.today()
+        start = end - timedelta(days=6)
+        response = http_client.get("/planet/states", params={"start": start.isoformat(), "end": end.isoformat()})
+        assert_helper.assert_status_code(response, 200)
+        assert_helper.assert_field_type(response, "states", list)
+        assert len(response.json()["states"]) == 7, "区间内每天都应返回一项状态"
+
+    @allure.story("区间状态")
+    @allure.title("正向：紧凑编码返回字段说明和 days 数组")
+    @pytest.mark.positive
+    @pytest.mark.planet
+    def test_get_planet_states_compact(self, http_client):
+        """format=compact，期望 200，响应含 star_fields / tree_fields / days"""
+        end = date.today()
+        start = end - timedelta(days=29)
+        response = http_client.get("/planet/states", params={
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "format": "compact",
+        })
+        assert_helper.assert_status_code(response, 200)
+        assert_helper.assert_json_keys(response, ["star_fields", "tree_fields", "days"])
+
+    @allure.story("区间状态")
+    @allure.title("边界：结束日期早于开始日期 → 400")
+    @pytest.mark.boundary
+    @pytest.mark.planet
+    def test_get_planet_states_reversed_range(self, http_client):
+        """end < start，期望 400"""
+        response = http_client.get("/planet/states", params={"start": "2024-05-10", "end": "2024-05-01"})
+        assert_helper.assert_status_code(response, 400)
@@ -3,6 +3,7 @@
 记录模块接口用例
 覆盖：创建记录（mood / spark / thought）/ 查询列表 / 查询单条 / 删除
 """
+import asyncio
 import pytest
 import allure
 
@@ -100,6 +101,18 @@ class TestListRecords:
         assert_helper.assert_json_keys(response, ["records"])
         assert_helper.assert_field_type(response, "records", list)
 
+    @allure.story("查询记录列表")
+    @allure.title("性能：列表查询数不随每页条数增长（无 N+1）")
+    @pytest.mark.regression
+    @pytest.mark.records
+    def test_list_records_query_budget(self, http_client, spark_payload):
+        """先写入两条记录，再按最大页长查询：认证 + 计数 + 列表共 3 条 SQL"""
+        for _ in range(2):
+            http_client.post("/records/", json_data=spark_payload)
+        response = http_client.get("/records/", params={"limit": 100})
+        assert_helper.assert_status_code(response, 200)
+        assert_helper.assert_query_budget(response, 3)
+
     @allure.story("查询记录列表")
     @allure.title("负向：不带 token → 403")
     @pytest.mark.negative
@@ -110,6 +123,24 @@ class TestListRecords:
         assert_helper.assert_status_code(response, 403)
 
 
+@allure.feature("记录模块")
+class TestConcurrentRecords:
+
+    @allure.story("并发写入")
+    @allure.title("正向：并发创建多条记录，全部成功且 id 互不相同")
+    @pytest.mark.anyio
+    @pytest.mark.regression
+    @pytest.mark.records
+    async def test_concurrent_create_records(self, async_client, spark_payload, thought_payload):
+        """同一用户并发写入 3 条记录（统计、主题等按用户加锁更新），期望全部 201"""
+        payloads = [spark_payload, thought_payload, spark_payload]
+        responses = await asyncio.gather(*(async_client.post("/records/", json_data=p) for p in payloads))
+        for response in responses:
+            assert_helper.assert_status_code(response, 201)
+        ids = {response.json()["id"] for response in responses}
+        assert len(ids) == len(payloads), f"并发创建返回了重复的 id: {ids}"
+
+
 @allure.feature("记录模块")
 class TestGetAndDeleteRecord:
 
@@ -151,3 +182,65 @@ class TestGetAndDeleteRecord:
 
         get_resp = http_client.get(f"/records/{record_id}")
         assert_helper.assert_status_code(get_resp, 404)
+
+
+@allure.feature("记录模块")
+class TestSearchRecords:
+
+    @allure.story("全文检索")
+    @allure.title("正向：创建后按关键词检索到该记录")
+    @pytest.mark.positive
+    @pytest.mark.records
+    def test_search_record(self, http_client, spark_payload):
+        """创建一条灵感记录，再用其中的词检索，期望结果包含该记录"""
+        create_resp = http_client.post("/records/", json_data=spark_payload)
+        assert_helper.assert_status_code(create_resp, 201)
+        record_id = create_resp.json()["id"]
+
+        response = http_client.get("/records/search", params={"q": "桌面壁纸", "record_type": "spark"})
+        assert_helper.assert_status_code(response, 200)
+        assert_helper.assert_json_keys(response, ["records", "next_cursor"])
+        assert record_id in [r["id"] for r in response.json()["records"]]
+
+    @allure.story("全文检索")
+    @allure.title("负向：非法游标 → 400")
+    @pytest.mark.negative
+    @pytest.mark.records
+    def test_search_invalid_cursor(self, http_client):
+        """游标无法解析，期望 400"""
+        response = http_client.get("/records/search", params={"q": "壁纸", "cursor": "not-a-cursor"})
+        assert_helper.assert_status_code(response, 400)
+
+
+@allure.feature("记录模块")
+class TestSimilarRecords:
+
+    @allure.story("相似记录")
+    @allure.title("正向：相近内容的记录出现在相似列表中")
+    @pytest.mark.positive
+    @pytest.mark.records
+    def test_similar_records(self, http_client, spark_payload):
+        """创建两条内容相近的灵感记录，查询其中一条的相似记录，期望包含另一条"""
+        first = http_client.post("/records/", json_data=spark_payload)
+        assert_helper.assert_status_code(first, 201)
+        second = http_client.post("/records/", json_data={
+            "type": "spark",
+            "content": "做一个根据心情颜色生成桌面壁纸的小工具。",
+        })
+        assert_helper.assert_status_code(second, 201)
+
+        response = http_client.get(f"/records/{first.json()['id']}/similar", params={"record_type": "spark"})
+        assert_helper.assert_status_code(response, 200)
+        assert_helper.assert_field_type(response, "records", list)
+        items = response.json()["records"]
+        assert second.json()["id"] in [item["record"]["id"] for item in items]
+        assert all(0 < item["similarity"] <= 1 for item in items)
+
+    @allure.story("相似记录")
+    @allure.title("负向：查询不存在记录的相似记录 → 404")
+    @pytest.mark.negative
+    @pytest.mark.records
+    def test_similar_nonexistent_record(self, http_client):
+        """不存在的有效 UUID，期望 404"""
+        response = http_client.get("/records/a0000000-0000-0000-0000-000000000001/similar")
+        assert_helper.assert_status_code(response, 404)
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 from .config_manager import config
 from .http_client import HTTPClient
+from .async_http_client import AsyncHTTPClient
 from .assertion_helper import assert_helper
 from .logger import logger
 
-__all__ = ["config", "HTTPClient", "assert_helper", "logger"]
+__all__ = ["config", "HTTPClient", "AsyncHTTPClient", "assert_helper", "logger"]
@@ -5,6 +5,7 @@
 import json
 import re
 import allure
+import pytest
 from typing import Any, Dict, List
 from requests import Response
 from .logger import logger
@@ -28,6 +29,20 @@ class AssertionHelper:
             assert actual <= max_seconds, msg
             logger.info(f"响应时间断言通过: {actual:.3f}s")
 
+    @staticmethod
+    def assert_query_budget(response: Response, max_queries: int, message: str = None) -> None:
+        """
+        断言单个请求执行的 SQL 条数不超过预算（后端需开启 QUERY_STATS_HEADER，否则跳过）
+        """
+        header = response.headers.get("X-DB-Query-Count")
+        if header is None:
+            pytest.skip("后端未开启 QUERY_STATS_HEADER，跳过查询数断言")
+        actual = int(header)
+        msg = message or f"请求执行了 {actual} 条 SQL，超过预算 {max_queries}（可能出现了 N+1 查询）"
+        with allure.step(f"断言 SQL 条数 <= {max_queries}"):
+            assert actual <= max_queries, msg
+            logger.info(f"查询数断言通过: {actual} 条（{response.headers.get('Server-Timing', '')}）")
+
     @staticmethod
     def assert_json_keys(response: Response, keys: List[str], message: str = None) -> None:
         """断言响应 JSON 的顶层包含指定所有 key"""
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+异步 HTTP 客户端 - 基于 httpx.AsyncClient
+
+接口与 HTTPClient 保持一致（get / post / put / patch / delete，json_data 传请求体），区别：
+  - 所有请求方法都是协程，可以用 asyncio.gather 并发发出
+  - 连接池上限取 test_env.max_connections，连接复用，并发请求不会无限建连
+  - 连接失败时按 test_env.retry_count 重试（不对 429 / 5xx 重试，状态码原样交给用例断言）
+  - 日志与 Allure 附件同样由 http_recorder 处理
+
+用法：
+    async with AsyncHTTPClient() as client:
+        client.set_bearer_token(token)
+        responses = await asyncio.gather(*(client.get("/planet/state") for _ in range(10)))
+"""
+from typing import Dict
+
+import httpx
+
+from .config_manager import config
+from .http_recorder import http_recorder
+from .logger import logger
+
+
+class AsyncHTTPClient:
+    def __init__(self, base_url: str = None, timeout: int = None, max_connections: int = None):
+        self.base_url = (base_url or config.get_base_url()).rstrip("/")
+        self.timeout = timeout or config.get_timeout()
+        max_connections = max_connections or config.get_max_connections()
+
+        transport = httpx.AsyncHTTPTransport(
+            retries=config.get_retry_count(),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=transport,
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            },
+        )
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """关闭连接池"""
+        await self.client.aclose()
+
+    # -------------------------------------------------------------------------
+    # Token 管理
+    # -------------------------------------------------------------------------
+    def set_bearer_token(self, token: str) -> None:
+        """设置 Bearer token，之后所有请求都会带此 Authorization 头"""
+        self.client.headers["Authorization"] = f"Bearer {token}"
+        logger.info("已设置 Bearer token")
+
+    def clear_token(self) -> None:
+        """移除 Authorization 头，用于测试「未登录 → 401」的场景"""
+        self.client.headers.pop("Authorization", None)
+        logger.info("已清除 Bearer token")
+
+    # -------------------------------------------------------------------------
+    # 核心请求方法
+    # -------------------------------------------------------------------------
+    async def request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        response = await self.client.request(method, url, **kwargs)
+        http_recorder.record(method, url, response, **kwargs)
+        return response
+
+    async def get(self, endpoint: str, params: Dict = None, **kwargs) -> httpx.Response:
+        return await self.request("GET", endpoint, params=params, **kwargs)
+
+    async def post(self, endpoint: str, json_data: Dict = None, **kwargs) -> httpx.Response:
+        return await self.request("POST", endpoint, json=json_data, **kwargs)
+
+    async def put(self, endpoint: str, json_data: Dict = None, **kwargs) -> httpx.Response:
+        return await self.request("PUT", endpoint, json=json_data, **kwargs)
+
+    async def patch(self, endpoint: str, json_data: Dict = None, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", endpoint, json=json_data, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", endpoint, **kwargs)
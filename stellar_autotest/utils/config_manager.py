@@ -39,9 +39,15 @@ class ConfigManager:
     def get_retry_count(self) -> int:
         return self.get("test_env.retry_count", 3)
 
+    def get_max_connections(self) -> int:
+        return self.get("test_env.max_connections", 20)
+
     def get_test_user(self) -> Dict[str, str]:
         return self.get("test_user", {"email": "", "password": ""})
 
+    def get_load_test(self) -> Dict[str, Any]:
+        return self.get("load_test", {}) or {}
+
     def get_allure_results_dir(self) -> str:
         return self.get("report.allure_results_dir", "./reports/allure-results")
 
@@ -5,15 +5,15 @@ HTTP 客户端 - 统一请求封装
 与 autotest 框架保持一致风格，额外支持：
   - set_bearer_token()：为 session 设置 Authorization 头（Stellar-Journal 需要鉴权）
   - clear_token()：移除 token（用于测试未认证场景）
+  - 日志与 Allure 附件由 http_recorder 统一处理（见 config.yaml 的 http_log.mode）
 """
-import json
-import allure
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from typing import Dict, Optional
 
 from .config_manager import config
+from .http_recorder import http_recorder
 from .logger import logger
 
 
@@ -52,47 +52,6 @@ class HTTPClient:
         self.session.headers.pop("Authorization", None)
         logger.info("已清除 Bearer token")
 
-    # -------------------------------------------------------------------------
-    # 日志 / Allure 附件
-    # -------------------------------------------------------------------------
-    def _log_request(self, method: str, url: str, **kwargs) -> None:
-        logger.info(f"[REQUEST] {method.upper()} {url}")
-        if "json" in kwargs:
-            logger.info(f"  body : {json.dumps(kwargs['json'], ensure_ascii=False)}")
-        if "params" in kwargs:
-            logger.info(f"  params: {kwargs['params']}")
-
-    def _log_response(self, response: requests.Response) -> None:
-        logger.info(f"[RESPONSE] {response.status_code} | {response.elapsed.total_seconds():.3f}s")
-        try:
-            logger.info(f"  body : {json.dumps(response.json(), ensure_ascii=False)}")
-        except Exception:
-            logger.info(f"  body : {response.text[:500]}")
-
-    def _attach_allure(self, method: str, url: str, response: requests.Response, **kwargs) -> None:
-        allure.attach(f"{method.upper()} {url}", name="请求地址", attachment_type=allure.attachment_type.TEXT)
-        if "json" in kwargs:
-            allure.attach(
-                json.dumps(kwargs["json"], ensure_ascii=False, indent=2),
-                name="请求体",
-                attachment_type=allure.attachment_type.JSON,
-            )
-        if "params" in kwargs:
-            allure.attach(
-                json.dumps(kwargs["params"], ensure_ascii=False, indent=2),
-                name="查询参数",
-                attachment_type=allure.attachment_type.JSON,
-            )
-        allure.attach(str(response.status_code), name="响应状态码", attachment_type=allure.attachment_type.TEXT)
-        try:
-            allure.attach(
-                json.dumps(response.json(), ensure_ascii=False, indent=2),
-                name="响应体",
-                attachment_type=allure.attachment_type.JSON,
-            )
-        except Exception:
-            allure.attach(response.text, name="响应体", attachment_type=allure.attachment_type.TEXT)
-
     # -------------------------------------------------------------------------
     # 核心请求方法
     # -------------------------------------------------------------------------
@@ -100,10 +59,8 @@ class HTTPClient:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         kwargs.setdefault("timeout", self.timeout)
 
-        self._log_request(method, url, **kwargs)
         response = self.session.request(method, url, **kwargs)
-        self._log_response(response)
-        self._attach_allure(method, url, response, **kwargs)
+        http_recorder.record(method, url, response, **kwargs)
 
         return response
 
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+请求记录 - HTTPClient / AsyncHTTPClient 共用的日志与 Allure 附件
+
+config.yaml 的 http_log.mode：
+  - always     ：每个请求都打印请求/响应体并挂 Allure 附件（调试单个用例时使用，较慢）
+  - on_failure ：只打印一行摘要；请求先留在内存里，用例失败时才格式化并挂到 Allure（默认）
+  - off        ：只打印摘要，不挂附件
+"""
+import json
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+import allure
+
+from .config_manager import config
+from .logger import logger
+
+MODES = ("always", "on_failure", "off")
+
+
+def _dump(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+class HttpRecorder:
+    def __init__(self):
+        self.mode = config.get("http_log.mode", "on_failure")
+        if self.mode not in MODES:
+            raise ValueError(f"http_log.mode 只能是 {MODES} 之一，当前: {self.mode}")
+        self.max_body_chars = config.get("http_log.max_body_chars", 2000)
+        # 当前用例的请求（响应对象直接引用，失败时才读取和格式化）
+        self._exchanges: Deque[Tuple[str, str, Dict, Any]] = deque(maxlen=config.get("http_log.max_exchanges", 50))
+
+    def record(self, method: str, url: str, response, **kwargs) -> None:
+        """
+        记录一次请求；response 可以是 requests.Response 或 httpx.Response
+        （两者都有 status_code / elapsed / text / json()）
+        """
+        logger.info(f"[HTTP] {method.upper()} {url} -> {response.status_code} | {response.elapsed.total_seconds():.3f}s")
+        if self.mode == "always":
+            self._log_bodies(response, **kwargs)
+            self._attach(method, url, response, **kwargs)
+        elif self.mode == "on_failure":
+            self._exchanges.append((method, url, kwargs, response))
+
+    def reset(self) -> None:
+        """用例开始时清空上一条用例的记录"""
+        self._exchanges.clear()
+
+    def attach_recorded(self) -> None:
+        """用例失败时，把本用例记录的请求挂到 Allure"""
+        for method, url, kwargs, response in self._exchanges:
+            with allure.step(f"{method.upper()} {url} -> {response.status_code}"):
+                self._attach(method, url, response, **kwargs)
+        self._exchanges.clear()
+
+    def _body(self, response) -> Tuple[str, Any]:
+        try:
+            return _dump(response.json()), allure.attachment_type.JSON
+        except Exception:
+            return response.text[:self.max_body_chars], allure.attachment_type.TEXT
+
+    def _log_bodies(self, response, **kwargs) -> None:
+        if "json" in kwargs:
+            logger.info(f"  body : {json.dumps(kwargs['json'], ensure_ascii=False)}")
+        if kwargs.get("params"):
+            logger.info(f"  params: {kwargs['params']}")
+        logger.info(f"  response: {self._body(response)[0][:self.max_body_chars]}")
+
+    def _attach(self, method: str, url: str, response, **kwargs) -> None:
+        allure.attach(f"{method.upper()} {url}", name="请求地址", attachment_type=allure.attachment_type.TEXT)
+        if "json" in kwargs:
+            allure.attach(_dump(kwargs["json"]), name="请求体", attachment_type=allure.attachment_type.JSON)
+        if kwargs.get("params"):
+            allure.attach(_dump(kwargs["params"]), name="查询参数", attachment_type=allure.attachment_type.JSON)
+        allure.attach(str(response.status_code), name="响应状态码", attachment_type=allure.attachment_type.TEXT)
+        body, attachment_type = self._body(response)
+        allure.attach(body, name="响应体", attachment_type=attachment_type)
+
+
+http_recorder = HttpRecorder()